@@ -0,0 +1,59 @@
+"""Namespaces de l'API v1, enregistrés à la demande.
+
+Importer un namespace importe aussi la facade et tous les modèles, et
+chaque route ajoutée est compilée par werkzeug : c'est l'essentiel du
+temps de create_app. Avec API_LAZY_LOAD, create_app ne fait que préparer
+cet enregistrement; il a lieu au premier app context poussé (première
+requête, commande CLI, test), ou explicitement avec load_api(app) : le
+master gunicorn le fait avant de forker ses workers.
+"""
+import threading
+from importlib import import_module
+from flask import appcontext_pushed
+
+# (module, chemin) de chaque namespace
+NAMESPACES = [
+    ("app.API.v1.users", "/users"),
+    ("app.API.v1.place", "/places"),
+    ("app.API.v1.amenity", "/amenities"),
+    ("app.API.v1.review", "/reviews"),
+    ("app.API.v1.auth", "/auth"),
+    ("app.API.v1.admin", "/admin"),
+    ("app.API.v1.debug", "/debug"),
+    ("app.API.v1.export", "/export"),
+]
+
+
+def register_namespaces(api):
+    for module, path in NAMESPACES:
+        api.add_namespace(import_module(module).api, path=path)
+
+
+class ApiLoader:
+    """Exécute `setup` une seule fois : tout de suite avec load(), sinon au premier app context"""
+
+    def __init__(self, app, setup):
+        self.app = app
+        self._setup = setup
+        self._lock = threading.RLock()
+        self.loaded = False
+        app.extensions["api_loader"] = self
+
+    def defer(self):
+        appcontext_pushed.connect(self._on_app_context, self.app)
+
+    def load(self):
+        with self._lock:
+            if self.loaded:
+                return
+            self.loaded = True  # avant setup() : il peut lui-même pousser un app context
+            appcontext_pushed.disconnect(self._on_app_context, self.app)
+            self._setup()
+
+    def _on_app_context(self, app, **kwargs):
+        self.load()
+
+
+def load_api(app):
+    """Enregistre tout de suite ce que create_app a différé (sans effet si déjà fait)"""
+    app.extensions["api_loader"].load()
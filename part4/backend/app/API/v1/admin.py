@@ -1,7 +1,10 @@
+import io
+import re
 from flask_restx import Namespace, Resource, fields
-from flask_jwt_extended import jwt_required, get_jwt_identity
 from flask import request
 from app.services import facade
+from app.utils.authz import admin_required
+from app.services.bulk_import import BulkImporter, read_records, IMPORT_FORMATS, DEFAULT_BATCH_SIZE
 
 api = Namespace("admin", description="Administrator-only operations")
 
@@ -14,6 +17,8 @@ user_model = api.model("AdminUser", {
     "is_admin": fields.Boolean(description="Admin privileges", default=False)
 })
 
+USER_REQUIRED_FIELDS = ("email", "first_name", "last_name", "password")
+
 amenity_model = api.model("AdminAmenity", {
     "name": fields.String(required=True, description="Amenity name")
 })
@@ -22,37 +27,51 @@ amenity_model = api.model("AdminAmenity", {
 
 @api.route("/users/")
 class AdminUserCreate(Resource):
-    @jwt_required()
+    @admin_required
     @api.expect(user_model)
     def post(self):
-        """Create a new user (Admin only)"""
-        current_user = get_jwt_identity()
-        if not current_user.get("is_admin"):
-            return {"error": "Admin privileges required"}, 403
-
+        """Create a new user, or a list of users in one transaction (Admin only)"""
         data = request.json
-        email = data.get("email")
-
-        if facade.get_user_by_email(email):
-            return {"error": "Email already registered"}, 400
-
-        new_user = facade.create_user(data)
-        return {
+        users_data = data if isinstance(data, list) else [data]
+        if not all(isinstance(user_data, dict) for user_data in users_data):
+            return {"error": "Each user must be an object"}, 400
+
+        # Tous les éléments sont validés avant la moindre écriture (index de l'élément fautif)
+        for index, user_data in enumerate(users_data):
+            for field in USER_REQUIRED_FIELDS:
+                if not isinstance(user_data.get(field), str) or not user_data[field].strip():
+                    return {"error": f"Item {index}: {field} is required"}, 400
+            if not re.match(r"[^@]+@[^@]+\.[^@]+", user_data["email"]):
+                return {"error": f"Item {index}: Invalid email format"}, 400
+            if not isinstance(user_data.get("is_admin", False), bool):
+                return {"error": f"Item {index}: is_admin must be a boolean"}, 400
+            unknown = set(user_data) - set(user_model)
+            if unknown:
+                return {"error": f"Item {index}: unknown field(s): {', '.join(sorted(unknown))}"}, 400
+
+        emails = [user_data["email"] for user_data in users_data]
+        if len(set(emails)) != len(emails):
+            return {"error": "Duplicate email in request"}, 400
+        # Une seule requête IN pour tout le lot
+        registered = {user.email for user in facade.get_users_by_emails(emails)}
+        for index, email in enumerate(emails):
+            if email in registered:
+                return {"error": f"Item {index}: Email already registered: {email}"}, 400
+
+        new_users = facade.create_users(users_data)
+        result = [{
             "id": new_user.id,
             "email": new_user.email,
             "is_admin": new_user.is_admin
-        }, 201
+        } for new_user in new_users]
+        return (result if isinstance(data, list) else result[0]), 201
 
 
 @api.route("/users/<string:user_id>")
 class AdminUserModify(Resource):
-    @jwt_required()
+    @admin_required
     def put(self, user_id):
         """Modify any user's data (Admin only)"""
-        current_user = get_jwt_identity()
-        if not current_user.get("is_admin"):
-            return {"error": "Admin privileges required"}, 403
-
         data = request.json
         email = data.get("email")
 
@@ -70,31 +89,64 @@ class AdminUserModify(Resource):
 
 @api.route("/amenities/")
 class AdminAmenityCreate(Resource):
-    @jwt_required()
+    @admin_required
     @api.expect(amenity_model)
     def post(self):
-        """Create a new amenity (Admin only)"""
-        current_user = get_jwt_identity()
-        if not current_user.get("is_admin"):
-            return {"error": "Admin privileges required"}, 403
-
+        """Create a new amenity, or a list of amenities in one transaction (Admin only)"""
         data = request.json
-        new_amenity = facade.create_amenity(data)
-        return {"id": new_amenity.id, "name": new_amenity.name}, 201
+        amenities_data = data if isinstance(data, list) else [data]
+        if not all(isinstance(amenity_data, dict) for amenity_data in amenities_data):
+            return {"error": "Each amenity must be an object"}, 400
+        new_amenities = facade.create_amenities(amenities_data)
+        result = [{"id": amenity.id, "name": amenity.name} for amenity in new_amenities]
+        return (result if isinstance(data, list) else result[0]), 201
 
 
 @api.route("/amenities/<string:amenity_id>")
 class AdminAmenityModify(Resource):
-    @jwt_required()
+    @admin_required
     @api.expect(amenity_model)
     def put(self, amenity_id):
         """Update an amenity (Admin only)"""
-        current_user = get_jwt_identity()
-        if not current_user.get("is_admin"):
-            return {"error": "Admin privileges required"}, 403
-
         data = request.json
         updated = facade.update_amenity(amenity_id, data)
         if not updated:
             return {"error": "Amenity not found"}, 404
         return {"message": "Amenity updated successfully"}, 200
+
+
+@api.route("/import/<string:kind>")
+@api.param("kind", "users, amenities, places or reviews")
+class AdminBulkImport(Resource):
+    @admin_required
+    @api.doc(params={
+        "format": "ndjson (default) or csv",
+        "import_id": "Resume key: re-send the same file with the same import_id after a failure",
+        "batch_size": f"Rows per transaction (default {DEFAULT_BATCH_SIZE})"
+    })
+    def post(self, kind):
+        """Bulk import a NDJSON/CSV request body (Admin only)"""
+        fmt = request.args.get("format", "ndjson")
+        if fmt not in IMPORT_FORMATS:
+            return {"error": f"format must be one of {', '.join(IMPORT_FORMATS)}"}, 400
+        import_id = request.args.get("import_id")
+        if not import_id:
+            return {"error": "import_id is required"}, 400
+        try:
+            importer = BulkImporter(kind, import_id,
+                                    int(request.args.get("batch_size", DEFAULT_BATCH_SIZE)))
+        except ValueError as e:
+            return {"error": str(e)}, 400
+
+        # Le corps est lu en flux, jamais chargé en entier
+        stream = io.TextIOWrapper(request.stream, encoding="utf-8", newline="")
+        try:
+            report = importer.run(read_records(stream, fmt))
+        except ValueError as e:
+            return {"error": str(e)}, 400
+        if report["failed_batch"]:
+            # Fichier illisible : 400 (à corriger puis renvoyer avec le même import_id), sinon 500
+            status = 400 if report["invalid_input"] else 500
+            return dict(report, error=f"batch {report['failed_batch']} failed: {report['error']}"), status
+        return report, 200
+
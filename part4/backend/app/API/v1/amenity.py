@@ -1,13 +1,13 @@
 from flask import request, jsonify
 from flask_restx import Namespace, Resource, fields
-from flask_jwt_extended import jwt_required, get_jwt_identity
 from sqlalchemy.exc import IntegrityError
 from app import db
-from app.services.facade import HBnBFacade
+from app.services import facade
+from app.utils.http_cache import conditional, make_etag
+from app.utils.authz import admin_required
 
 # Namespace pour regrouper les routes liées aux amenities
 api = Namespace('amenity', description='Opérations liées aux amenities')
-facade = HBnBFacade()
 
 # Modèle de données pour la documentation Swagger
 amenity_model = api.model('Amenity', {
@@ -20,24 +20,21 @@ amenity_model = api.model('Amenity', {
 class AmenityListResource(Resource):
     """Routes pour gérer la liste complète des amenities"""
 
-    @api.marshal_list_with(amenity_model)
+    @api.response(200, "Liste des amenities", [amenity_model])
     def get(self):
         """Récupère la liste de toutes les amenities"""
-        return facade.list_amenities()
+        # ETag seul : max(updated_at) ne bouge pas quand une amenity est supprimée, le count si
+        count, last_modified = facade.get_amenities_version()
+        return conditional(make_etag("amenities", count, last_modified), None,
+                           lambda: (api.marshal(facade.list_amenities(), amenity_model), 200))
 
-    @jwt_required()
+    @admin_required
     @api.expect(amenity_model)
     @api.response(201, "Amenity créée avec succès")
     @api.response(400, "Une amenity avec ce nom existe déjà")
     @api.response(403, "Accès réservé aux administrateurs")
     def post(self):
         """Crée une nouvelle amenity (réservé aux admins)"""
-        user_id = get_jwt_identity()
-        current_user = facade.user_repo.get(user_id)
-
-        if not current_user or not getattr(current_user, "is_admin", False):
-            return {"error": "Admin privileges required"}, 403
-
         data = request.get_json()
         name = data.get("name", "").strip()
 
@@ -69,18 +66,12 @@ class AmenityResource(Resource):
             return {"error": "Amenity not found"}, 404
         return amenity
 
-    @jwt_required()
+    @admin_required
     @api.response(200, "Amenity supprimée avec succès")
     @api.response(403, "Accès réservé aux administrateurs")
     @api.response(404, "Amenity introuvable")
     def delete(self, amenity_id):
         """Supprime une amenity (admin uniquement)"""
-        user_id = get_jwt_identity()
-        current_user = facade.user_repo.get(user_id)
-
-        if not current_user or not getattr(current_user, "is_admin", False):
-            return {"error": "Admin privileges required"}, 403
-
         amenity = facade.get_amenity(amenity_id)
         if not amenity:
             return {"error": "Amenity not found"}, 404
@@ -1,6 +1,7 @@
 from flask_restx import Namespace, Resource, fields
-from flask_jwt_extended import create_access_token, jwt_required, get_jwt_identity, set_access_cookies, unset_jwt_cookies
+from flask_jwt_extended import create_access_token, jwt_required, get_jwt_identity, get_jwt, set_access_cookies, unset_jwt_cookies
 from app.services import facade
+from app.utils.authz import role_cache
 from flask import jsonify, make_response
 
 api = Namespace('auth', description='Authentication operations')
@@ -21,8 +22,8 @@ class Login(Resource):
         if not email or not password:
             return {'error': 'Email and password are required'}, 400
 
-        user = facade.get_user_by_email(email)
-        if not user or not user.verify_password(password):
+        user = facade.authenticate(email, password)
+        if not user:
             return {'error': 'Invalid credentials'}, 401
 
         access_token = create_access_token(
@@ -41,7 +42,11 @@ class Login(Resource):
 
 @api.route('/logout')
 class Logout(Resource):
+    @jwt_required(optional=True)
     def post(self):
+        # Le token ne doit plus être accepté, même s'il a été copié ailleurs
+        if get_jwt():
+            role_cache.revoke_token(get_jwt())
         response = make_response(jsonify({"message": "Logged out"}), 200)
         unset_jwt_cookies(response)
         return response
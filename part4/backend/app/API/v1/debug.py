@@ -1,6 +1,10 @@
+from flask import Response
 from flask_restx import Namespace, Resource
 from app import db
-from sqlalchemy import text  # ✅ Ajouté
+from app.services import facade
+from app.services.table_stats import table_stats
+from app.utils.compression import response_compressor
+from app.utils.metrics import metrics
 
 api = Namespace("debug", description="Debug endpoints")
 
@@ -14,14 +18,28 @@ class DebugDB(Resource):
 @api.route("/tables")
 class DebugTables(Resource):
     def get(self):
-        """Liste toutes les tables et le nombre d’enregistrements"""
-        inspector = db.inspect(db.engine)
-        tables = inspector.get_table_names()
-        result = {}
+        """Nombre de lignes approximatif par table, servi depuis la mémoire (voir services/table_stats.py)"""
+        return table_stats.snapshot(), 200
 
-        for table in tables:
-            # ✅ Correction ici : on utilise text()
-            count = db.session.execute(text(f"SELECT COUNT(*) FROM {table}")).scalar()
-            result[table] = count
 
-        return result, 200
+@api.route("/cache")
+class DebugCache(Resource):
+    def get(self):
+        """Compteurs du cache de la facade (hits, misses, évictions)"""
+        return facade.cache_stats(), 200
+
+
+
+@api.route("/compression")
+class DebugCompression(Resource):
+    def get(self):
+        """Octets avant / après compression par encodage, et cache des variantes"""
+        return response_compressor.info(), 200
+
+
+@api.route("/metrics")
+class DebugMetrics(Resource):
+    @api.produces(["text/plain"])
+    def get(self):
+        """Métriques Prometheus : latence, SQL et bcrypt par route, caches, compression"""
+        return Response(metrics.render(), content_type="text/plain; version=0.0.4; charset=utf-8")
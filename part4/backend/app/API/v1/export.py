@@ -0,0 +1,40 @@
+from datetime import datetime
+from flask import Response, request, stream_with_context
+from flask_restx import Namespace, Resource
+from app.services.export import EXPORTS, iter_ndjson
+from app.utils.compression import compress_stream
+from app.utils.authz import admin_required
+
+api = Namespace("export", description="Streaming NDJSON exports (Admin only)")
+
+
+@api.route("/<string:kind>")
+@api.param("kind", "places, reviews or users")
+class Export(Resource):
+    @admin_required
+    @api.doc(params={
+        "since": "ISO datetime: only rows with updated_at after it (incremental export)",
+        "gzip": "1 to always gzip the stream (otherwise negotiated with Accept-Encoding)"
+    })
+    @api.response(200, "NDJSON stream, one object per line")
+    @api.response(403, "Admin privileges required")
+    def get(self, kind):
+        """Stream a whole table as NDJSON (constant memory)"""
+        if kind not in EXPORTS:
+            return {"error": f"kind must be one of {', '.join(EXPORTS)}"}, 404
+
+        since = request.args.get("since")
+        if since:
+            try:
+                since = datetime.fromisoformat(since)
+            except ValueError:
+                return {"error": "since must be an ISO datetime"}, 400
+
+        chunks = iter_ndjson(kind, since or None)
+        headers = {"Content-Disposition": f'attachment; filename="{kind}.ndjson"'}
+        if request.args.get("gzip") in ("1", "true"):
+            chunks = compress_stream(chunks, "gzip")
+            headers["Content-Encoding"] = "gzip"
+
+        return Response(stream_with_context(chunks), mimetype="application/x-ndjson",
+                        headers=headers)
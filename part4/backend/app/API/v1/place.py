@@ -1,7 +1,12 @@
+from flask import request
 from flask_restx import Namespace, Resource, fields
 from flask_jwt_extended import jwt_required, get_jwt_identity, get_jwt
 from app.services import facade
+from app.utils.http_cache import conditional, make_etag
+from app.utils.serializers import (PLACE_REVIEW_FIELDS, parse_fields, serialize, serialize_many,
+                                   serializer)
 from app import db
+from app.models import PlaceAmenity
 
 api = Namespace('places', description='Place operations')
 
@@ -21,6 +26,76 @@ place_model = api.model('Place', {
     'amenities': fields.List(fields.String, required=True, description="List of amenities ID's")
 })
 
+DEFAULT_PAGE_SIZE = 20
+MAX_PAGE_SIZE = 100
+MAX_BATCH_SIZE = 100
+
+PLACE_FIELDS = ["title", "description", "price", "latitude", "longitude", "owner_id", "amenities"]
+
+
+def validate_place_data(data, partial=False):
+    """Message d'erreur si les champs d'une place sont invalides, sinon None.
+
+    partial=True (mise à jour) : seuls les champs présents sont vérifiés.
+    """
+    if not partial:
+        for field in ["title", "price", "latitude", "longitude"]:
+            if field not in data or data[field] in [None, ""]:
+                return f"{field} is required"
+    for field in ["price", "latitude", "longitude"]:
+        if field in data and (isinstance(data[field], bool) or not isinstance(data[field], (int, float))):
+            return f"{field} must be a number"
+    if "latitude" in data and not (-90 <= data["latitude"] <= 90):
+        return "latitude out of range (-90 à 90)"
+    if "longitude" in data and not (-180 <= data["longitude"] <= 180):
+        return "longitude out of range (-180 à 180)"
+    if "price" in data and data["price"] < 0:
+        return "Price cannot be negative"
+    if "amenities" in data and not isinstance(data["amenities"], list):
+        return "amenities must be a list of amenity ID's"
+    return None
+
+
+def parse_limit(args):
+    """Lit la taille de page demandée; lève ValueError"""
+    try:
+        limit = int(args.get("limit", DEFAULT_PAGE_SIZE))
+    except ValueError:
+        raise ValueError("limit must be an integer")
+    if not (1 <= limit <= MAX_PAGE_SIZE):
+        raise ValueError(f"limit must be between 1 and {MAX_PAGE_SIZE}")
+    return limit
+
+
+def parse_place_list_args(args):
+    """Lit les paramètres de listing (pagination, filtres, tri); lève ValueError"""
+    filters = {"limit": parse_limit(args), "cursor": args.get("cursor") or None,
+               "sort": args.get("sort", "id"), "owner_id": args.get("owner_id") or None}
+
+    for key in ["min_price", "max_price"]:
+        if args.get(key) not in (None, ""):
+            try:
+                filters[key] = float(args[key])
+            except ValueError:
+                raise ValueError(f"{key} must be a number")
+
+    amenities = args.get("amenities", "")
+    filters["amenity_ids"] = [a for a in amenities.split(",") if a]
+    return filters
+
+
+def parse_coordinate(args, key, low, high):
+    """Lit un paramètre numérique obligatoire borné; lève ValueError"""
+    if args.get(key) in (None, ""):
+        raise ValueError(f"{key} is required")
+    try:
+        value = float(args[key])
+    except ValueError:
+        raise ValueError(f"{key} must be a number")
+    if not (low <= value <= high):
+        raise ValueError(f"{key} out of range ({low} à {high})")
+    return value
+
 
 @api.route('/')
 class PlaceList(Resource):
@@ -33,24 +108,10 @@ class PlaceList(Resource):
         is_admin = claims.get("is_admin", False)
         place_data = api.payload or {}
 
-        # Vérification des champs requis
-        required_fields = ["title", "price", "latitude", "longitude"]
-        for field in required_fields:
-            if field not in place_data or place_data[field] in [None, ""]:
-                return {"error": f"{field} is required"}, 400
-
-        # Vérification de la latitude / longitude
-        latitude = place_data["latitude"]
-        longitude = place_data["longitude"]
-
-        if not (-90 <= latitude <= 90):
-            return {"error": "latitude out of range (-90 à 90)"}, 400
-        if not (-180 <= longitude <= 180):
-            return {"error": "longitude out of range (-180 à 180)"}, 400
-
-        # Vérifie le prix
-        if place_data["price"] < 0:
-            return {"error": "Price cannot be negative"}, 400
+        # Champs requis, types, latitude / longitude, prix
+        error = validate_place_data(place_data)
+        if error:
+            return {"error": error}, 400
 
         # Vérifie le propriétaire (règle admin vs user)
         owner_id = place_data.get("owner_id") or current_user_id
@@ -63,48 +124,230 @@ class PlaceList(Resource):
 
         # Vérification des amenities
         amenities_ids = place_data.get("amenities", [])
-        amenities_objs = []
         for amenity_id in amenities_ids:
-            amenity = facade.get_amenity(amenity_id)
-            if not amenity:
+            if not facade.get_amenity(amenity_id):
                 return {"error": f"Amenity with ID {amenity_id} does not exist"}, 400
-            amenities_objs.append(amenity)
 
-        # Création du lieu
+        # Création du lieu et de ses liens amenities (un seul commit)
         place_data["owner_id"] = owner_id
         new_place = facade.create_place(place_data)
 
-        # Association des amenities
-        new_place.amenities.extend(amenities_objs)
-        db.session.commit()
+        return serialize("place", new_place), 201
+
+    @api.doc(params={
+        'limit': f'Page size (1-{MAX_PAGE_SIZE}, default {DEFAULT_PAGE_SIZE})',
+        'cursor': 'next_cursor token returned by the previous page',
+        'sort': 'Sort key: id, title, price (prefix with - for descending)',
+        'min_price': 'Minimum price per night',
+        'max_price': 'Maximum price per night',
+        'owner_id': 'Only places of this owner',
+        'amenities': "Comma-separated amenity ID's the place must all have",
+        'ids': f"Comma-separated place ID's (max {MAX_PAGE_SIZE}): fetch these places in one request",
+        'fields': 'Comma-separated fields to return (default: all)'
+    })
+    def get(self):
+        """List places (cursor pagination, filters and sort), or fetch several by ID"""
+        try:
+            place_summary = serializer("place", parse_fields(request.args))
+            if request.args.get("ids"):
+                return self._get_many(request.args["ids"], place_summary)
+            places, next_cursor = facade.list_places(**parse_place_list_args(request.args))
+        except ValueError as e:
+            return {"error": str(e)}, 400
+
+        return {"items": [place_summary(place) for place in places], "next_cursor": next_cursor}, 200
+
+    @staticmethod
+    def _get_many(ids, place_summary):
+        """?ids=a,b,c : une requête IN au lieu d'un appel HTTP par place"""
+        place_ids = list(dict.fromkeys(i for i in ids.split(",") if i))  # sans doublons, ordre gardé
+        if len(place_ids) > MAX_PAGE_SIZE:
+            return {"error": f"At most {MAX_PAGE_SIZE} ids per request"}, 400
+        places = facade.get_places_by_ids(place_ids)
+        return {
+            "items": [place_summary(place) for place in places if place],
+            "next_cursor": None,
+            "missing": [place_id for place_id, place in zip(place_ids, places) if place is None]
+        }, 200
+
+
+def check_batch_place(item, existing, owner_ids, amenity_ids, current_user_id, is_admin):
+    """Valide un élément de POST /places/batch : (status, erreur, données à écrire)"""
+    if not isinstance(item, dict):
+        return 400, "Item must be an object", None
+    place_id = item.get("id")
+    if place_id is not None and not isinstance(place_id, str):
+        return 400, "id must be a string", None
+    data = {k: v for k, v in item.items() if k in PLACE_FIELDS}
+
+    if place_id:
+        place = existing.get(place_id)
+        if not place:
+            return 404, "Place not found", None
+        if not is_admin and place.owner_id != current_user_id:
+            return 403, "Unauthorized action", None
+    else:
+        data["owner_id"] = data.get("owner_id") or current_user_id
+
+    error = validate_place_data(data, partial=bool(place_id))
+    if error:
+        return 400, error, None
+    if "owner_id" in data:
+        if not is_admin and data["owner_id"] != current_user_id:
+            return 403, "You can only create places for yourself", None
+        if data["owner_id"] not in owner_ids:
+            return 400, "Owner ID does not exist", None
+    for amenity_id in data.get("amenities", []):
+        if amenity_id not in amenity_ids:
+            return 400, f"Amenity with ID {amenity_id} does not exist", None
+    return (200 if place_id else 201), None, data
+
+
+@api.route('/batch')
+class PlaceBatch(Resource):
+    @jwt_required()
+    @api.response(200, 'Per-item results')
+    @api.response(400, 'Body is not a list, or is too long')
+    def post(self):
+        """Create (no "id") or update (with "id") up to MAX_BATCH_SIZE places
+
+        All referenced places, owners and amenities are checked with one
+        IN query each, then every valid item is written in one transaction.
+        Each item gets its own result; invalid items don't block the others.
+        """
+        items = api.payload
+        if not isinstance(items, list) or not items:
+            return {"error": "Body must be a non-empty list of places"}, 400
+        if len(items) > MAX_BATCH_SIZE:
+            return {"error": f"At most {MAX_BATCH_SIZE} places per batch"}, 400
+        current_user_id = get_jwt_identity()
+        is_admin = get_jwt().get("is_admin", False)
+
+        objects = [item for item in items if isinstance(item, dict)]
+        place_ids = list({item["id"] for item in objects if isinstance(item.get("id"), str)})
+        owner_ids = list({item.get("owner_id") or current_user_id for item in objects
+                          if isinstance(item.get("owner_id") or current_user_id, str)})
+        amenity_ids = list({a for item in objects if isinstance(item.get("amenities"), list)
+                            for a in item["amenities"] if isinstance(a, str)})
+        existing = {place.id: place for place in facade.get_places_by_ids(place_ids, profile=None) if place}
+        owner_ids = {user.id for user in facade.get_users_by_ids(owner_ids)}
+        amenity_ids = {amenity.id for amenity in facade.get_amenities_by_ids(amenity_ids)}
+
+        results, creates, updates = [], [], {}
+        for index, item in enumerate(items):
+            status, error, data = check_batch_place(item, existing, owner_ids, amenity_ids,
+                                                    current_user_id, is_admin)
+            result = {"index": index, "status": status}
+            if error:
+                result["error"] = error
+            elif status == 201:
+                creates.append((result, data))
+            elif item["id"] in updates:
+                result.update(status=400, error="Place updated twice in the same batch")
+            else:
+                updates[item["id"]] = data
+                result["id"] = item["id"]
+            results.append(result)
+
+        with facade.transaction():
+            created = facade.create_places([data for _, data in creates])
+            facade.update_places(updates)
+        for (result, _), place in zip(creates, created):
+            result["id"] = place.id
 
         return {
-            "id": new_place.id,
-            "title": new_place.title,
-            "description": new_place.description,
-            "price": new_place.price,
-            "latitude": new_place.latitude,
-            "longitude": new_place.longitude,
-            "owner_id": new_place.owner_id,
-            "amenities": [{"id": a.id, "name": a.name} for a in new_place.amenities]
-        }, 201
+            "results": results,
+            "created": len(created),
+            "updated": len(updates),
+            "failed": sum(1 for r in results if "error" in r)
+        }, 200
+
 
+MAX_RADIUS_KM = 500
+
+
+@api.route('/nearby')
+class PlaceNearby(Resource):
+    @api.doc(params={
+        'lat': 'Latitude of the center',
+        'lng': 'Longitude of the center',
+        'radius_km': f'Search radius in km (max {MAX_RADIUS_KM})',
+        'limit': f'Max number of places (1-{MAX_PAGE_SIZE}, default {DEFAULT_PAGE_SIZE})',
+        'fields': 'Comma-separated fields to return (default: all)'
+    })
     def get(self):
-        """Get all places"""
-        places = facade.get_all_places()
+        """Places within a radius, nearest first"""
+        try:
+            latitude = parse_coordinate(request.args, "lat", -90, 90)
+            longitude = parse_coordinate(request.args, "lng", -180, 180)
+            radius_km = parse_coordinate(request.args, "radius_km", 0, MAX_RADIUS_KM)
+            limit = parse_limit(request.args)
+            place_summary = serializer("place", parse_fields(request.args))
+        except ValueError as e:
+            return {"error": str(e)}, 400
+
         result = []
-        for place in places:
-            result.append({
-                "id": place.id,
-                "title": place.title,
-                "description": place.description,
-                "price": place.price,
-                "latitude": place.latitude,
-                "longitude": place.longitude,
-                "owner_id": place.owner_id,
-                "amenities": [{"id": a.id, "name": a.name} for a in getattr(place, 'amenities', [])]
-            })
-        return result, 200
+        for place, distance in facade.places_nearby(latitude, longitude, radius_km, limit):
+            item = place_summary(place)
+            item["distance_km"] = round(distance, 3)
+            result.append(item)
+        return {"items": result}, 200
+
+
+@api.route('/bbox')
+class PlaceBoundingBox(Resource):
+    @api.doc(params={
+        'min_lat': 'South edge',
+        'min_lng': 'West edge (greater than max_lng to cross the antimeridian)',
+        'max_lat': 'North edge',
+        'max_lng': 'East edge',
+        'limit': f'Max number of places (1-{MAX_PAGE_SIZE}, default {DEFAULT_PAGE_SIZE})',
+        'fields': 'Comma-separated fields to return (default: all)'
+    })
+    def get(self):
+        """Places inside a map viewport"""
+        try:
+            min_lat = parse_coordinate(request.args, "min_lat", -90, 90)
+            max_lat = parse_coordinate(request.args, "max_lat", -90, 90)
+            min_lng = parse_coordinate(request.args, "min_lng", -180, 180)
+            max_lng = parse_coordinate(request.args, "max_lng", -180, 180)
+            limit = parse_limit(request.args)
+            place_summary = serializer("place", parse_fields(request.args))
+        except ValueError as e:
+            return {"error": str(e)}, 400
+        if min_lat > max_lat:
+            return {"error": "min_lat must be lower than max_lat"}, 400
+
+        places = facade.places_in_bbox(min_lat, min_lng, max_lat, max_lng, limit)
+        return {"items": [place_summary(place) for place in places]}, 200
+
+
+@api.route('/search')
+class PlaceSearch(Resource):
+    @api.doc(params={
+        'q': 'Words to look for in titles, descriptions and review text (prefix match, all words required)',
+        'limit': f'Page size (1-{MAX_PAGE_SIZE}, default {DEFAULT_PAGE_SIZE})',
+        'cursor': 'next_cursor returned by the previous page',
+        'fields': 'Comma-separated fields to return (default: all)'
+    })
+    @api.response(200, 'Matching places, best match first')
+    @api.response(400, 'Missing query or invalid parameter')
+    def get(self):
+        """Full-text search over places and their reviews"""
+        try:
+            limit = parse_limit(request.args)
+            place_summary = serializer("place", parse_fields(request.args))
+            results, next_cursor = facade.search_places(request.args.get("q", ""), limit=limit,
+                                                        cursor=request.args.get("cursor"))
+        except ValueError as e:
+            return {"error": str(e)}, 400
+
+        items = []
+        for place, score in results:
+            item = place_summary(place)
+            item["score"] = round(score, 4)
+            items.append(item)
+        return {"items": items, "next_cursor": next_cursor}, 200
 
 
 @api.route('/<string:place_id>')
@@ -112,22 +355,39 @@ class PlaceList(Resource):
 class PlaceDetail(Resource):
     @api.response(200, 'Place retrieved successfully')
     @api.response(404, 'Place not found')
+    @api.doc(params={'include': "'reviews' to embed the reviews of the place",
+                     'fields': 'Comma-separated fields to return (default: all)'})
     def get(self, place_id):
         """Retrieve a place by ID"""
-        place = facade.get_place(place_id)
+        with_reviews = request.args.get("include") == "reviews"
+        fields = parse_fields(request.args)
+        try:
+            serializer("place", fields)
+        except ValueError as e:
+            return {"error": str(e)}, 400
+        place = facade.get_place(place_id, profile="with_reviews" if with_reviews else "detail")
         if not place:
             return {"error": "Place not found"}, 404
 
-        return {
-            "id": place.id,
-            "title": place.title,
-            "description": place.description,
-            "price": place.price,
-            "latitude": place.latitude,
-            "longitude": place.longitude,
-            "owner_id": place.owner_id,
-            "amenities": [{"id": a.id, "name": a.name} for a in getattr(place, 'amenities', [])]
-        }, 200
+        # Version de la ressource : lignes qui composent la réponse (auteurs des reviews compris,
+        # leur nom est affiché). Pas de Last-Modified : retirer une amenity ou supprimer une
+        # review ne fait avancer aucune date, seul l'ETag (ids + dates) le voit
+        stats = place.rating_stats
+        version = [place.id, place.updated_at, with_reviews, fields,
+                   stats and (stats.review_count, stats.rating_sum, stats.updated_at),
+                   sorted((a.id, a.updated_at) for a in place.amenities)]
+        if with_reviews:
+            version.append(sorted((r.id, r.updated_at, r.user and r.user.updated_at) for r in place.reviews))
+
+        return conditional(make_etag(*version), None,
+                           lambda: (self._serialize(place, with_reviews, fields), 200))
+
+    @staticmethod
+    def _serialize(place, with_reviews, fields=None):
+        result = serialize("place", place, fields)
+        if with_reviews:
+            result["reviews"] = serialize_many("review", place.reviews, PLACE_REVIEW_FIELDS)
+        return result
 
     @api.expect(place_model)
     @jwt_required()
@@ -137,7 +397,7 @@ class PlaceDetail(Resource):
         claims = get_jwt()
         is_admin = claims.get("is_admin", False)
 
-        place = facade.get_place(place_id)
+        place = facade.get_place(place_id, profile="detail")
         if not place:
             return {"error": "Place not found"}, 404
 
@@ -165,7 +425,7 @@ class PlaceDetail(Resource):
         # Gestion des amenities
         amenities_objs = []
         if "amenities" in update_data:
-            for amenity_id in update_data["amenities"]:
+            for amenity_id in dict.fromkeys(update_data["amenities"]):  # sans doublons
                 amenity = facade.get_amenity(amenity_id)
                 if not amenity:
                     return {"error": f"Amenity with ID {amenity_id} does not exist"}, 400
@@ -185,43 +445,51 @@ class PlaceDetail(Resource):
             if key in update_data:
                 setattr(place, key, update_data[key])
 
-        # Mettre à jour amenities
-        if amenities_objs:
-            place.amenities.clear()
-            place.amenities.extend(amenities_objs)
+        # Mettre à jour amenities : place.amenities est une liste calculée, on remplace les
+        # liens PlaceAmenity (les anciens sont supprimés par delete-orphan); [] retire tout
+        if "amenities" in update_data:
+            place.place_amenities = [PlaceAmenity(amenity_id=amenity.id) for amenity in amenities_objs]
 
         db.session.commit()
 
-        return {
-            "id": place.id,
-            "title": place.title,
-            "description": place.description,
-            "price": place.price,
-            "latitude": place.latitude,
-            "longitude": place.longitude,
-            "owner_id": place.owner_id,
-            "amenities": [{"id": a.id, "name": a.name} for a in place.amenities]
-        }, 200
+        # Le commit expire l'objet : on le recharge avec ses amenities en une fois
+        place = facade.get_place(place_id, profile="detail")
+
+        return serialize("place", place), 200
 
 @api.route('/<place_id>/reviews')
 class PlaceReviewList(Resource):
     @api.response(200, 'List of reviews for the place retrieved successfully')
-    @api.response(404, 'Place not found')
+    @api.doc(params={
+        'limit': f'Page size (1-{MAX_PAGE_SIZE}, default {DEFAULT_PAGE_SIZE})',
+        'cursor': 'next_cursor token returned by the previous page',
+        'sort': 'created_at or -created_at (default, newest first)',
+        'fields': f"Comma-separated fields to return (default: {','.join(PLACE_REVIEW_FIELDS)})"
+    })
     def get(self, place_id):
-        reviews = facade.get_reviews_by_place(place_id)
-        if not reviews:
-            return [], 200
-
-        return [
-            {
-                'id': review.id,
-                'text': review.text,
-                'rating': review.rating,
-                'user': {
-                    'id': review.user.id,
-                    'first_name': review.user.first_name,
-                    'last_name': review.user.last_name
-                    }
-            }
-            for review in reviews
-        ], 200
+        """List the reviews of a place (cursor pagination)"""
+        try:
+            sort = request.args.get("sort", "-created_at")
+            limit = parse_limit(request.args)
+            cursor = request.args.get("cursor") or None
+            fields = parse_fields(request.args) or PLACE_REVIEW_FIELDS
+            serializer("review", fields)
+        except ValueError as e:
+            return {"error": str(e)}, 400
+
+        # Un seul agrégat (count, max(updated_at) des reviews et de leurs auteurs) suffit à savoir
+        # si la page a changé. Pas de Last-Modified : une suppression ne fait avancer aucune date
+        count, reviews_updated, authors_updated = facade.get_reviews_version(place_id)
+        etag = make_etag(place_id, sort, limit, cursor, fields, count, reviews_updated, authors_updated)
+        return conditional(etag, None,
+                           lambda: self._page(place_id, sort, limit, cursor, fields))
+
+    @staticmethod
+    def _page(place_id, sort, limit, cursor, fields):
+        try:
+            reviews, next_cursor = facade.list_reviews_by_place(place_id, sort=sort,
+                                                                limit=limit, cursor=cursor)
+        except ValueError as e:
+            return {"error": str(e)}, 400
+
+        return {"items": serialize_many("review", reviews, fields), "next_cursor": next_cursor}, 200
@@ -2,7 +2,9 @@
 
 from flask_restx import Namespace, Resource, fields
 from flask_jwt_extended import jwt_required, get_jwt_identity, get_jwt
+from flask import request
 from app.services import facade
+from app.utils.serializers import REVIEW_FIELDS, parse_fields, serialize, serializer
 
 api = Namespace('reviews', description='Review operations')
 
@@ -40,7 +42,7 @@ class ReviewList(Resource):
         if rating in ("", None):
             return {"error": "Rating is required"}, 400
 
-        if not isinstance(rating, int) or not (1 <= rating <= 5):
+        if isinstance(rating, bool) or not isinstance(rating, int) or not (1 <= rating <= 5):
             return {"error": "Rating must be an integer between 1 and 5"}, 400
 
         # Check if the user review it own place
@@ -59,57 +61,105 @@ class ReviewList(Resource):
             "text": review_data.get("text", "")
         })
 
-        # ← AJOUTE CES LOGS
-        print("=== DEBUG ===")
-        print("review_data complet:", review_data)
-        print("text dans review_data:", review_data.get("text"))
-        print("=== FIN DEBUG ===")
-        
-        return {
-            'id': new_review.id,
-            'text': new_review.text,
-            'rating': new_review.rating,
-            'user_id': new_review.user_id,
-            'place_id': new_review.place_id
-        }, 201
+        return serialize("review", new_review, REVIEW_FIELDS), 201
 
     @api.response(200, 'List of reviews retrieved successfully')
+    @api.doc(params={'fields': 'Comma-separated fields to return (default: id,text,rating,place_id)'})
     def get(self):
         """Retrieve a list of all reviews"""
-        # Placeholder for logic to return a list of all reviews
+        try:
+            review_summary = serializer("review", parse_fields(request.args)
+                                        or ("id", "text", "rating", "place_id"))
+        except ValueError as e:
+            return {"error": str(e)}, 400
         list_reviews = facade.get_all_reviews()
         if not list_reviews:
             return {'error': 'Reviews not found!'}, 404
 
-        return [
-            {
-                'id': review.id,
-                'text': review.text,
-                'rating': review.rating,
-                'place_id': review.place_id
-            }
-            for review in list_reviews
-        ], 201
+        return [review_summary(review) for review in list_reviews], 201
+
+
+MAX_BATCH_SIZE = 100
+
+
+def check_batch_review(item, places, reviewed, current_user):
+    """Valide un élément de POST /reviews/batch : (status, erreur)"""
+    if not isinstance(item, dict):
+        return 400, "Item must be an object"
+    place = places.get(item.get("place_id")) if isinstance(item.get("place_id"), str) else None
+    if not place:
+        return 404, "Place not found"
+    rating = item.get("rating")
+    if isinstance(rating, bool) or not isinstance(rating, int) or not (1 <= rating <= 5):
+        return 400, "Rating must be an integer between 1 and 5"
+    if not isinstance(item.get("text", ""), str):
+        return 400, "The comment should be a text"
+    if place.user_id == current_user:
+        return 403, "You cannot review your own place"
+    if place.id in reviewed:
+        return 409, "You have already reviewed this place"
+    return 201, None
+
+
+@api.route('/batch')
+class ReviewBatch(Resource):
+    @api.response(200, 'Per-item results')
+    @api.response(400, 'Body is not a list, or is too long')
+    @jwt_required()
+    def post(self):
+        """Create up to MAX_BATCH_SIZE reviews of the current user in one transaction"""
+        items = api.payload
+        if not isinstance(items, list) or not items:
+            return {"error": "Body must be a non-empty list of reviews"}, 400
+        if len(items) > MAX_BATCH_SIZE:
+            return {"error": f"At most {MAX_BATCH_SIZE} reviews per batch"}, 400
+        current_user = get_jwt_identity()
+
+        # Places et reviews existantes : une requête IN chacune
+        place_ids = list({item["place_id"] for item in items
+                          if isinstance(item, dict) and isinstance(item.get("place_id"), str)})
+        places = {place.id: place for place in facade.get_places_by_ids(place_ids, profile=None) if place}
+        reviewed = facade.get_reviewed_place_ids(current_user, list(places))
+
+        results, valid = [], []
+        for index, item in enumerate(items):
+            status, error = check_batch_review(item, places, reviewed, current_user)
+            result = {"index": index, "status": status}
+            if error:
+                result["error"] = error
+            else:
+                reviewed.add(item["place_id"])  # une seule review par place, même dans le lot
+                valid.append((result, {"user_id": current_user, "place_id": item["place_id"],
+                                       "rating": item["rating"], "text": item.get("text", "")}))
+            results.append(result)
+
+        new_reviews = facade.create_reviews([data for _, data in valid])
+        for (result, _), review in zip(valid, new_reviews):
+            result["id"] = review.id
+
+        return {
+            "results": results,
+            "created": len(new_reviews),
+            "failed": sum(1 for r in results if "error" in r)
+        }, 200
 
 
 @api.route('/<review_id>')
 class ReviewResource(Resource):
     @api.response(200, 'Review details retrieved successfully')
     @api.response(404, 'Review not found')
+    @api.doc(params={'fields': f"Comma-separated fields to return (default: {','.join(REVIEW_FIELDS)})"})
     def get(self, review_id):
         """Get review details by ID"""
-        # Placeholder for the logic to retrieve a review by ID
+        try:
+            review_detail = serializer("review", parse_fields(request.args) or REVIEW_FIELDS)
+        except ValueError as e:
+            return {"error": str(e)}, 400
         review = facade.get_review(review_id)
         if not review:
             return {'error': "Review not found"}, 404
 
-        return {
-                'id': review.id,
-                'text': review.text,
-                'rating': review.rating,
-                'user_id': review.user_id,
-                'place_id': review.place_id
-        }, 201
+        return review_detail(review), 201
 
     @api.expect(review_model)
     @api.response(200, 'Review updated successfully')
@@ -139,7 +189,7 @@ class ReviewResource(Resource):
 
         if "rating" in review_data:
             rating = review_data["rating"]
-            if not isinstance(rating, int) or not (1 <= rating <= 5):
+            if isinstance(rating, bool) or not isinstance(rating, int) or not (1 <= rating <= 5):
                 return {"error": "Rating must be an integer between 1 and 5"}, 400
 
         text = review_data.get("text", "")
@@ -148,13 +198,10 @@ class ReviewResource(Resource):
         if not isinstance(text, str):
             return {"error": "The comment should be a text"}, 400
 
-        # ✅ Mise à jour des champs autorisés
-        for field in allowed_fields:
-            if field in review_data:
-                setattr(updated_review, field, review_data[field])
-
-        # ✅ Sauvegarde dans la base via le repo
-        facade.review_repo.add(updated_review)
+        # ✅ Mise à jour des champs autorisés (et des agrégats de notes) via la facade
+        updated_review = facade.update_review(review_id, {
+            field: review_data[field] for field in allowed_fields if field in review_data
+        })
 
         return {
             "message": "Review updated successfully",
@@ -1,8 +1,11 @@
 from flask_restx import Namespace, Resource, fields
 from flask_jwt_extended import jwt_required, get_jwt_identity, get_jwt
 from app.services import facade
+from flask import request
+from app.utils.http_cache import conditional, make_etag
+from app.utils.serializers import parse_fields, serialize, serializer
+from app.utils.authz import admin_required
 from app.models.user import User
-from app import bcrypt
 import re
 
 api = Namespace('users', description='User operations')
@@ -17,13 +20,9 @@ user_model = api.model('User', {
 @api.route('/')
 class UserList(Resource):
     @api.expect(user_model)
-    @jwt_required()
+    @admin_required
     def post(self):
         """Create a new user (admin only)"""
-        claims = get_jwt()
-        if not claims.get("is_admin", False):
-            return {"error": "Admin privileges required"}, 403
-
         user_data = api.payload
 
         # Vérifications simples
@@ -44,24 +43,18 @@ class UserList(Resource):
 
         new_user = facade.create_user(user_data)
 
-        return {
-            "id": new_user.id,
-            "first_name": new_user.first_name,
-            "last_name": new_user.last_name,
-            "email": new_user.email
-        }, 201
+        return serialize("user", new_user), 201
 
 
     @api.response(200, 'List of users retrieved successfully')
+    @api.doc(params={'fields': 'Comma-separated fields to return (default: all)'})
     def get(self):
         """List all users"""
-        users = facade.list_users()
-        print("DEBUG USERS:", [(u.id, u.email) for u in users])
-
-        return [
-            {'id': u.id, 'first_name': u.first_name, 'last_name': u.last_name, 'email': u.email}
-            for u in users
-        ], 200
+        try:
+            user_summary = serializer("user", parse_fields(request.args))
+        except ValueError as e:
+            return {"error": str(e)}, 400
+        return [user_summary(u) for u in facade.list_users()], 200
 
 # Sert à vérifier que l'utiisateur est bien connecté + aucun token dans le front
 @api.route('/me')
@@ -74,29 +67,26 @@ class UserMe(Resource):
         if not user:
             return {"error": "User not found"}, 404
 
-        return {
-            "id": user.id,
-            "email": user.email,
-            "first_name": user.first_name,
-            "last_name": user.last_name
-        }, 200
+        return serialize("user", user), 200
 
 
 @api.route('/<user_id>')
 class UserResource(Resource):
     @api.response(200, 'User details retrieved successfully')
     @api.response(404, 'User not found')
+    @api.doc(params={'fields': 'Comma-separated fields to return (default: all)'})
     def get(self, user_id):
         """Get user details by ID"""
+        fields = parse_fields(request.args)
+        try:
+            serializer("user", fields)
+        except ValueError as e:
+            return {"error": str(e)}, 400
         user = facade.get_user(user_id)
         if not user:
             return {'error': 'User not found'}, 404
-        return {
-            'id': user.id,
-            'first_name': user.first_name,
-            'last_name': user.last_name,
-            'email': user.email
-        }, 200
+        return conditional(make_etag(user.id, user.updated_at, fields), user.updated_at,
+                           lambda: (serialize("user", user, fields), 200))
 
     @api.response(200, 'User updated successfully')
     @api.response(404, 'User not found')
@@ -133,15 +123,10 @@ class UserResource(Resource):
         if existing_user and existing_user.id != user.id:
             return {"error": "Email already in use"}, 400
 
-        # ✅ Hash du mot de passe s’il est fourni
-        if "password" in user_data and user_data["password"]:
-            user_data["password"] = bcrypt.generate_password_hash(user_data["password"]).decode("utf-8")
+        # ✅ Le setter User.password hash le mot de passe (ne pas le hasher deux fois)
+        if not user_data.get("password"):
+            user_data.pop("password", None)
 
         updated_user = facade.update_user(user_id, user_data)
 
-        return {
-            'id': updated_user.id,
-            'first_name': updated_user.first_name,
-            'last_name': updated_user.last_name,
-            'email': updated_user.email
-        }, 200
\ No newline at end of file
+        return serialize("user", updated_user), 200
\ No newline at end of file
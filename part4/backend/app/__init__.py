@@ -3,62 +3,78 @@ from flask_restx import Api
 from flask_sqlalchemy import SQLAlchemy
 from flask_bcrypt import Bcrypt
 from flask_jwt_extended import JWTManager
+from flask_jwt_extended.exceptions import JWTExtendedException
 import os
 from flask_cors import CORS
+from app.persistence.routing import RoutingSession, replica_binds
+from app.utils.password_hasher import password_hasher, HasherBusy
+from app.utils.serializers import output_json
+from app.utils.metrics import metrics
 
 
 # Initialisation
 jwt = JWTManager()
 bcrypt = Bcrypt()
-db = SQLAlchemy()
+db = SQLAlchemy(session_options={"class_": RoutingSession})
 
 
-def create_app(template_folder=None, static_folder=None):
+def create_app(config_name=None, template_folder=None, static_folder=None):
 
     app = Flask(__name__, template_folder=template_folder, static_folder=static_folder)
 
-    app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite:///hbnb.db'
-    app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
-    app.config['SECRET_KEY'] = 'super-secret-key'
-    app.config['JWT_SECRET_KEY'] = app.config['SECRET_KEY']
+    from config import config
+    config_name = config_name or os.getenv('FLASK_CONFIG', 'default')
+    if config_name not in config:
+        raise ValueError(f"Unknown config '{config_name}', expected one of {', '.join(config)}")
+    app.config.from_object(config[config_name])
+    if not app.config['SQLALCHEMY_DATABASE_URI']:
+        raise RuntimeError(f"DATABASE_URL must be set for the '{config_name}' config")
+
+    # Pool de connexions du moteur SQLAlchemy
+    from app.persistence.engine import engine_options, apply_sqlite_pragmas
+    app.config.setdefault('SQLALCHEMY_ENGINE_OPTIONS', engine_options(app.config))
+    # Réplicas en lecture : binds "replica_<n>" (voir app/persistence/routing.py)
+    app.config['SQLALCHEMY_BINDS'] = dict(app.config.get('SQLALCHEMY_BINDS') or {},
+                                          **replica_binds(app.config['DATABASE_REPLICA_URLS']))
 
     # Initialisation des extensions
     jwt.init_app(app)
     db.init_app(app)
+    with app.app_context():
+        for bind_key, engine in db.engines.items():
+            pragmas = dict(app.config.get('SQLITE_PRAGMAS') or {})
+            if bind_key:
+                pragmas["query_only"] = 1  # un réplica n'accepte aucune écriture
+            apply_sqlite_pragmas(engine, pragmas)
+        # Latence, requêtes SQL et temps bcrypt par route (voir app/utils/metrics.py)
+        metrics.init_app(app, db.engines.values())
     bcrypt.init_app(app)
+    password_hasher.init_app(app)
 
     # Initialisation de l'API
     api = Api(app, prefix="/api/v1", version='1.0', title='HBnB API',
         description='HBnB Application API', 
         doc='/api/v1/doc')  # Doc accessible sur http://localhost:5000/api/v1/doc
+    api.representations['application/json'] = output_json  # orjson si disponible
+
+    @api.errorhandler(HasherBusy)
+    def handle_hasher_busy(error):
+        """Pool de hachage saturé : le client réessaie plus tard"""
+        return {"error": str(error)}, 429, {"Retry-After": "1"}
+
+    @api.errorhandler(JWTExtendedException)
+    def handle_jwt_error(error):
+        """Token absent, invalide ou révoqué : 401 au lieu d'une erreur 500 de flask-restx"""
+        return {"error": str(error)}, 401
+
+    # Namespaces, facade et modèles : au premier app context (API_LAZY_LOAD) ou tout de suite
+    from app.API import ApiLoader
+    loader = ApiLoader(app, lambda: _setup_api(app, api))
+    if app.config.get("API_LAZY_LOAD", True):
+        loader.defer()
+    else:
+        loader.load()
 
-    # Import des namespaces RESTX
-    from app.API.v1.users import api as users_ns
-    from app.API.v1.place import api as places_ns
-    from app.API.v1.amenity import api as amenities_ns
-    from app.API.v1.review import api as reviews_ns
-    from app.API.v1.auth import api as auth_ns
-    from app.API.v1.admin import api as admin_ns
-    from app.API.v1.debug import api as debug_ns
-
-    # Enregistrement des namespaces
-    api.add_namespace(users_ns, path='/users')
-    api.add_namespace(places_ns, path='/places')
-    api.add_namespace(amenities_ns, path='/amenities')
-    api.add_namespace(reviews_ns, path='/reviews')
-    api.add_namespace(auth_ns, path='/auth')
-    api.add_namespace(admin_ns, path='/admin')
-    api.add_namespace(debug_ns, path='/debug') 
-
-    # Configuration de cookies
-    app.config["JWT_TOKEN_LOCATION"] = ["cookies"] # stockage du JWT dans les cookies
-    app.config["JWT_COOKIE_SECURE"] = False        # protection contre les attaques XSS...
-    app.config["JWT_COOKIE_HTTPONLY"] = True       # ...en empechant js de lire les cookies
-    app.config["JWT_COOKIE_SAMESITE"] = "Lax"      # protection CSRF basique
-    app.config["JWT_COOKIE_CSRF_PROTECT"] = False
-
-    print("✅ API chargée")
-    
     # --- CORS : APRÈS l'API pour éviter les conflits ---
     CORS(app, resources={
         r"/api/*": {
@@ -68,17 +84,47 @@ def create_app(template_folder=None, static_folder=None):
             "supports_credentials": True # autorisation du JWT 
         }
     })
-    print("✅ CORS activé")
 
     # --- Charger les routes front ---
     from app.routes_front import init_routes
     init_routes(app)
-    print("✅ Routes front chargées")
 
-    # Afficher toutes les routes pour debug
-    print("\n🔍 Routes enregistrées :")
-    for rule in app.url_map.iter_rules():
-        methods = ','.join(rule.methods - {'HEAD', 'OPTIONS'})
-        print(f"  {methods:20s} {rule.rule:40s} → {rule.endpoint}")
+    # --- Commandes CLI (maintenance) ---
+    from app.commands import init_commands
+    init_commands(app)
+
+    # Liste des routes au démarrage, seulement si demandée (LOG_ROUTES=1) : aussi `flask routes`
+    if app.config.get("LOG_ROUTES"):
+        loader.load()
+        for rule in app.url_map.iter_rules():
+            methods = ','.join(rule.methods - {'HEAD', 'OPTIONS'})
+            print(f"  {methods:20s} {rule.rule:40s} → {rule.endpoint}")
 
     return app
+
+
+def _setup_api(app, api):
+    """Tout ce qui importe la facade et les modèles (voir app/API/__init__.py)"""
+    from app.API import register_namespaces
+    register_namespaces(api)
+
+    # Tokens révoqués / admins rétrogradés (voir app/utils/authz.py)
+    from app.utils.authz import role_cache
+    role_cache.init_app(app)
+    jwt.token_in_blocklist_loader(lambda jwt_header, jwt_payload: role_cache.is_revoked(jwt_payload))
+
+    # Configuration du cache de la facade
+    from app.services import facade
+    facade.init_app(app)
+
+    # Index plein texte de /places/search, tenu à jour au flush (voir app/persistence/search.py)
+    from app.persistence.search import search_index
+    search_index.init_app(app)
+
+    # Nombre de lignes par table pour /debug/tables, rafraîchi en arrière-plan
+    from app.services.table_stats import table_stats
+    table_stats.init_app(app)
+
+    # Compression des réponses négociée avec Accept-Encoding (voir app/utils/compression.py)
+    from app.utils.compression import response_compressor
+    response_compressor.init_app(app)
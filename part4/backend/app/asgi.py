@@ -0,0 +1,226 @@
+"""Mode de service ASGI : uvicorn asgi:app
+
+Les GET des places et des reviews (ASGI_ASYNC_PREFIXES), surtout de la
+lecture SQL, sont servis sur la boucle asyncio : la vue Flask habituelle
+tourne dans une greenlet (greenlet_spawn de SQLAlchemy) avec la session
+liée à un AsyncEngine sur la même base (aiosqlite en local). Chaque
+requête SQL rend la main à la boucle au lieu de bloquer un thread, et des
+centaines de connexions lentes ne coûtent pas un thread chacune.
+Même code, mêmes hooks (ETag, compression, métriques, CORS) : le contrat
+de l'API ne change pas. Rien de bloquant sur la boucle : la compression
+est faite ensuite dans le pool de threads, et le cache Redis de la facade
+est contourné (lecture SQL directe, qui rend la main à la boucle).
+
+Tout le reste (écritures, login et bcrypt, front, export, import) passe par
+l'app WSGI dans un pool de ASGI_THREADS threads, réponses streamées
+comprises. Le corps de ces requêtes est lu au fil de l'eau : wsgi.input
+tire les messages de receive() à mesure que la vue le lit, sans jamais
+charger tout le corps en mémoire.
+"""
+import asyncio
+import io
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import nullcontext
+from sqlalchemy.util import greenlet_spawn
+from werkzeug.wrappers import Request, Response
+from app import db
+from app.persistence.engine import create_async_engine
+from app.persistence.routing import async_engine_bind
+from app.utils.compression import response_compressor
+from app.utils.metrics import metrics
+
+DEFAULT_ASYNC_PREFIXES = ("/api/v1/places", "/api/v1/reviews")
+
+
+def wsgi_environ(scope, stream):
+    """Environ WSGI (PEP 3333) d'une requête HTTP ASGI, corps lu dans `stream`"""
+    server = scope.get("server") or ("localhost", 80)
+    client = scope.get("client") or ("", 0)
+    environ = {
+        "REQUEST_METHOD": scope["method"],
+        "SCRIPT_NAME": scope.get("root_path", "").encode("utf-8").decode("latin-1"),
+        "PATH_INFO": scope["path"].encode("utf-8").decode("latin-1"),
+        "QUERY_STRING": scope["query_string"].decode("latin-1"),
+        "SERVER_NAME": server[0],
+        "SERVER_PORT": str(server[1]),
+        "SERVER_PROTOCOL": f"HTTP/{scope.get('http_version', '1.1')}",
+        "REMOTE_ADDR": client[0],
+        "REMOTE_PORT": str(client[1]),
+        "wsgi.version": (1, 0),
+        "wsgi.url_scheme": scope.get("scheme", "http"),
+        "wsgi.input": stream,
+        # Fin du corps signalée par receive() : lisible sans Content-Length (chunked)
+        "wsgi.input_terminated": True,
+        "wsgi.errors": sys.stderr,
+        "wsgi.multithread": True,
+        "wsgi.multiprocess": True,
+        "wsgi.run_once": False,
+    }
+    for name, value in scope["headers"]:
+        name = name.decode("latin-1").upper().replace("-", "_")
+        value = value.decode("latin-1")
+        key = name if name in ("CONTENT_TYPE", "CONTENT_LENGTH") else f"HTTP_{name}"
+        environ[key] = f"{environ[key]},{value}" if key in environ else value
+    return environ
+
+
+def _start_message(status, headers):
+    return {"type": "http.response.start", "status": int(status.split(" ", 1)[0]),
+            "headers": [(name.lower().encode("latin-1"), value.encode("latin-1"))
+                        for name, value in headers]}
+
+
+class ReceiveStream(io.RawIOBase):
+    """Corps de la requête lu à la demande depuis receive(), pour un thread du pool"""
+
+    def __init__(self, receive, loop):
+        self._receive = receive
+        self._loop = loop
+        self._buffer = b""
+        self._done = False
+
+    def readable(self):
+        return True
+
+    def readinto(self, buffer):
+        while not self._buffer and not self._done:
+            message = asyncio.run_coroutine_threadsafe(self._receive(), self._loop).result()
+            if message["type"] == "http.disconnect":
+                self._done = True
+                break
+            self._buffer += message.get("body", b"")
+            self._done = not message.get("more_body")
+        size = min(len(buffer), len(self._buffer))
+        buffer[:size] = self._buffer[:size]
+        self._buffer = self._buffer[size:]
+        return size
+
+
+async def _read_body(receive):
+    """Corps entier, pour les GET asynchrones seulement (vides en pratique)"""
+    chunks = []
+    while True:
+        message = await receive()
+        if message["type"] == "http.disconnect":
+            break
+        chunks.append(message.get("body", b""))
+        if not message.get("more_body"):
+            break
+    return b"".join(chunks)
+
+
+class HBnBASGI:
+    def __init__(self, flask_app, async_prefixes=None, threads=None):
+        self.flask_app = flask_app
+        self.async_prefixes = tuple(flask_app.config.get("ASGI_ASYNC_PREFIXES", DEFAULT_ASYNC_PREFIXES)
+                                    if async_prefixes is None else async_prefixes)
+        self.threads = threads or flask_app.config.get("ASGI_THREADS", 8)
+        self._executor = ThreadPoolExecutor(max_workers=self.threads, thread_name_prefix="wsgi")
+        self._engine = None
+
+    @property
+    def engine(self):
+        """AsyncEngine sur la base de l'app, créé à la première requête asynchrone"""
+        if self._engine is None:
+            config = self.flask_app.config
+            with self.flask_app.app_context():
+                url = db.engine.url  # chemin SQLite déjà résolu dans instance/
+            self._engine = create_async_engine(url, config.get("SQLALCHEMY_ENGINE_OPTIONS", {}),
+                                               config.get("SQLITE_PRAGMAS"))
+            metrics.watch_engine(self._engine.sync_engine)
+        return self._engine
+
+    async def aclose(self):
+        if self._engine is not None:
+            await self._engine.dispose()
+            self._engine = None
+        self._executor.shutdown(wait=False)
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] == "lifespan":
+            return await self._lifespan(receive, send)
+        if scope["type"] != "http":
+            raise RuntimeError(f"Unsupported ASGI scope type: {scope['type']}")
+
+        loop = asyncio.get_running_loop()
+        if scope["method"] in ("GET", "HEAD") and scope["path"].startswith(self.async_prefixes):
+            environ = wsgi_environ(scope, io.BytesIO(await _read_body(receive)))
+            status, headers, chunks = await greenlet_spawn(self._call_flask, environ,
+                                                           self.engine.sync_engine)
+            if scope["method"] == "GET" and response_compressor.enabled:
+                status, headers, chunks = await loop.run_in_executor(
+                    self._executor, self._compress, environ, status, headers, chunks)
+            await send(_start_message(status, headers))
+            await send({"type": "http.response.body", "body": b"".join(chunks)})
+        else:
+            environ = wsgi_environ(scope, io.BufferedReader(ReceiveStream(receive, loop)))
+            await self._call_in_thread(environ, send)
+
+    def _call_flask(self, environ, bind=None):
+        """Appelle l'app WSGI et lit tout le corps : (status, headers, chunks)"""
+        response = {}
+
+        def start_response(status, headers, exc_info=None):
+            response["status"], response["headers"] = status, headers
+
+        with async_engine_bind(bind) if bind is not None else nullcontext():
+            body = self.flask_app(environ, start_response)
+            try:
+                chunks = list(body)
+            finally:
+                if hasattr(body, "close"):
+                    body.close()
+        return response["status"], response["headers"], chunks
+
+    @staticmethod
+    def _compress(environ, status, headers, chunks):
+        """Compression d'une réponse asynchrone, laissée de côté par la vue (voir utils/compression.py)"""
+        response = Response(b"".join(chunks), status=status, headers=headers)
+        if not response_compressor.compressible(response):
+            return status, headers, chunks
+        request = Request(environ)
+        response = response_compressor.compress(response, request.full_path,
+                                                request.headers.get("Accept-Encoding"))
+        return response.status, response.headers.to_wsgi_list(), [response.get_data()]
+
+    async def _call_in_thread(self, environ, send):
+        """App WSGI dans le pool de threads; le corps est envoyé au fil de l'eau"""
+        loop = asyncio.get_running_loop()
+
+        def emit(message):
+            asyncio.run_coroutine_threadsafe(send(message), loop).result()
+
+        def run():
+            response = {}
+
+            def start_response(status, headers, exc_info=None):
+                response["status"], response["headers"] = status, headers
+
+            body = self.flask_app(environ, start_response)
+            try:
+                emit(_start_message(response["status"], response["headers"]))
+                for chunk in body:
+                    if chunk:
+                        emit({"type": "http.response.body", "body": chunk, "more_body": True})
+                emit({"type": "http.response.body", "body": b""})
+            finally:
+                if hasattr(body, "close"):
+                    body.close()
+
+        await loop.run_in_executor(self._executor, run)
+
+    async def _lifespan(self, receive, send):
+        while True:
+            message = await receive()
+            if message["type"] == "lifespan.startup":
+                try:
+                    self.engine
+                except Exception as e:  # driver asyncio absent, base en mémoire...
+                    await send({"type": "lifespan.startup.failed", "message": str(e)})
+                    return
+                await send({"type": "lifespan.startup.complete"})
+            elif message["type"] == "lifespan.shutdown":
+                await self.aclose()
+                await send({"type": "lifespan.shutdown.complete"})
+                return
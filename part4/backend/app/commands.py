@@ -0,0 +1,122 @@
+# app/commands.py
+
+import click
+
+
+def init_commands(app):
+    """
+    Commandes CLI de maintenance (flask --app run <commande>).
+    """
+    @app.cli.command("rebuild-rating-stats")
+    def rebuild_rating_stats():
+        """Recalcule place_rating_stats depuis la table reviews."""
+        from app import db
+        from app.services import facade
+
+        db.create_all()  # crée place_rating_stats si la base est antérieure
+        count = facade.rebuild_rating_stats()
+        click.echo(f"✅ Rating stats rebuilt for {count} places")
+
+    @app.cli.command("rebuild-search-index")
+    def rebuild_search_index():
+        """Reconstruit l'index plein texte de /places/search."""
+        from app import db
+        from app.persistence.search import search_index
+
+        backend = search_index.rebuild(db.session)
+        db.session.commit()
+        click.echo(f"✅ Search index rebuilt ({backend.name} backend)")
+
+    @app.cli.command("upgrade-db")
+    def upgrade_db():
+        """Met à niveau une base existante : tables, colonnes (updated_at...) et index ajoutés depuis.
+
+        À lancer à chaque déploiement, avant de démarrer l'app; sans effet sur une base à jour.
+        """
+        from app.persistence.schema import upgrade_schema
+
+        changes = upgrade_schema()
+        for change in changes:
+            click.echo(f"  + {change}")
+        click.echo(f"✅ Database up to date ({len(changes)} changes)")
+
+    @app.cli.command("backfill-geohash")
+    def backfill_geohash():
+        """Ajoute/remplit la colonne places.geohash sur une base existante (inclus dans upgrade-db)."""
+        from sqlalchemy import inspect, text
+        from app import db
+        from app.models import Place
+        from app.utils.geo import encode_geohash
+
+        columns = [c["name"] for c in inspect(db.engine).get_columns("places")]
+        if "geohash" not in columns:
+            db.session.execute(text("ALTER TABLE places ADD COLUMN geohash VARCHAR(12)"))
+            db.session.execute(text("CREATE INDEX ix_places_geohash ON places (geohash)"))
+
+        count = 0
+        for place in Place.query.filter(Place.geohash.is_(None)).yield_per(1000):
+            place.geohash = encode_geohash(place.latitude, place.longitude)
+            count += 1
+        db.session.commit()
+        click.echo(f"✅ Geohash computed for {count} places")
+
+    @app.cli.command("import-data")
+    @click.argument("kind", type=click.Choice(["users", "amenities", "places", "reviews"]))
+    @click.argument("path", type=click.Path(exists=True, dir_okay=False))
+    @click.option("--format", "fmt", type=click.Choice(["ndjson", "csv"]), default=None,
+                  help="Format du fichier (déduit de l'extension par défaut).")
+    @click.option("--batch-size", default=1000, show_default=True)
+    @click.option("--import-id", default=None,
+                  help="Identifiant de reprise (par défaut : <kind>:<chemin>).")
+    def import_data(kind, path, fmt, batch_size, import_id):
+        """Import en masse d'un fichier NDJSON/CSV, reprend au dernier lot commité."""
+        import os
+        from app.services.bulk_import import BulkImporter, read_records
+
+        fmt = fmt or ("csv" if path.lower().endswith(".csv") else "ndjson")
+        import_id = import_id or f"{kind}:{os.path.abspath(path)}"
+        importer = BulkImporter(kind, import_id, batch_size)
+
+        def show(stats):
+            click.echo(f"  batch {stats['batch']:5d}: {stats['rows']} rows "
+                       f"({stats['inserted']} inserted, {stats['updated']} updated, "
+                       f"{stats['errors']} errors) in {stats['seconds']}s "
+                       f"— {stats['rows_per_sec']} rows/s")
+
+        with open(path, newline="", encoding="utf-8") as stream:
+            report = importer.run(read_records(stream, fmt), on_batch=show)
+
+        if report["resumed_after_batch"]:
+            click.echo(f"↪️  Resumed after batch {report['resumed_after_batch']}")
+        for error in report["errors"][:20]:
+            click.echo(f"  ⚠️ row {error['row']}: {error['error']}")
+        if report["failed_batch"]:
+            raise click.ClickException(
+                f"batch {report['failed_batch']} failed: {report['error']} "
+                f"(run the same command again to resume)")
+        click.echo(f"✅ {report['inserted']} inserted, {report['updated']} updated, "
+                   f"{len(report['errors'])} rejected")
+
+    @app.cli.command("replicate")
+    @click.option("--lag", default=2.0, show_default=True, help="Seconds between two copies")
+    @click.option("--once", is_flag=True, help="Copy once and exit")
+    def replicate(lag, once):
+        """Simule des réplicas SQLite en retard de `lag` secondes sur la primaire."""
+        from app import db
+        from app.persistence.replication import ReplicationLagSimulator
+        from app.persistence.routing import REPLICA_PREFIX
+
+        replicas = [engine.url.database for key, engine in db.engines.items()
+                    if key and key.startswith(REPLICA_PREFIX)]
+        if db.engine.dialect.name != "sqlite" or not replicas:
+            raise click.ClickException("Set DATABASE_REPLICA_URLS to sqlite:/// files first")
+
+        simulator = ReplicationLagSimulator(db.engine.url.database, replicas, lag)
+        simulator.sync_once()
+        click.echo(f"✅ {len(replicas)} replica(s) synced from {db.engine.url.database}")
+        if not once:
+            click.echo(f"Replicating every {lag}s, Ctrl+C to stop")
+            try:
+                simulator.run()
+            except KeyboardInterrupt:
+                pass
@@ -3,5 +3,8 @@ from app.models.place import Place
 from app.models.review import Review
 from app.models.amenity import Amenity
 from app.models.place_amenity import PlaceAmenity
+from app.models.place_rating_stats import PlaceRatingStats
+from app.models.import_checkpoint import ImportCheckpoint
+from app.models.revoked_token import RevokedToken
 
 # Tu peux aussi ajouter d'autres modèles ici si besoin
@@ -1,5 +1,6 @@
 from app import db  # ton instance SQLAlchemy
 import uuid
+from datetime import datetime
 from app.models.place_amenity import PlaceAmenity
 
 class Amenity(db.Model):
@@ -8,6 +9,7 @@ class Amenity(db.Model):
 
     id = db.Column(db.String(36), primary_key=True, default=lambda: str(uuid.uuid4()))
     name = db.Column(db.String(128), nullable=False, unique=True)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
 
     # One to Many relationship
     place_amenities = db.relationship(
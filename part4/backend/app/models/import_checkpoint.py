@@ -0,0 +1,15 @@
+from app import db
+from datetime import datetime
+
+
+class ImportCheckpoint(db.Model):
+    """Avancement d'un import en masse : permet de reprendre après un échec"""
+
+    __tablename__ = "import_checkpoints"
+
+    import_id = db.Column(db.String(255), primary_key=True)
+    kind = db.Column(db.String(32), nullable=False)
+    batch_size = db.Column(db.Integer, nullable=False)
+    batches_committed = db.Column(db.Integer, nullable=False, default=0)
+    rows_committed = db.Column(db.Integer, nullable=False, default=0)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
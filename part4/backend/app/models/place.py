@@ -1,6 +1,9 @@
 from app import db
 import uuid
+from datetime import datetime
+from sqlalchemy import event
 from app.models.place_amenity import PlaceAmenity
+from app.utils.geo import encode_geohash
 
 class Place(db.Model):
     
@@ -9,10 +12,13 @@ class Place(db.Model):
     id = db.Column(db.String(36), primary_key=True, default=lambda: str(uuid.uuid4()))
     title = db.Column(db.String(128), nullable=False)
     description = db.Column(db.String(128), nullable=False)
-    price = db.Column(db.Float(128), nullable=False)
+    price = db.Column(db.Float(128), nullable=False, index=True)
     latitude = db.Column(db.Float(128), nullable=False)
     longitude = db.Column(db.Float(128), nullable=False)
-    owner_id = db.Column(db.String(128), nullable=False)
+    # Calculé depuis latitude/longitude, indexé pour les recherches géographiques
+    geohash = db.Column(db.String(12), index=True)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, index=True)
+    owner_id = db.Column(db.String(128), nullable=False, index=True)
     user_id = db.Column(db.String(128), nullable=False)
 
     # One to Many relationship
@@ -24,6 +30,13 @@ class Place(db.Model):
 
     user_id = db.Column(db.Integer, db.ForeignKey("users.id"), nullable=False)
 
+    # Agrégats des notes (nombre, moyenne, histogramme)
+    rating_stats = db.relationship(
+        "PlaceRatingStats",
+        uselist=False,
+        cascade="all, delete-orphan"
+    )
+
     @property
     def amenities(self):
         """Retourne la liste des Amenity liées via PlaceAmenity"""
@@ -32,3 +45,11 @@ class Place(db.Model):
     def add_amenity(self, amenity):
         pa = PlaceAmenity(place=self, amenity=amenity)
         db.session.add(pa)
+
+
+@event.listens_for(Place, "before_insert")
+@event.listens_for(Place, "before_update")
+def _set_geohash(mapper, connection, place):
+    """Tient la colonne geohash à jour quand les coordonnées changent"""
+    if place.latitude is not None and place.longitude is not None:
+        place.geohash = encode_geohash(place.latitude, place.longitude)
@@ -0,0 +1,33 @@
+from app import db
+from datetime import datetime
+
+
+class PlaceRatingStats(db.Model):
+    """Agrégats des notes d'une place, tenus à jour à chaque écriture de review"""
+
+    __tablename__ = "place_rating_stats"
+
+    place_id = db.Column(db.String(36), db.ForeignKey("places.id"), primary_key=True)
+    review_count = db.Column(db.Integer, nullable=False, default=0)
+    rating_sum = db.Column(db.Integer, nullable=False, default=0)
+
+    # Histogramme : nombre de reviews par note
+    rating_1 = db.Column(db.Integer, nullable=False, default=0)
+    rating_2 = db.Column(db.Integer, nullable=False, default=0)
+    rating_3 = db.Column(db.Integer, nullable=False, default=0)
+    rating_4 = db.Column(db.Integer, nullable=False, default=0)
+    rating_5 = db.Column(db.Integer, nullable=False, default=0)
+
+    # server_default : aussi rempli par le INSERT ... SELECT du rebuild
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow,
+                           server_default=db.func.now())
+
+    @property
+    def average(self):
+        if not self.review_count:
+            return None
+        return round(self.rating_sum / self.review_count, 2)
+
+    @property
+    def histogram(self):
+        return {str(i): getattr(self, f"rating_{i}") for i in range(1, 6)}
@@ -5,6 +5,10 @@ import uuid
 class Review(db.Model):
 
     __tablename__ = "reviews"
+    __table_args__ = (
+        # Sert la liste des reviews d'une place triée par date
+        db.Index("idx_review_place_created", "place_id", "created_at"),
+    )
 
     id = db.Column(db.String(36), primary_key=True, default=lambda: str(uuid.uuid4()))
     text = db.Column(db.Text, nullable=True)
@@ -13,7 +17,7 @@ class Review(db.Model):
     place_id = db.Column(db.String(36), db.ForeignKey("places.id"), nullable=False)
 
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
-    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, index=True)
 
     # Relation vers Place
     place = db.relationship("Place", backref="reviews", lazy=True)
@@ -0,0 +1,11 @@
+from app import db
+
+
+class RevokedToken(db.Model):
+    """Token révoqué (logout) : refusé par tous les workers jusqu'à son expiration"""
+
+    __tablename__ = "revoked_tokens"
+
+    jti = db.Column(db.String(36), primary_key=True)
+    # Expiration du token : la ligne peut être supprimée ensuite
+    expires_at = db.Column(db.DateTime, nullable=False, index=True)
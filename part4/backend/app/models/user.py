@@ -1,5 +1,7 @@
-from app import db, bcrypt
+from app import db
+from app.utils.password_hasher import password_hasher
 import uuid
+from datetime import datetime
 
 class User(db.Model):
     __tablename__ = "users"
@@ -10,6 +12,9 @@ class User(db.Model):
     email = db.Column(db.String(128), unique=True, nullable=False)
     _password = db.Column(db.String(128), name='password', nullable=False)
     is_admin = db.Column(db.Boolean, default=False, nullable=False)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, index=True)
+    # Recherche sans casse de l'import en masse (emails existants enregistrés tels que saisis)
+    __table_args__ = (db.Index("idx_user_email_lower", db.func.lower(email)),)
 
     # One to Many relationship
     places = db.relationship('Place', backref='owner', lazy=True)
@@ -28,10 +33,9 @@ class User(db.Model):
     @password.setter
     def password(self, plain_password):
         """Hash automatiquement le mot de passe quand on le définit"""
-        hashed = bcrypt.generate_password_hash(plain_password)
-        # Compatible toutes versions de flask-bcrypt
-        self._password = hashed.decode('utf-8') if isinstance(hashed, bytes) else hashed
+        # Coût BCRYPT_LOG_ROUNDS, calculé dans le pool de hachage
+        self._password = password_hasher.hash(plain_password)
 
     def verify_password(self, password):
         """Vérifie si le mot de passe correspond au hash"""
-        return bcrypt.check_password_hash(self._password, password)
\ No newline at end of file
+        return password_hasher.verify(self._password, password)
\ No newline at end of file
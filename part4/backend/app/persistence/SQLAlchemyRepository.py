@@ -1,38 +1,343 @@
+import base64
+import binascii
+import json
+from datetime import datetime
+from sqlalchemy import and_, case, func, insert, inspect, or_, select
+from sqlalchemy.dialects import mysql, postgresql, sqlite
+from sqlalchemy.orm import joinedload, selectinload
 from app import db  # Assuming you have set up SQLAlchemy in your Flask app
-from app.models import User, Place, Review, Amenity  # Import your models
+from app.models import User, Place, Review, Amenity, PlaceAmenity, PlaceRatingStats  # Import your models
 from app.persistence.repository import Repository
+from app.persistence.routing import read_replica
+from app.persistence.search import search_index
+from app.persistence.unit_of_work import commit
+from app.utils.geo import cover_bbox, split_bbox
+
+# INSERT ... ON CONFLICT DO UPDATE par moteur (MySQL : ON DUPLICATE KEY UPDATE)
+UPSERT_INSERTS = {"sqlite": sqlite.insert, "postgresql": postgresql.insert}
+
+
+def encode_cursor(values):
+    """Encode les valeurs de la dernière ligne d'une page en token opaque"""
+    raw = json.dumps(values, separators=(",", ":")).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def decode_cursor(token):
+    """Décode un token de pagination, lève ValueError s'il est invalide"""
+    padding = "=" * (-len(token) % 4)
+    try:
+        values = json.loads(base64.urlsafe_b64decode(token + padding))
+    except (ValueError, binascii.Error):
+        raise ValueError("Invalid cursor")
+    if not isinstance(values, list) or len(values) != 3:
+        raise ValueError("Invalid cursor")
+    return values
+
+
+def decode_page_cursor(token, sort_key, column):
+    """(last_value, last_id) d'un curseur de get_page; ValueError si le tri ne correspond
+    pas ou si les valeurs ne sont pas du type de la colonne triée (curseur forgé)"""
+    cursor_sort, last_value, last_id = decode_cursor(token)
+    if cursor_sort != sort_key:
+        raise ValueError("Cursor does not match the requested sort")
+    if not isinstance(last_id, str):
+        raise ValueError("Invalid cursor")
+    expected = column.type.python_type
+    if expected is datetime:
+        try:
+            return datetime.fromisoformat(last_value), last_id
+        except (TypeError, ValueError):
+            raise ValueError("Invalid cursor")
+    if expected is float:
+        valid = isinstance(last_value, (int, float)) and not isinstance(last_value, bool)
+    else:
+        valid = type(last_value) is expected  # bool n'est pas un int ici
+    if not valid:
+        raise ValueError("Invalid cursor")
+    return last_value, last_id
+
+
+# Profils de chargement : quelles relations charger en avance selon l'endpoint.
+# selectinload = 1 requête "IN" par relation, joinedload = JOIN dans la même requête.
+LOAD_PROFILES = {
+    Place: {
+        "list": lambda: [
+            selectinload(Place.place_amenities).joinedload(PlaceAmenity.amenity),
+            joinedload(Place.rating_stats)
+        ],
+        "detail": lambda: [
+            selectinload(Place.place_amenities).joinedload(PlaceAmenity.amenity),
+            joinedload(Place.rating_stats)
+        ],
+        "with_reviews": lambda: [
+            selectinload(Place.place_amenities).joinedload(PlaceAmenity.amenity),
+            joinedload(Place.rating_stats),
+            selectinload(Place.reviews).joinedload(Review.user)
+        ],
+    },
+    Review: {
+        "list": lambda: [joinedload(Review.user)],
+        "detail": lambda: [joinedload(Review.user)],
+    },
+}
+
 
 class SQLAlchemyRepository(Repository):
     def __init__(self, model):
         self.model = model
 
+    def query(self, profile=None):
+        """Base query of the model with the loading options of a profile"""
+        if profile is None:
+            return self.model.query
+        profiles = LOAD_PROFILES.get(self.model, {})
+        if profile not in profiles:
+            raise ValueError(f"Unknown load profile '{profile}' for {self.model.__name__}")
+        return self.model.query.options(*profiles[profile]())
+
     def add(self, obj):
         db.session.add(obj)
-        db.session.commit()
+        commit()
+
+    def add_many(self, objs):
+        """Add several objects with a single commit"""
+        db.session.add_all(objs)
+        db.session.flush()
+        ids = [obj.id for obj in objs]
+        commit()
+        # Le commit expire les objets : un seul SELECT pour les recharger tous, pas un par objet
+        if objs and inspect(objs[0]).expired:
+            self.get_by_ids(ids)
+        return objs
 
-    def get(self, obj_id):
-        return self.model.query.get(obj_id)
+    # Lectures simples : routées vers un réplica s'il y en a (voir persistence/routing.py).
+    # primary=True : lecture avant une écriture, une validation ou un remplissage du cache,
+    # qui doit voir le dernier commit (populate_existing : pas de copie déjà en session)
+    def get(self, obj_id, profile=None, primary=False):
+        if primary:
+            return self.query(profile).populate_existing().get(obj_id)
+        with read_replica(db.session):
+            return self.query(profile).get(obj_id)
 
-    def get_all(self):
-        return self.model.query.all()
+    def get_all(self, profile=None, primary=False):
+        if primary:
+            return self.query(profile).populate_existing().all()
+        with read_replica(db.session):
+            return self.query(profile).all()
 
     def update(self, obj_id, data):
-        obj = self.get(obj_id)
+        obj = self.get(obj_id, primary=True)
         if obj:
             for key, value in data.items():
                 setattr(obj, key, value)
-            db.session.commit()
+            commit()
+        return obj
+
+    def update_many(self, data_by_id):
+        """Apply {id: data} with one IN query and a single commit; returns the updated objects"""
+        objs = self.get_by_ids(list(data_by_id))
+        for obj in objs:
+            for key, value in data_by_id[obj.id].items():
+                setattr(obj, key, value)
+        commit()
+        return objs
 
     def delete(self, obj_id):
-        obj = self.get(obj_id)
+        obj = self.get(obj_id, primary=True)
         if obj:
             db.session.delete(obj)
-            db.session.commit()
+            commit()
+
+    def delete_many(self, obj_ids):
+        """Delete several objects with one IN query and a single commit; returns the deleted count"""
+        objs = self.get_by_ids(list(obj_ids))
+        for obj in objs:
+            db.session.delete(obj)
+        commit()
+        return len(objs)
+
+    def get_by_ids(self, ids, profile=None):
+        """Fetch several objects with a single IN query"""
+        if not ids:
+            return []
+        return self.query(profile).filter(self.model.id.in_(ids)).all()
+
+    def get_by_attribute(self, attr_name, attr_value, primary=False):
+        query = self.model.query.filter(getattr(self.model, attr_name) == attr_value)
+        if primary:
+            return query.populate_existing().first()
+        with read_replica(db.session):
+            return query.first()
+
+    def get_by_attribute_in(self, attr_name, values, primary=False):
+        """Objects whose attribute is one of `values`, with a single IN query"""
+        if not values:
+            return []
+        query = self.model.query.filter(getattr(self.model, attr_name).in_(list(values)))
+        if primary:
+            return query.populate_existing().all()
+        with read_replica(db.session):
+            return query.all()
 
-    def get_by_attribute(self, attr_name, attr_value):
-        return self.model.query.filter(getattr(self.model, attr_name) == attr_value).first()
+    def get_version(self, query=None):
+        """(row count, latest updated_at) of a query: cheap version of a collection"""
+        if query is None:
+            query = self.model.query
+        return tuple(query.with_entities(func.count(self.model.id), func.max(self.model.updated_at)).one())
+
+    def get_page(self, query=None, sort_attr="id", descending=False, limit=20, cursor=None,
+                 profile=None):
+        """Keyset pagination on (sort_attr, id).
+
+        Returns (items, next_cursor); next_cursor is None on the last page.
+        Only `limit + 1` rows are read, whatever the size of the table.
+        """
+        if query is None:
+            query = self.query(profile)
+        sort_col = getattr(self.model, sort_attr)
+        id_col = self.model.id
+        sort_key = ("-" if descending else "") + sort_attr
+
+        if cursor:
+            last_value, last_id = decode_page_cursor(cursor, sort_key, sort_col)
+            if descending:
+                query = query.filter(or_(sort_col < last_value,
+                                         and_(sort_col == last_value, id_col < last_id)))
+            else:
+                query = query.filter(or_(sort_col > last_value,
+                                         and_(sort_col == last_value, id_col > last_id)))
+
+        if descending:
+            query = query.order_by(sort_col.desc(), id_col.desc())
+        else:
+            query = query.order_by(sort_col.asc(), id_col.asc())
+
+        rows = query.limit(limit + 1).all()
+        next_cursor = None
+        if len(rows) > limit:
+            rows = rows[:limit]
+            last = rows[-1]
+            last_value = getattr(last, sort_attr)
+            if isinstance(last_value, datetime):
+                last_value = last_value.isoformat()
+            next_cursor = encode_cursor([sort_key, last_value, last.id])
+        return rows, next_cursor
 
     # Review
     def get_by_user_and_place(self, user_id, place_id):
         """Find a review by a given user for a given place"""
-        return self.model.query.filter_by(user_id=user_id, place_id=place_id).first()
\ No newline at end of file
+        return self.model.query.filter_by(user_id=user_id, place_id=place_id).first()
+
+    def reviewed_place_ids(self, user_id, place_ids):
+        """Among place_ids, the places this user already reviewed (one IN query)"""
+        if not place_ids:
+            return set()
+        rows = db.session.execute(
+            select(self.model.place_id)
+            .where(self.model.user_id == user_id, self.model.place_id.in_(place_ids))
+        )
+        return {place_id for place_id, in rows}
+
+    def filter_by_place(self, place_id, profile=None):
+        """Reviews of a place, filtered in SQL (uses idx_review_place_created)"""
+        return self.query(profile).filter(self.model.place_id == place_id)
+
+    def get_reviews_version(self, place_id):
+        """(count, latest review updated_at, latest author updated_at) of a place's reviews.
+
+        The list embeds the author's name: renaming an author changes the version.
+        """
+        return tuple(db.session.query(func.count(Review.id), func.max(Review.updated_at),
+                                      func.max(User.updated_at))
+                     .join(User, User.id == Review.user_id)
+                     .filter(Review.place_id == place_id).one())
+
+    # Place
+    def filter_places(self, min_price=None, max_price=None, owner_id=None, amenity_ids=None,
+                      profile=None):
+        """Build a Place query with the filters pushed down to SQL"""
+        query = self.query(profile)
+        if min_price is not None:
+            query = query.filter(self.model.price >= min_price)
+        if max_price is not None:
+            query = query.filter(self.model.price <= max_price)
+        if owner_id:
+            query = query.filter(self.model.owner_id == owner_id)
+        # La place doit avoir toutes les amenities demandées
+        for amenity_id in amenity_ids or []:
+            query = query.filter(self.model.place_amenities.any(PlaceAmenity.amenity_id == amenity_id))
+        return query
+
+    def _bbox_condition(self, min_lat, min_lng, max_lat, max_lng):
+        """Geohash prefix ranges (index) + exact lat/lng bounds of the bbox"""
+        geohash = self.model.geohash
+        cells = or_(*[and_(geohash >= prefix, geohash < prefix + "~")
+                      for prefix in cover_bbox(min_lat, min_lng, max_lat, max_lng)])
+        boxes = or_(*[and_(self.model.latitude.between(b_min_lat, b_max_lat),
+                           self.model.longitude.between(b_min_lng, b_max_lng))
+                      for b_min_lat, b_min_lng, b_max_lat, b_max_lng
+                      in split_bbox(min_lat, min_lng, max_lat, max_lng)])
+        return and_(cells, boxes)
+
+    def filter_bbox(self, min_lat, min_lng, max_lat, max_lng, profile=None):
+        """Places inside a bounding box (min_lng > max_lng crosses the antimeridian)"""
+        return self.query(profile).filter(self._bbox_condition(min_lat, min_lng, max_lat, max_lng))
+
+    def bbox_points(self, min_lat, min_lng, max_lat, max_lng):
+        """(id, latitude, longitude) of the places inside a bbox, without loading the rows"""
+        return db.session.query(self.model.id, self.model.latitude, self.model.longitude) \
+            .filter(self._bbox_condition(min_lat, min_lng, max_lat, max_lng)).all()
+
+    def search_places(self, query, limit=20, offset=0):
+        """(place_id, score) matching a full-text query, best match first (see app/persistence/search.py)"""
+        return search_index.search(db.session, query, limit, offset)
+
+    # PlaceRatingStats
+    def apply_rating_delta(self, place_id, rating, delta):
+        """Add (delta=1) or remove (delta=-1) one rating from a place's stats.
+
+        Done with an UPDATE ... SET col = col + delta so that concurrent
+        writers don't overwrite each other. Doesn't commit: the caller
+        commits it together with the review.
+        """
+        histogram_col = getattr(self.model, f"rating_{rating}")
+        increments = {
+            "review_count": self.model.review_count + delta,
+            "rating_sum": self.model.rating_sum + delta * rating,
+            histogram_col.key: histogram_col + delta,
+        }
+        updated = self.model.query.filter_by(place_id=place_id).update(increments, synchronize_session=False)
+
+        # Première review de la place : on crée la ligne. Deux premières reviews
+        # concurrentes voient toutes les deux updated == 0 : l'INSERT ajoute à la
+        # ligne de l'autre en cas de conflit au lieu d'échouer sur la clé primaire
+        if not updated and delta > 0:
+            now = datetime.utcnow()
+            row = dict(place_id=place_id, review_count=delta, rating_sum=delta * rating,
+                       rating_1=0, rating_2=0, rating_3=0, rating_4=0, rating_5=0, updated_at=now)
+            row[histogram_col.key] = delta
+            table = self.model.__table__
+            dialect = db.session.connection().dialect.name
+            if dialect in UPSERT_INSERTS:
+                db.session.execute(UPSERT_INSERTS[dialect](table).values(row).on_conflict_do_update(
+                    index_elements=[table.c.place_id], set_=dict(increments, updated_at=now)))
+            elif dialect in ("mysql", "mariadb"):
+                db.session.execute(mysql.insert(table).values(row).on_duplicate_key_update(
+                    dict(increments, updated_at=now)))
+            else:  # moteur sans upsert
+                db.session.add(self.model(**row))
+
+    def rebuild_rating_stats(self):
+        """Recompute every place's stats from the reviews table (INSERT ... SELECT)"""
+        histogram = [func.sum(case((Review.rating == i, 1), else_=0)) for i in range(1, 6)]
+        aggregates = (
+            select(Review.place_id, func.count(Review.id), func.sum(Review.rating), *histogram)
+            .group_by(Review.place_id)
+        )
+        columns = ["place_id", "review_count", "rating_sum",
+                   "rating_1", "rating_2", "rating_3", "rating_4", "rating_5"]
+
+        db.session.execute(self.model.__table__.delete())
+        db.session.execute(insert(self.model).from_select(columns, aggregates))
+        return self.model.query.count()
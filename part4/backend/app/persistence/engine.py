@@ -0,0 +1,58 @@
+"""Options du moteur SQLAlchemy (pool), PRAGMA SQLite à la connexion, moteur asyncio."""
+from sqlalchemy import event
+from sqlalchemy.engine import make_url
+
+# Driver asyncio de chaque moteur (mode ASGI, voir app/asgi.py)
+ASYNC_DRIVERS = {
+    "sqlite": "sqlite+aiosqlite",
+    "postgresql": "postgresql+asyncpg",
+    "mysql": "mysql+aiomysql",
+    "mariadb": "mariadb+aiomysql",
+}
+
+
+def engine_options(config):
+    """SQLALCHEMY_ENGINE_OPTIONS built from the DB_POOL_* settings"""
+    options = {
+        "pool_pre_ping": config.get("DB_POOL_PRE_PING", True),
+        "pool_recycle": config.get("DB_POOL_RECYCLE", 1800),
+    }
+    url = make_url(config["SQLALCHEMY_DATABASE_URI"])
+    if url.get_backend_name() == "sqlite" and url.database in (None, "", ":memory:"):
+        return options  # une seule connexion partagée : pas de taille de pool
+    options.update(pool_size=config.get("DB_POOL_SIZE", 5),
+                   max_overflow=config.get("DB_MAX_OVERFLOW", 10),
+                   pool_timeout=config.get("DB_POOL_TIMEOUT", 30))
+    return options
+
+
+def apply_sqlite_pragmas(engine, pragmas):
+    """Exécute les PRAGMA à chaque nouvelle connexion SQLite du pool"""
+    if engine.dialect.name != "sqlite" or not pragmas:
+        return
+
+    @event.listens_for(engine, "connect")
+    def _set_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        for name, value in pragmas.items():
+            cursor.execute(f"PRAGMA {name}={value}")
+        cursor.close()
+
+
+def async_url(url):
+    """Même base, driver asyncio (sqlite -> sqlite+aiosqlite...); lève ValueError"""
+    url = make_url(url)
+    backend = url.get_backend_name()
+    if backend not in ASYNC_DRIVERS:
+        raise ValueError(f"No asyncio driver for '{backend}' databases")
+    if backend == "sqlite" and url.database in (None, "", ":memory:"):
+        raise ValueError("An in-memory SQLite database cannot be shared with an async engine")
+    return url.set(drivername=ASYNC_DRIVERS[backend])
+
+
+def create_async_engine(url, options, pragmas=None):
+    """AsyncEngine sur la même base que `url`, avec les mêmes options de pool et PRAGMA"""
+    from sqlalchemy.ext.asyncio import create_async_engine as _create  # driver requis : aiosqlite...
+    engine = _create(async_url(url), **options)
+    apply_sqlite_pragmas(engine.sync_engine, pragmas)
+    return engine
@@ -0,0 +1,411 @@
+"""Repository en mémoire, avec index secondaires, pour les tests et les déploiements éphémères.
+
+Même interface que SQLAlchemyRepository (celle qu'utilise HBnBFacade) :
+
+    facade = HBnBFacade(repository_class=InMemoryRepository)
+
+- Index secondaires déclarés par modèle (email, place_id, user_id+place_id...) :
+  valeur(s) -> ids, au lieu d'un parcours de toute la table.
+- Index triés sur les champs numériques (price, latitude...) pour les
+  requêtes par intervalle (bisect).
+- Les index suivent toutes les modifications : update() du repository, mais
+  aussi les setattr faits directement sur l'objet (événement "set" de
+  SQLAlchemy sur les colonnes indexées). Un seul listener par colonne, pour
+  tous les repositories (WeakSet) : un repository abandonné ne reste pas
+  accroché au modèle.
+- Toutes les opérations passent par un verrou : utilisable depuis plusieurs threads.
+
+- search_places : index de mots (mot -> places) sur titre, description et
+  reviews, mis à jour à la recherche suivante pour les places touchées ;
+  mêmes règles que app/persistence/search.py (préfixe, tous les termes,
+  accents ignorés), score pondéré par colonne au lieu de BM25.
+- rebuild_rating_stats recompte les agrégats à partir des reviews stockées.
+  Les repositories d'une même facade se connaissent via link().
+
+Les objets sont ceux du modèle SQLAlchemy, jamais ajoutés à une session. Les
+profils de chargement sont ignorés, et les relations vers des objets d'un
+autre repository (review.user, place.rating_stats) ne sont pas reliées.
+"""
+import threading
+import unicodedata
+import weakref
+from bisect import bisect_left, bisect_right, insort
+from collections import defaultdict
+from datetime import datetime
+from sqlalchemy import event, inspect
+from app.models import Place, PlaceAmenity, PlaceRatingStats, Review, User, Amenity
+from app.persistence.repository import Repository
+from app.persistence.SQLAlchemyRepository import decode_page_cursor, encode_cursor
+from app.persistence.search import WEIGHTS, _TERM, parse_terms
+from app.utils.geo import split_bbox
+
+# Index par défaut de chaque modèle : (attributs, unique)
+DEFAULT_INDEXES = {
+    User: [(("email",), True)],
+    Amenity: [(("name",), True)],
+    Place: [(("owner_id",), False)],
+    Review: [(("place_id",), False), (("user_id",), False), (("user_id", "place_id"), True)],
+    PlaceAmenity: [(("place_id",), False), (("amenity_id",), False)],
+}
+DEFAULT_RANGE_INDEXES = {
+    Place: ["price", "latitude", "longitude"],
+    Review: ["rating"],
+}
+
+
+# Colonnes du document de recherche d'une place (Review.place_id : le document change de place)
+SEARCH_COLUMNS = {Place: ("title", "description"), Review: ("text", "place_id")}
+
+# Repositories vivants par modèle, et colonnes déjà écoutées : (modèle, attribut)
+_REPOSITORIES = defaultdict(weakref.WeakSet)
+_LISTENED = set()
+
+
+def _dispatch_set(target, value, oldvalue, initiator):
+    """Listener "set" partagé : prévient chaque repository du modèle (s'il stocke l'objet)"""
+    for repository in list(_REPOSITORIES.get(type(target), ())):
+        repository._on_set(target, value, oldvalue, initiator)
+
+
+def _words(text):
+    """Mots en minuscules et sans accents (comme le tokenizer FTS5 unicode61 remove_diacritics)"""
+    text = unicodedata.normalize("NFKD", (text or "").lower())
+    return _TERM.findall("".join(char for char in text if not unicodedata.combining(char)))
+
+
+class MemoryQuery(list):
+    """Résultat de filtre : une liste qui répond aussi à order_by / limit / all comme une Query"""
+
+    def order_by(self, *columns):
+        keys = [column.key for column in columns]
+        return MemoryQuery(sorted(self, key=lambda obj: tuple(getattr(obj, k) for k in keys)))
+
+    def limit(self, count):
+        return MemoryQuery(self[:count])
+
+    def all(self):
+        return list(self)
+
+
+class InMemoryRepository(Repository):
+    def __init__(self, model, indexes=None, range_indexes=None):
+        self.model = model
+        self.pk = inspect(model).primary_key[0].key
+        self._storage = {}
+        self._lock = threading.RLock()
+        self._indexes = {attrs: (unique, defaultdict(set))
+                         for attrs, unique in (indexes if indexes is not None
+                                               else DEFAULT_INDEXES.get(model, []))}
+        self._ranges = {attr: [] for attr in (range_indexes if range_indexes is not None
+                                              else DEFAULT_RANGE_INDEXES.get(model, []))}
+        self._keys = {}  # id -> {attrs: clé indexée}, pour retirer l'ancienne clé
+        self._related = {model: self}  # repositories de la même facade (link)
+
+        # Recherche (repository des places) : mot -> ids, id -> {mot: poids}, places à réindexer
+        self._words = defaultdict(set)
+        self._vocabulary = []  # mots triés, pour les préfixes (bisect)
+        self._documents = {}
+        self._stale = set()
+
+        self._watched = ({a for attrs in self._indexes for a in attrs} | set(self._ranges)
+                         | set(SEARCH_COLUMNS.get(model, ())))
+        _REPOSITORIES[model].add(self)
+        for attr in self._watched:
+            if (model, attr) not in _LISTENED:
+                event.listen(getattr(model, attr), "set", _dispatch_set)
+                _LISTENED.add((model, attr))
+
+    def link(self, repositories):
+        self._related = dict(repositories)
+
+    # --- Index ---
+    def _index_keys(self, obj, override=None):
+        values = dict(override or {})
+        return {attrs: tuple(values[a] if a in values else getattr(obj, a) for a in attrs)
+                for attrs in self._indexes}, \
+               {attr: values[attr] if attr in values else getattr(obj, attr) for attr in self._ranges}
+
+    def _check_unique(self, obj_id, keys):
+        for attrs, key in keys.items():
+            unique, index = self._indexes[attrs]
+            if unique and index.get(key, set()) - {obj_id}:
+                raise ValueError(f"Duplicate {self.model.__name__} {'+'.join(attrs)}: {key}")
+
+    def _index(self, obj_id, keys, ranges):
+        for attrs, key in keys.items():
+            self._indexes[attrs][1][key].add(obj_id)
+        for attr, value in ranges.items():
+            if value is not None:
+                insort(self._ranges[attr], (value, obj_id))
+        self._keys[obj_id] = (keys, ranges)
+
+    def _unindex(self, obj_id):
+        keys, ranges = self._keys.pop(obj_id)
+        for attrs, key in keys.items():
+            ids = self._indexes[attrs][1][key]
+            ids.discard(obj_id)
+            if not ids:
+                del self._indexes[attrs][1][key]
+        for attr, value in ranges.items():
+            if value is not None:
+                entries = self._ranges[attr]
+                del entries[bisect_left(entries, (value, obj_id))]
+
+    def _on_set(self, target, value, oldvalue, initiator):
+        # setattr sur une colonne indexée d'un objet stocké : on déplace ses entrées d'index
+        if initiator.key not in self._watched:
+            return
+        with self._lock:
+            obj_id = getattr(target, self.pk, None)
+            if self._storage.get(obj_id) is not target:
+                return
+            if initiator.key in SEARCH_COLUMNS.get(self.model, ()):
+                self._touch_document(target)
+                if initiator.key == "place_id":
+                    self._touch_document(target, value)
+            keys, ranges = self._index_keys(target, {initiator.key: value})
+            self._check_unique(obj_id, keys)
+            self._unindex(obj_id)
+            self._index(obj_id, keys, ranges)
+
+    def _apply_defaults(self, obj):
+        """Valeurs par défaut des colonnes, normalement remplies au flush"""
+        for column in self.model.__table__.columns:
+            attr = self.model.__mapper__.get_property_by_column(column).key
+            default = column.default
+            if default is not None and getattr(obj, attr) is None:
+                setattr(obj, attr, default.arg(None) if default.is_callable else default.arg)
+
+    def _touch_document(self, obj, place_id=None):
+        """Document de recherche à refaire : la place elle-même, ou la place d'une review"""
+        if self.model in SEARCH_COLUMNS:
+            place_id = place_id or (obj.id if self.model is Place else obj.place_id)
+            self._related.get(Place, self)._stale.add(place_id)
+
+    def _touch(self, obj):
+        for column in self.model.__table__.columns:
+            if column.onupdate is not None and column.onupdate.is_callable:
+                setattr(obj, self.model.__mapper__.get_property_by_column(column).key,
+                        column.onupdate.arg(None))
+
+    # --- Écritures ---
+    def add(self, obj):
+        with self._lock:
+            self._apply_defaults(obj)
+            obj_id = getattr(obj, self.pk)
+            keys, ranges = self._index_keys(obj)
+            self._check_unique(obj_id, keys)
+            if obj_id in self._storage:
+                self._unindex(obj_id)
+                self._touch(obj)  # objet déjà stocké et modifié : comme onupdate au flush
+            self._storage[obj_id] = obj
+            self._index(obj_id, keys, ranges)
+            self._touch_document(obj)
+
+    def add_many(self, objs):
+        with self._lock:
+            for obj in objs:
+                self.add(obj)
+        return objs
+
+    def update(self, obj_id, data):
+        with self._lock:
+            obj = self._storage.get(obj_id)
+            if obj:
+                for key, value in data.items():
+                    setattr(obj, key, value)  # index tenus à jour par _on_set
+                self._touch(obj)
+            return obj
+
+    def update_many(self, data_by_id):
+        with self._lock:
+            return [obj for obj in (self.update(obj_id, data) for obj_id, data in data_by_id.items()) if obj]
+
+    def delete(self, obj_id):
+        with self._lock:
+            if obj_id in self._storage:
+                self._touch_document(self._storage[obj_id])
+                self._unindex(obj_id)
+                del self._storage[obj_id]
+
+    def delete_many(self, obj_ids):
+        with self._lock:
+            existing = [obj_id for obj_id in obj_ids if obj_id in self._storage]
+            for obj_id in existing:
+                self.delete(obj_id)
+            return len(existing)
+
+    # --- Lectures ---
+    # primary : sans objet en mémoire (pas de réplica), accepté pour l'interface SQL
+    def get(self, obj_id, profile=None, primary=False):
+        return self._storage.get(obj_id)
+
+    def get_all(self, profile=None, primary=False):
+        with self._lock:
+            return list(self._storage.values())
+
+    def get_by_ids(self, ids, profile=None):
+        with self._lock:
+            return [self._storage[obj_id] for obj_id in dict.fromkeys(ids) if obj_id in self._storage]
+
+    def filter_by(self, **criteria):
+        """Objets dont les attributs valent `criteria`, via l'index le plus précis disponible"""
+        with self._lock:
+            candidates = None
+            for attrs, (_, index) in sorted(self._indexes.items(), key=lambda item: -len(item[0])):
+                if set(attrs) <= set(criteria):
+                    candidates = index.get(tuple(criteria[a] for a in attrs), set())
+                    break
+            objs = (self._storage[obj_id] for obj_id in candidates) if candidates is not None \
+                else self._storage.values()
+            return MemoryQuery(obj for obj in objs
+                               if all(getattr(obj, k) == v for k, v in criteria.items()))
+
+    def get_by_attribute(self, attr_name, attr_value, primary=False):
+        found = self.filter_by(**{attr_name: attr_value})
+        return found[0] if found else None
+
+    def get_by_attribute_in(self, attr_name, values, primary=False):
+        return [obj for value in dict.fromkeys(values) for obj in self.filter_by(**{attr_name: value})]
+
+    def find_range(self, attr, low=None, high=None):
+        """Objets avec low <= attr <= high (bornes optionnelles), triés par attr"""
+        with self._lock:
+            entries = self._ranges[attr]
+            start = 0 if low is None else bisect_left(entries, (low,))
+            end = len(entries) if high is None else bisect_right(entries, (high, "￿"))
+            return MemoryQuery(self._storage[obj_id] for _, obj_id in entries[start:end])
+
+    def get_version(self, items=None):
+        items = self.get_all() if items is None else items
+        dates = [obj.updated_at for obj in items if obj.updated_at is not None]
+        return len(items), max(dates) if dates else None
+
+    def get_page(self, query=None, sort_attr="id", descending=False, limit=20, cursor=None,
+                 profile=None):
+        """Même pagination par curseur (et mêmes tokens) que SQLAlchemyRepository.get_page"""
+        items = self.get_all() if query is None else list(query)
+        sort_key = ("-" if descending else "") + sort_attr
+        rows = sorted(items, key=lambda obj: (getattr(obj, sort_attr), obj.id), reverse=descending)
+        if cursor:
+            last = decode_page_cursor(cursor, sort_key, getattr(self.model, sort_attr))
+            rows = [obj for obj in rows
+                    if ((getattr(obj, sort_attr), obj.id) < last if descending
+                        else (getattr(obj, sort_attr), obj.id) > last)]
+        next_cursor = None
+        if len(rows) > limit:
+            rows = rows[:limit]
+            last_value = getattr(rows[-1], sort_attr)
+            if isinstance(last_value, datetime):
+                last_value = last_value.isoformat()
+            next_cursor = encode_cursor([sort_key, last_value, rows[-1].id])
+        return rows, next_cursor
+
+    # Review
+    def get_by_user_and_place(self, user_id, place_id):
+        found = self.filter_by(user_id=user_id, place_id=place_id)
+        return found[0] if found else None
+
+    def reviewed_place_ids(self, user_id, place_ids):
+        wanted = set(place_ids)
+        return {review.place_id for review in self.filter_by(user_id=user_id) if review.place_id in wanted}
+
+    def filter_by_place(self, place_id, profile=None):
+        return self.filter_by(place_id=place_id)
+
+    def get_reviews_version(self, place_id):
+        reviews = self.filter_by_place(place_id)
+        users = self._related.get(User)
+        authors = [users.get(review.user_id) for review in reviews] if users else []
+        count, reviews_updated = self.get_version(reviews)
+        return count, reviews_updated, self.get_version([a for a in authors if a])[1]
+
+    # Place
+    def filter_places(self, min_price=None, max_price=None, owner_id=None, amenity_ids=None,
+                      profile=None):
+        if owner_id:
+            places = [p for p in self.filter_by(owner_id=owner_id)
+                      if (min_price is None or p.price >= min_price) and (max_price is None or p.price <= max_price)]
+        else:
+            places = self.find_range("price", min_price, max_price)
+        for amenity_id in amenity_ids or []:
+            places = [p for p in places if any(pa.amenity_id == amenity_id for pa in p.place_amenities)]
+        return MemoryQuery(places)
+
+    def filter_bbox(self, min_lat, min_lng, max_lat, max_lng, profile=None):
+        boxes = split_bbox(min_lat, min_lng, max_lat, max_lng)
+        return MemoryQuery(p for p in self.find_range("latitude", min_lat, max_lat)
+                           if any(b_min_lat <= p.latitude <= b_max_lat and b_min_lng <= p.longitude <= b_max_lng
+                                  for b_min_lat, b_min_lng, b_max_lat, b_max_lng in boxes))
+
+    def bbox_points(self, min_lat, min_lng, max_lat, max_lng):
+        return self.filter_bbox(min_lat, min_lng, max_lat, max_lng)
+
+    # PlaceRatingStats
+    def apply_rating_delta(self, place_id, rating, delta):
+        with self._lock:
+            stats = self._storage.get(place_id)
+            if stats is None:
+                if delta <= 0:
+                    return
+                stats = self.model(place_id=place_id, review_count=0, rating_sum=0,
+                                   rating_1=0, rating_2=0, rating_3=0, rating_4=0, rating_5=0)
+                self.add(stats)
+            stats.review_count += delta
+            stats.rating_sum += delta * rating
+            setattr(stats, f"rating_{rating}", getattr(stats, f"rating_{rating}") + delta)
+
+    def rebuild_rating_stats(self):
+        """Recompte les agrégats de chaque place à partir des reviews stockées"""
+        reviews = self._related[Review].get_all()
+        with self._lock:
+            self.delete_many(list(self._storage))
+            for review in reviews:
+                self.apply_rating_delta(review.place_id, review.rating, 1)
+            return len(self._storage)
+
+    # Place : recherche plein texte
+    def _reindex_document(self, place_id):
+        for word in self._documents.pop(place_id, {}):
+            ids = self._words[word]
+            ids.discard(place_id)
+            if not ids:
+                del self._words[word]
+                del self._vocabulary[bisect_left(self._vocabulary, word)]
+        place = self._storage.get(place_id)
+        if place is None:
+            return
+        columns = (place.title, place.description,
+                   " ".join(review.text or "" for review in self._related[Review].filter_by(place_id=place_id))
+                   if Review in self._related else "")
+        document = {}
+        for text, weight in zip(columns, WEIGHTS):
+            for word in _words(text):
+                document[word] = max(document.get(word, 0.0), weight)
+        for word in document:
+            if word not in self._words:
+                insort(self._vocabulary, word)
+            self._words[word].add(place_id)
+        self._documents[place_id] = document
+
+    def search_places(self, query, limit=20, offset=0):
+        """(place_id, score) de la recherche, du plus pertinent au moins pertinent"""
+        terms = [word for term in parse_terms(query) for word in _words(term)]
+        with self._lock:
+            stale, self._stale = self._stale, set()
+            for place_id in stale:
+                self._reindex_document(place_id)
+
+            scores = None
+            for term in terms:
+                # Mots qui commencent par le terme : tranche du vocabulaire trié
+                start = bisect_left(self._vocabulary, term)
+                end = bisect_left(self._vocabulary, term + "\uffff")
+                matches = defaultdict(float)
+                for word in self._vocabulary[start:end]:
+                    for place_id in self._words[word]:
+                        matches[place_id] = max(matches[place_id], self._documents[place_id][word])
+                scores = matches if scores is None else {
+                    place_id: score + matches[place_id] for place_id, score in scores.items() if place_id in matches}
+            ranked = sorted((scores or {}).items(), key=lambda hit: (-hit[1], hit[0]))
+            return ranked[offset:offset + limit]
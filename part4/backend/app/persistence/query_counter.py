@@ -0,0 +1,43 @@
+import threading
+from contextlib import contextmanager
+from sqlalchemy import event
+from app import db
+
+
+class QueryCounter:
+    """Collecte les requêtes SQL envoyées au moteur par le thread courant
+    (pas celles des threads de fond, ex. services/table_stats.py)"""
+
+    def __init__(self):
+        self.statements = []
+        self._thread = threading.get_ident()
+
+    def __call__(self, conn, cursor, statement, parameters, context, executemany):
+        if threading.get_ident() == self._thread:
+            self.statements.append(statement)
+
+    @property
+    def count(self):
+        return len(self.statements)
+
+
+@contextmanager
+def count_queries(engine=None):
+    """Count the SQL statements executed inside the block"""
+    engine = engine or db.engine
+    counter = QueryCounter()
+    event.listen(engine, "before_cursor_execute", counter)
+    try:
+        yield counter
+    finally:
+        event.remove(engine, "before_cursor_execute", counter)
+
+
+@contextmanager
+def assert_max_queries(max_count, engine=None):
+    """Fail if the block issues more than `max_count` SQL statements (N+1 guard)"""
+    with count_queries(engine) as counter:
+        yield counter
+    if counter.count > max_count:
+        detail = "\n".join(f"  {i + 1}. {sql}" for i, sql in enumerate(counter.statements))
+        raise AssertionError(f"{counter.count} queries executed, max allowed {max_count}:\n{detail}")
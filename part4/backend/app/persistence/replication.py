@@ -0,0 +1,38 @@
+"""Simulateur de réplication SQLite (développement local).
+
+Copie la base primaire dans chaque fichier réplica toutes les `lag` secondes
+avec l'API de backup de sqlite3 : un réplica a donc entre 0 et `lag`
+secondes de retard, comme un vrai réplica asynchrone.
+"""
+import sqlite3
+import time
+
+
+def copy_database(primary_path, replica_path):
+    """Copie cohérente (snapshot) de la base primaire dans un réplica"""
+    source = sqlite3.connect(primary_path)
+    target = sqlite3.connect(replica_path, timeout=5)
+    try:
+        source.backup(target)
+    finally:
+        target.close()
+        source.close()
+
+
+class ReplicationLagSimulator:
+    def __init__(self, primary_path, replica_paths, lag=2.0):
+        self.primary_path = primary_path
+        self.replica_paths = list(replica_paths)
+        self.lag = lag
+        self.syncs = 0
+
+    def sync_once(self):
+        for replica_path in self.replica_paths:
+            copy_database(self.primary_path, replica_path)
+        self.syncs += 1
+
+    def run(self, iterations=None):
+        """Synchronise toutes les `lag` secondes (indéfiniment par défaut)"""
+        while iterations is None or self.syncs < iterations:
+            time.sleep(self.lag)
+            self.sync_once()
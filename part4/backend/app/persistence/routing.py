@@ -0,0 +1,74 @@
+"""Routage lecture / écriture entre la base primaire et ses réplicas.
+
+Les réplicas sont des binds Flask-SQLAlchemy nommés "replica_<n>"
+(config DATABASE_REPLICA_URLS). Seules les lectures faites dans un bloc
+`read_replica(db.session)` partent sur un réplica : tout le reste
+(flush, INSERT/UPDATE/DELETE, lectures hors bloc) va sur la primaire.
+
+Read-your-writes : dès que la session a écrit sur la primaire, toutes ses
+lectures y restent jusqu'à la fin de la requête (la session est recréée à
+chaque requête), pour ne pas relire une version en retard sur un réplica.
+
+En mode ASGI (app/asgi.py), `async_engine_bind` envoie tout le SQL d'une
+requête sur le moteur d'un AsyncEngine, réplicas compris.
+"""
+import random
+from contextlib import contextmanager
+from contextvars import ContextVar
+from sqlalchemy.sql import Select
+from flask_sqlalchemy.session import Session
+
+REPLICA_PREFIX = "replica_"
+
+# Moteur imposé pour la requête en cours (mode ASGI), sinon None
+_async_bind = ContextVar("async_bind", default=None)
+
+
+class RoutingSession(Session):
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        if bind is None and _async_bind.get() is not None:
+            return _async_bind.get()
+        if bind is None:
+            if self._flushing or (clause is not None and not isinstance(clause, Select)):
+                self.info["sticky_primary"] = True
+            elif self.info.get("use_replica") and not self.info.get("sticky_primary"):
+                replicas = [engine for key, engine in self._db.engines.items()
+                            if key and key.startswith(REPLICA_PREFIX)]
+                if replicas:
+                    return random.choice(replicas)
+        return super().get_bind(mapper=mapper, clause=clause, bind=bind, **kwargs)
+
+
+@contextmanager
+def read_replica(session):
+    """Envoie les SELECT du bloc sur un réplica (sauf si la session a déjà écrit)"""
+    previous = session.info.get("use_replica", False)
+    session.info["use_replica"] = True
+    try:
+        yield session
+    finally:
+        session.info["use_replica"] = previous
+
+
+@contextmanager
+def async_engine_bind(engine):
+    """Envoie tout le SQL du bloc sur `engine` (le sync_engine d'un AsyncEngine).
+
+    Le bloc doit tourner dans greenlet_spawn : chaque requête SQL y rend la
+    main à la boucle asyncio au lieu de bloquer le thread.
+    """
+    token = _async_bind.set(engine)
+    try:
+        yield
+    finally:
+        _async_bind.reset(token)
+
+
+def on_event_loop():
+    """Vrai dans une requête servie sur la boucle asyncio (mode ASGI) : rien de bloquant ici"""
+    return _async_bind.get() is not None
+
+
+def replica_binds(urls):
+    """SQLALCHEMY_BINDS des réplicas à partir d'une liste d'URL"""
+    return {f"{REPLICA_PREFIX}{index}": url for index, url in enumerate(urls)}
@@ -0,0 +1,102 @@
+"""Mise à niveau d'une base créée avant les tables, colonnes et index ajoutés depuis.
+
+db.create_all() crée les tables manquantes mais ne touche pas aux tables
+existantes : une base plus ancienne n'a pas, par exemple, places.updated_at
+et chaque requête sur les places échoue ("no such column"). upgrade_schema()
+complète la base à partir des modèles :
+  - tables manquantes (create_all) ;
+  - colonnes manquantes (ALTER TABLE ADD COLUMN), remplies sur les lignes
+    existantes selon BACKFILLS ;
+  - index manquants ;
+  - données dérivées : geohash des places, place_rating_stats, index de
+    recherche plein texte et ses triggers (app/persistence/search.py).
+Idempotent : relancé sur une base à jour, ne fait rien. À lancer au
+déploiement (`flask upgrade-db`), jamais pendant une requête.
+"""
+from sqlalchemy import inspect, select, text, update
+from app import db
+from app.models import Place, PlaceRatingStats
+from app.persistence.search import search_index
+from app.utils.geo import encode_geohash
+
+# Valeur (expression SQL) des colonnes ajoutées, pour les lignes déjà présentes
+BACKFILLS = {
+    ("places", "updated_at"): "CURRENT_TIMESTAMP",
+    ("users", "updated_at"): "CURRENT_TIMESTAMP",
+    # Version (ETag / Last-Modified) de la liste des amenities : max(updated_at), jamais NULL
+    ("amenities", "updated_at"): "CURRENT_TIMESTAMP",
+}
+
+
+def _add_missing_columns(connection, existing_tables, changes):
+    inspector = inspect(connection)
+    for table in db.metadata.sorted_tables:
+        if table.name not in existing_tables:
+            continue  # créée complète par create_all
+        present = {column["name"] for column in inspector.get_columns(table.name)}
+        for column in table.columns:
+            if column.name in present:
+                continue
+            # Toujours ajoutée NULLable : les lignes existantes n'ont pas encore de valeur
+            column_type = column.type.compile(dialect=connection.dialect)
+            connection.execute(text(f"ALTER TABLE {table.name} ADD COLUMN {column.name} {column_type}"))
+            fill = BACKFILLS.get((table.name, column.name))
+            if fill:
+                connection.execute(text(
+                    f"UPDATE {table.name} SET {column.name} = {fill} WHERE {column.name} IS NULL"))
+            changes.append(f"column {table.name}.{column.name}")
+
+
+def _index_names(connection, inspector, table_name):
+    if connection.dialect.name == "sqlite":
+        # get_indexes ne reflète pas les index sur expression (lower(email)) avec SQLite
+        return {row[1] for row in connection.exec_driver_sql(f"PRAGMA index_list('{table_name}')")}
+    return {index["name"] for index in inspector.get_indexes(table_name)}
+
+
+def _add_missing_indexes(connection, changes):
+    inspector = inspect(connection)
+    for table in db.metadata.sorted_tables:
+        present = _index_names(connection, inspector, table.name)
+        for index in table.indexes:
+            if index.name not in present:
+                index.create(connection)
+                changes.append(f"index {index.name}")
+
+
+def _backfill_geohash(connection, changes):
+    rows = connection.execute(select(Place.id, Place.latitude, Place.longitude)
+                              .where(Place.geohash.is_(None))).all()
+    if rows:
+        db.session.execute(update(Place), [
+            {"id": place_id, "geohash": encode_geohash(latitude, longitude)}
+            for place_id, latitude, longitude in rows])
+        changes.append(f"geohash of {len(rows)} places")
+
+
+def _backfill_rating_stats(changes):
+    # Table vide alors que des reviews existent : base antérieure aux agrégats
+    if db.session.execute(select(PlaceRatingStats.place_id).limit(1)).first() is None:
+        from app.services import facade
+        count = facade.rating_stats_repo.rebuild_rating_stats()
+        if count:
+            changes.append(f"rating stats of {count} places")
+
+
+def upgrade_schema():
+    """Met la base à niveau dans une transaction; retourne la liste des changements faits"""
+    changes = []
+    connection = db.session.connection()
+    existing_tables = set(inspect(connection).get_table_names())
+    db.metadata.create_all(bind=connection)
+    changes += [f"table {table.name}" for table in db.metadata.sorted_tables
+                if table.name not in existing_tables]
+
+    _add_missing_columns(connection, existing_tables, changes)
+    _add_missing_indexes(connection, changes)
+    _backfill_geohash(connection, changes)
+    _backfill_rating_stats(changes)
+    if search_index.ensure(db.session):
+        changes.append("full-text search index")
+    db.session.commit()
+    return changes
@@ -0,0 +1,292 @@
+"""Recherche plein texte sur les places : titre, description et texte des reviews.
+
+Le backend est choisi par SEARCH_BACKEND :
+  - "fts5" : table virtuelle SQLite FTS5, une ligne par place (titre,
+    description) et une par review, classement BM25 (le titre pèse plus
+    que la description, elle-même plus que les reviews) ;
+  - "like" : sans index, un LIKE par terme sur places et reviews
+    (moteurs sans FTS5; temps de réponse proportionnel au catalogue) ;
+  - "auto" (défaut) : fts5 si le moteur le propose, sinon like.
+Chaque terme de la requête est cherché en préfixe ("appart" trouve
+"appartement"), tous les termes doivent être présents.
+
+L'index FTS5 et ses triggers sont créés et remplis au déploiement par
+`flask upgrade-db` (ou `flask rebuild-search-index`), jamais pendant une
+requête : tant qu'ils manquent, la recherche passe par LIKE. Les
+triggers sur places et reviews tiennent ensuite l'index à jour : chaque
+création / modification / suppression réécrit la seule ligne concernée
+(la place, ou la review) dans la même transaction, sans requête de plus
+côté application, y compris pour les écritures en SQL direct (imports en
+masse).
+"""
+import re
+import threading
+from flask import current_app
+from sqlalchemy import text
+
+DEFAULT_BACKEND = "auto"
+MAX_TERMS = 8
+# Poids BM25 des colonnes title, description, reviews
+WEIGHTS = (10.0, 4.0, 1.0)
+
+_TERM = re.compile(r"\w+", re.UNICODE)
+
+
+def parse_terms(query):
+    """Termes de recherche (mots, en minuscules, sans doublon); ValueError si aucun"""
+    terms = list(dict.fromkeys(term.lower() for term in _TERM.findall(query or "")))
+    if not terms:
+        raise ValueError("q must contain at least one word")
+    return terms[:MAX_TERMS]
+
+
+# rowid FTS d'une ligne : (doc de la place << DOC_SHIFT) + n° de la ligne dans la place
+# (0 : la place elle-même, puis ses reviews). rowid >> DOC_SHIFT donne la place sans jointure
+DOC_SHIFT = 32
+
+
+def _rows_of(doc):
+    """Condition SQL : rowids FTS des lignes de la place `doc`"""
+    return f"BETWEEN {doc} << {DOC_SHIFT} AND ({doc} << {DOC_SHIFT}) + {(1 << DOC_SHIFT) - 1}"
+
+
+def _write_row(source_id, columns, values):
+    """Instruction de trigger qui (ré)écrit la ligne FTS d'une place ou d'une review (source_id : new.id)"""
+    return (
+        f"INSERT OR REPLACE INTO place_search (rowid, {columns}) "
+        f"SELECT fts_row, {values} FROM place_search_rows WHERE source_id = {source_id};"
+    )
+
+
+def _insert_review(review):
+    """Instructions de trigger qui indexent une review (review : new) à la suite des lignes de sa place"""
+    return (
+        "INSERT INTO place_search_rows (fts_row, source_id) "
+        f"SELECT (SELECT max(r.fts_row) FROM place_search_rows r WHERE r.fts_row {_rows_of('d.doc')}) + 1, {review}.id "
+        f"FROM place_search_docs d WHERE d.place_id = {review}.place_id; "
+        + _write_row(f"{review}.id", "reviews", f"{review}.text")
+    )
+
+
+def _delete_review(review):
+    return (
+        "DELETE FROM place_search WHERE rowid = "
+        f"(SELECT fts_row FROM place_search_rows WHERE source_id = {review}.id); "
+        f"DELETE FROM place_search_rows WHERE source_id = {review}.id;"
+    )
+
+
+_OLD_DOC = "(SELECT doc FROM place_search_docs WHERE place_id = old.id)"
+
+
+class FTS5Search:
+    """Index FTS5 : une ligne par place (titre, description) et une par review (texte).
+
+    place_search_docs numérote les places (doc, le rowid de places n'est pas
+    stable), place_search_rows donne le rowid FTS (fts_row) de chaque place / review
+    (source_id) : une écriture de review ne touche que sa propre ligne, quel que
+    soit le nombre de reviews de la place.
+    """
+    name = "fts5"
+
+    TRIGGERS = {
+        "place_search_places_ai": (
+            "AFTER INSERT ON places BEGIN "
+            "INSERT INTO place_search_docs (place_id, doc) "
+            "SELECT new.id, coalesce(max(doc), 0) + 1 FROM place_search_docs; "
+            f"INSERT INTO place_search_rows (fts_row, source_id) "
+            f"SELECT doc << {DOC_SHIFT}, place_id FROM place_search_docs WHERE place_id = new.id; "
+            + _write_row("new.id", "title, description", "new.title, new.description") + " END"),
+        "place_search_places_au": (
+            "AFTER UPDATE OF title, description ON places BEGIN "
+            + _write_row("new.id", "title, description", "new.title, new.description") + " END"),
+        "place_search_places_ad": (
+            "AFTER DELETE ON places BEGIN "
+            f"DELETE FROM place_search WHERE rowid {_rows_of(_OLD_DOC)}; "
+            f"DELETE FROM place_search_rows WHERE fts_row {_rows_of(_OLD_DOC)}; "
+            "DELETE FROM place_search_docs WHERE place_id = old.id; END"),
+        "place_search_reviews_ai": (
+            "AFTER INSERT ON reviews BEGIN " + _insert_review("new") + " END"),
+        "place_search_reviews_au": (
+            "AFTER UPDATE OF text, place_id ON reviews BEGIN "
+            + _delete_review("old") + " " + _insert_review("new") + " END"),
+        "place_search_reviews_ad": (
+            "AFTER DELETE ON reviews BEGIN " + _delete_review("old") + " END"),
+    }
+    OBJECTS = ("place_search", "place_search_docs", "place_search_rows", *TRIGGERS)
+
+    @staticmethod
+    def available(connection):
+        if connection.dialect.name != "sqlite":
+            return False
+        options = connection.execute(text("PRAGMA compile_options")).scalars().all()
+        return "ENABLE_FTS5" in options
+
+    def exists(self, connection):
+        """Index et triggers présents (un drop_all supprime les triggers)"""
+        names = ", ".join(f"'{name}'" for name in self.OBJECTS)
+        found = connection.execute(text(
+            f"SELECT count(*) FROM sqlite_master WHERE name IN ({names})")).scalar()
+        return found == len(self.OBJECTS)
+
+    def ensure(self, connection):
+        """Crée l'index et ses triggers s'il en manque, puis le remplit; True s'il vient d'être créé"""
+        if self.exists(connection):
+            return False
+        for name in self.TRIGGERS:
+            connection.execute(text(f"DROP TRIGGER IF EXISTS {name}"))
+        for table in ("place_search", "place_search_docs", "place_search_rows"):
+            connection.execute(text(f"DROP TABLE IF EXISTS {table}"))
+        connection.execute(text(
+            "CREATE VIRTUAL TABLE place_search USING fts5("
+            "title, description, reviews, tokenize = 'unicode61 remove_diacritics 2')"))
+        connection.execute(text(
+            "CREATE TABLE place_search_docs ("
+            "place_id VARCHAR(36) PRIMARY KEY, doc INTEGER NOT NULL UNIQUE)"))
+        connection.execute(text(
+            "CREATE TABLE place_search_rows ("
+            "fts_row INTEGER PRIMARY KEY, source_id VARCHAR(36) NOT NULL UNIQUE)"))
+        for name, body in self.TRIGGERS.items():
+            connection.execute(text(f"CREATE TRIGGER {name} {body}"))
+        self.rebuild(connection)
+        return True
+
+    def rebuild(self, connection):
+        for table in ("place_search", "place_search_docs", "place_search_rows"):
+            connection.execute(text(f"DELETE FROM {table}"))
+        connection.execute(text(
+            "INSERT INTO place_search_docs (place_id, doc) "
+            "SELECT id, row_number() OVER (ORDER BY id) FROM places"))
+        connection.execute(text(
+            f"INSERT INTO place_search_rows (fts_row, source_id) "
+            f"SELECT doc << {DOC_SHIFT}, place_id FROM place_search_docs UNION ALL "
+            f"SELECT (d.doc << {DOC_SHIFT}) + row_number() OVER (PARTITION BY r.place_id ORDER BY r.id), r.id "
+            f"FROM reviews r JOIN place_search_docs d ON d.place_id = r.place_id"))
+        connection.execute(text(
+            "INSERT INTO place_search (rowid, title, description) "
+            "SELECT t.fts_row, p.title, p.description FROM places p JOIN place_search_rows t ON t.source_id = p.id"))
+        connection.execute(text(
+            "INSERT INTO place_search (rowid, reviews) "
+            "SELECT t.fts_row, r.text FROM reviews r JOIN place_search_rows t ON t.source_id = r.id"))
+
+    def search(self, connection, terms, limit, offset):
+        # Chaque terme doit se trouver dans une des lignes de la place (titre, description ou
+        # review) : places candidates = intersection des places de chaque terme, puis BM25 des
+        # seules lignes de ces places, sommé par place
+        quoted = ['"{}"*'.format(term.replace('"', '""')) for term in terms]
+        params = {"match": " OR ".join(quoted), "limit": limit, "offset": offset}
+        candidates = ""
+        if len(terms) > 1:
+            params.update((f"term{i}", match) for i, match in enumerate(quoted))
+            candidates = f" AND rowid >> {DOC_SHIFT} IN (" + " INTERSECT ".join(
+                f"SELECT rowid >> {DOC_SHIFT} FROM place_search WHERE place_search MATCH :term{i}"
+                for i in range(len(terms))) + ")"
+        weights = ", ".join(str(weight) for weight in WEIGHTS)
+        # MATERIALIZED : bm25() n'est pas utilisable une fois la sous-requête fusionnée dans l'agrégat
+        rows = connection.execute(text(
+            f"WITH hit AS MATERIALIZED (SELECT rowid >> {DOC_SHIFT} AS doc, bm25(place_search, {weights}) AS score "
+            f"FROM place_search WHERE place_search MATCH :match{candidates}) "
+            f"SELECT d.place_id, page.score FROM "
+            f"(SELECT doc, -sum(score) AS score FROM hit GROUP BY doc "
+            f"ORDER BY score DESC, doc LIMIT :limit OFFSET :offset) page "
+            f"JOIN place_search_docs d ON d.doc = page.doc ORDER BY page.score DESC, page.doc"), params)
+        return [(place_id, score) for place_id, score in rows]
+
+
+class LikeSearch:
+    """Sans index : chaque terme doit apparaître (en début de mot) dans la place ou une de ses reviews"""
+    name = "like"
+
+    @staticmethod
+    def available(connection):
+        return True
+
+    def exists(self, connection):
+        return True
+
+    def ensure(self, connection):
+        return False
+
+    def rebuild(self, connection):
+        pass
+
+    def search(self, connection, terms, limit, offset):
+        params, found, in_title = {"limit": limit, "offset": offset}, [], []
+        for i, term in enumerate(terms):
+            escaped = term.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+            params[f"start{i}"], params[f"word{i}"] = f"{escaped}%", f"% {escaped}%"
+            matches = [f"(lower({column}) LIKE :start{i} ESCAPE '\\' OR lower({column}) LIKE :word{i} ESCAPE '\\')"
+                       for column in ("p.title", "p.description", "r.text")]
+            found.append(f"max({' OR '.join(matches)})")
+            in_title.append(f"max({matches[0]})")
+        # Score : nombre de termes présents dans le titre (pas de BM25 sans index)
+        rows = connection.execute(text(
+            f"SELECT p.id, {' + '.join(in_title)} AS score FROM places p "
+            f"LEFT JOIN reviews r ON r.place_id = p.id GROUP BY p.id "
+            f"HAVING {' AND '.join(found)} "
+            f"ORDER BY score DESC, p.id LIMIT :limit OFFSET :offset"), params)
+        return [(place_id, float(score)) for place_id, score in rows]
+
+
+BACKENDS = {backend.name: backend for backend in (FTS5Search, LikeSearch)}
+
+
+class SearchIndex:
+    def __init__(self, backend=DEFAULT_BACKEND):
+        self.backend_name = backend
+        self._backend = None
+        self._ready = False
+        self._warned = False
+        self._lock = threading.Lock()
+
+    def init_app(self, app):
+        backend = app.config.get("SEARCH_BACKEND", DEFAULT_BACKEND)
+        if backend != "auto" and backend not in BACKENDS:
+            raise ValueError(f"SEARCH_BACKEND must be 'auto' or one of {sorted(BACKENDS)}")
+        self.backend_name = backend
+        self._backend, self._ready, self._warned = None, False, False
+
+    def backend(self, connection):
+        """Backend actif, résolu au premier appel selon le moteur"""
+        if self._backend is None:
+            with self._lock:
+                if self._backend is None:
+                    if self.backend_name == "auto":
+                        backend = next(cls for cls in BACKENDS.values() if cls.available(connection))
+                    else:
+                        backend = BACKENDS[self.backend_name]
+                    self._backend = backend()
+        return self._backend
+
+    def ensure(self, session):
+        """Crée l'index et ses triggers s'ils manquent (flask upgrade-db); True s'il vient d'être créé"""
+        connection = session.connection()
+        return self.backend(connection).ensure(connection)
+
+    def search(self, session, query, limit, offset=0):
+        """[(place_id, score)] du plus pertinent au moins pertinent"""
+        terms = parse_terms(query)
+        connection = session.connection()
+        backend = self.backend(connection)
+        if not self._ready:
+            # Vérification seulement : l'index se crée au déploiement, jamais pendant une requête
+            if backend.exists(connection):
+                self._ready = True
+            else:
+                if not self._warned:
+                    self._warned = True
+                    current_app.logger.warning(
+                        "search index missing, falling back to LIKE: run `flask upgrade-db`")
+                backend = LikeSearch()
+        return backend.search(connection, terms, limit, offset)
+
+    def rebuild(self, session):
+        """Reconstruit tout l'index dans la transaction de la session; retourne le backend utilisé"""
+        connection = session.connection()
+        backend = self.backend(connection)
+        if not backend.ensure(connection):  # ensure() remplit déjà un index qu'il vient de créer
+            backend.rebuild(connection)
+        return backend
+
+
+search_index = SearchIndex()
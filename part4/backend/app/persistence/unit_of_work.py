@@ -0,0 +1,40 @@
+"""Unité de travail : plusieurs écritures, un seul commit.
+
+Les méthodes d'écriture des repositories et de la facade appellent commit().
+Hors transaction, commit() valide immédiatement (comportement historique).
+Dans un bloc transaction(), les commits sont différés jusqu'à la sortie du
+bloc le plus externe : un seul COMMIT (et un seul fsync) pour tout le bloc,
+ou un rollback complet si une exception sort du bloc.
+"""
+from contextlib import contextmanager
+from app import db
+
+
+def in_transaction():
+    return db.session.info.get("uow_depth", 0) > 0
+
+
+def commit():
+    """Commit now, or at the end of the enclosing transaction() block"""
+    if in_transaction():
+        db.session.flush()  # ids / contraintes visibles tout de suite, comme avant
+    else:
+        db.session.commit()
+
+
+@contextmanager
+def transaction():
+    """Group every write of the block into one commit (blocks can be nested)"""
+    session = db.session
+    depth = session.info.get("uow_depth", 0)
+    session.info["uow_depth"] = depth + 1
+    try:
+        yield session
+    except BaseException:
+        session.info["uow_depth"] = depth
+        if depth == 0:
+            session.rollback()
+        raise
+    session.info["uow_depth"] = depth
+    if depth == 0:
+        session.commit()
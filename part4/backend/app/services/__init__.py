@@ -1,3 +1,4 @@
 from app.services.facade import HBnBFacade
+from app.services.cached_facade import CachedFacade
 
-facade = HBnBFacade()
+facade = CachedFacade(HBnBFacade())
@@ -0,0 +1,391 @@
+"""Import en masse (NDJSON / CSV) des users, amenities, places et reviews.
+
+Les lignes sont lues en flux et traitées par lots : une requête IN par lot
+pour retrouver l'existant, puis INSERT / UPDATE en executemany et un seul
+commit par lot. Le numéro du dernier lot commité est enregistré dans
+import_checkpoints dans la même transaction, ce qui permet de reprendre
+un import interrompu sans rejouer ni perdre de lignes.
+
+Les tables import_checkpoints et place_rating_stats doivent exister :
+sur une base antérieure, `flask upgrade-db` au déploiement (pas de DDL
+pendant une requête d'import).
+"""
+import csv
+import json
+import time
+import uuid
+from sqlalchemy import delete, func, insert, select, update
+from app import db
+from app.models import User, Amenity, Place, PlaceAmenity, Review, ImportCheckpoint
+from app.utils.geo import encode_geohash
+from app.utils.password_hasher import password_hasher
+
+IMPORT_KINDS = ("users", "amenities", "places", "reviews")
+IMPORT_FORMATS = ("ndjson", "csv")
+DEFAULT_BATCH_SIZE = 1000
+# Seuls champs NDJSON qui peuvent être une liste (de chaînes); les autres sont des scalaires
+LIST_FIELDS = ("amenities",)
+SCALARS = (str, int, float, bool, type(None))
+
+
+def read_records(stream, fmt):
+    """Lit un flux texte enregistrement par enregistrement; ValueError sur une ligne illisible"""
+    if fmt == "ndjson":
+        for number, line in enumerate(stream, start=1):
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                record = json.loads(line)
+            except ValueError as e:
+                raise ValueError(f"line {number}: {e}") from e
+            if not isinstance(record, dict):
+                raise ValueError(f"line {number}: each record must be a JSON object")
+            for key, value in record.items():
+                if not isinstance(value, SCALARS) and not (
+                        key in LIST_FIELDS and isinstance(value, list)
+                        and all(isinstance(item, str) for item in value)):
+                    raise ValueError(f"line {number}: invalid value for '{key}'")
+            yield record
+    elif fmt == "csv":
+        yield from csv.DictReader(stream)
+    else:
+        raise ValueError(f"Unsupported format: {fmt}")
+
+
+def iter_batches(records, size):
+    """Regroupe les enregistrements par lots de `size`"""
+    batch = []
+    for record in records:
+        batch.append(record)
+        if len(batch) == size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def _split_list(value):
+    """Liste JSON ou chaîne CSV 'a|b|c'"""
+    if value in (None, ""):
+        return []
+    if isinstance(value, list):
+        return value
+    return [v.strip() for v in str(value).split("|") if v.strip()]
+
+
+def _user_ids_by_email(emails):
+    """{email en minuscules: id} des users existants, quelle que soit la casse enregistrée"""
+    if not emails:
+        return {}
+    email = func.lower(User.email)  # idx_user_email_lower
+    return dict(db.session.execute(select(email, User.id).where(email.in_(list(emails)))).all())
+
+
+def _text(value):
+    """Champ texte d'un enregistrement (NDJSON : nombre possible), "" si absent"""
+    return "" if value is None else str(value).strip()
+
+
+def _to_bool(value):
+    if isinstance(value, bool):
+        return value
+    return str(value).strip().lower() in ("1", "true", "yes", "y")
+
+
+class BulkImporter:
+    """Charge un flux d'enregistrements d'un type donné, lot par lot"""
+
+    def __init__(self, kind, import_id, batch_size=DEFAULT_BATCH_SIZE):
+        if kind not in IMPORT_KINDS:
+            raise ValueError(f"Unknown import kind: {kind}")
+        if batch_size < 1:
+            raise ValueError("batch_size must be positive")
+        self.kind = kind
+        self.import_id = import_id
+        self.batch_size = batch_size
+
+    def _checkpoint(self):
+        checkpoint = db.session.get(ImportCheckpoint, self.import_id)
+        if checkpoint is None:
+            checkpoint = ImportCheckpoint(import_id=self.import_id, kind=self.kind,
+                                          batch_size=self.batch_size,
+                                          batches_committed=0, rows_committed=0)
+            db.session.add(checkpoint)
+            db.session.commit()
+        elif checkpoint.kind != self.kind:
+            raise ValueError(f"Import '{self.import_id}' is a {checkpoint.kind} import")
+        # Un import repris doit garder le même découpage en lots
+        self.batch_size = checkpoint.batch_size
+        return checkpoint
+
+    def run(self, records, on_batch=None):
+        """Importe les enregistrements; on_batch(stats) est appelé après chaque commit"""
+        checkpoint = self._checkpoint()
+        report = {
+            "import_id": self.import_id,
+            "kind": self.kind,
+            "batch_size": self.batch_size,
+            "resumed_after_batch": checkpoint.batches_committed,
+            "batches": [],
+            "inserted": 0,
+            "updated": 0,
+            "errors": [],
+            "failed_batch": None,
+            "invalid_input": False
+        }
+        loader = getattr(self, f"_load_{self.kind}")
+
+        batches = enumerate(iter_batches(records, self.batch_size), start=1)
+        while True:
+            try:
+                number, batch = next(batches)
+            except StopIteration:
+                break
+            except (ValueError, csv.Error) as e:
+                # Ligne illisible (UnicodeDecodeError compris) : on s'arrête, les lots
+                # précédents restent commités. Erreur du fichier, pas du serveur
+                report["failed_batch"] = checkpoint.batches_committed + 1
+                report["invalid_input"] = True
+                report["error"] = f"unreadable input: {e}"
+                break
+
+            if number <= checkpoint.batches_committed:
+                continue  # déjà commité lors d'un run précédent
+
+            started = time.perf_counter()
+            offset = (number - 1) * self.batch_size
+            try:
+                inserted, updated, errors = loader(batch, offset)
+                checkpoint.batches_committed = number
+                checkpoint.rows_committed += len(batch)
+                db.session.commit()
+            except Exception as e:
+                db.session.rollback()
+                report["failed_batch"] = number
+                report["error"] = str(e)
+                break
+
+            seconds = time.perf_counter() - started
+            stats = {
+                "batch": number,
+                "rows": len(batch),
+                "inserted": inserted,
+                "updated": updated,
+                "errors": len(errors),
+                "seconds": round(seconds, 4),
+                "rows_per_sec": round(len(batch) / seconds, 1) if seconds else None
+            }
+            report["batches"].append(stats)
+            report["inserted"] += inserted
+            report["updated"] += updated
+            report["errors"].extend(errors)
+            if on_batch:
+                on_batch(stats)
+
+        if report["batches"]:
+            from app.services import facade
+            if self.kind == "reviews":
+                facade.rebuild_rating_stats()
+            # Les INSERT/UPDATE en masse ne passent pas par la session : on vide le cache
+            facade.clear_cache()
+        return report
+
+    # Users : upsert sur l'email
+    def _load_users(self, rows, offset):
+        errors = []
+        by_email = {}
+        for index, row in enumerate(rows, start=offset + 1):
+            email = _text(row.get("email")).lower()
+            if not email:
+                errors.append({"row": index, "error": "email is required"})
+                continue
+            by_email[email] = (index, row)  # le dernier doublon du lot gagne
+
+        existing = _user_ids_by_email(by_email)
+
+        inserts, updates, to_hash = [], [], []
+        for email, (index, row) in by_email.items():
+            values = {key: row[key] for key in ("first_name", "last_name")
+                      if row.get(key) not in (None, "")}
+            if row.get("is_admin") not in (None, ""):
+                values["is_admin"] = _to_bool(row["is_admin"])
+            # Hash existant (migration) sinon hash du mot de passe en clair
+            if row.get("password_hash"):
+                values["_password"] = str(row["password_hash"])
+            elif row.get("password"):
+                values["_password"] = str(row["password"])  # haché en parallèle plus bas
+                to_hash.append(values)
+
+            if email in existing:
+                values["id"] = existing[email]
+                updates.append(values)
+                continue
+            missing = [label for key, label in (("first_name", "first_name"), ("last_name", "last_name"),
+                                                ("_password", "password")) if key not in values]
+            if missing:
+                errors.append({"row": index, "error": f"{', '.join(missing)} required for a new user"})
+                continue
+            values.update(id=str(uuid.uuid4()), email=email)
+            values.setdefault("is_admin", False)
+            inserts.append(values)
+
+        to_hash = [values for values in to_hash if "id" in values]  # lignes retenues
+        hashes = password_hasher.hash_many([values["_password"] for values in to_hash])
+        for values, hashed in zip(to_hash, hashes):
+            values["_password"] = hashed
+
+        if inserts:
+            db.session.execute(insert(User), inserts)
+        if updates:
+            db.session.execute(update(User), updates)
+        return len(inserts), len(updates), errors
+
+    # Amenities : upsert sur le nom
+    def _load_amenities(self, rows, offset):
+        errors = []
+        names = {}
+        for index, row in enumerate(rows, start=offset + 1):
+            name = _text(row.get("name"))
+            if not name:
+                errors.append({"row": index, "error": "name is required"})
+                continue
+            names[name] = index
+
+        existing = set(db.session.execute(
+            select(Amenity.name).where(Amenity.name.in_(list(names)))
+        ).scalars())
+        inserts = [{"id": str(uuid.uuid4()), "name": name} for name in names if name not in existing]
+        if inserts:
+            db.session.execute(insert(Amenity), inserts)
+        return len(inserts), 0, errors
+
+    # Places : upsert sur l'id s'il est fourni
+    def _load_places(self, rows, offset):
+        errors = []
+        owner_emails = {_text(r.get("owner_email")).lower() for r in rows} - {""}
+        owner_ids = {r.get("owner_id") for r in rows} - {None, ""}
+        amenity_names = {name for r in rows for name in _split_list(r.get("amenities"))}
+        place_ids = {r.get("id") for r in rows} - {None, ""}
+
+        # Une requête IN par référence pour tout le lot
+        emails_to_ids = _user_ids_by_email(owner_emails)
+        known_users = set(db.session.execute(
+            select(User.id).where(User.id.in_(list(owner_ids)))
+        ).scalars()) if owner_ids else set()
+        amenity_ids = dict(db.session.execute(
+            select(Amenity.name, Amenity.id).where(Amenity.name.in_(list(amenity_names)))
+        ).all()) if amenity_names else {}
+        existing = set(db.session.execute(
+            select(Place.id).where(Place.id.in_(list(place_ids)))
+        ).scalars()) if place_ids else set()
+
+        inserts, updates, links, relinked = [], [], [], []
+        for index, row in enumerate(rows, start=offset + 1):
+            try:
+                values = {
+                    "title": row["title"],
+                    "description": row.get("description") or "",
+                    "price": float(row["price"]),
+                    "latitude": float(row["latitude"]),
+                    "longitude": float(row["longitude"])
+                }
+            except (KeyError, TypeError, ValueError) as e:
+                errors.append({"row": index, "error": f"invalid or missing field: {e}"})
+                continue
+            if values["price"] < 0 or not (-90 <= values["latitude"] <= 90) \
+                    or not (-180 <= values["longitude"] <= 180):
+                errors.append({"row": index, "error": "price or coordinates out of range"})
+                continue
+
+            owner_id = row.get("owner_id")
+            if owner_id not in known_users:
+                owner_id = emails_to_ids.get(_text(row.get("owner_email")).lower())
+            if not owner_id:
+                errors.append({"row": index, "error": "unknown owner"})
+                continue
+
+            names = _split_list(row.get("amenities"))
+            unknown = [name for name in names if name not in amenity_ids]
+            if unknown:
+                errors.append({"row": index, "error": f"unknown amenities: {', '.join(unknown)}"})
+                continue
+
+            values.update(owner_id=owner_id, user_id=row.get("user_id") or owner_id,
+                          geohash=encode_geohash(values["latitude"], values["longitude"]))
+            place_id = row.get("id")
+            if place_id in existing:
+                values["id"] = place_id
+                updates.append(values)
+                if "amenities" in row:
+                    relinked.append(place_id)
+            else:
+                values["id"] = place_id or str(uuid.uuid4())
+                existing.add(values["id"])
+                inserts.append(values)
+            links.extend({"id": str(uuid.uuid4()), "place_id": values["id"],
+                          "amenity_id": amenity_ids[name]} for name in names)
+
+        if inserts:
+            db.session.execute(insert(Place), inserts)
+        if updates:
+            db.session.execute(update(Place), updates)
+        if relinked:
+            db.session.execute(delete(PlaceAmenity).where(PlaceAmenity.place_id.in_(relinked)))
+        if links:
+            db.session.execute(insert(PlaceAmenity), links)
+        return len(inserts), len(updates), errors
+
+    # Reviews : upsert sur (user, place)
+    def _load_reviews(self, rows, offset):
+        errors = []
+        user_emails = {_text(r.get("user_email")).lower() for r in rows} - {""}
+        user_ids = {r.get("user_id") for r in rows} - {None, ""}
+        place_ids = {r.get("place_id") for r in rows} - {None, ""}
+
+        emails_to_ids = _user_ids_by_email(user_emails)
+        known_users = set(db.session.execute(
+            select(User.id).where(User.id.in_(list(user_ids)))
+        ).scalars()) if user_ids else set()
+        known_places = set(db.session.execute(
+            select(Place.id).where(Place.id.in_(list(place_ids)))
+        ).scalars()) if place_ids else set()
+
+        resolved = {}
+        for index, row in enumerate(rows, start=offset + 1):
+            user_id = row.get("user_id")
+            if user_id not in known_users:
+                user_id = emails_to_ids.get(_text(row.get("user_email")).lower())
+            if not user_id or row.get("place_id") not in known_places:
+                errors.append({"row": index, "error": "unknown user or place"})
+                continue
+            try:
+                rating = int(row["rating"])
+            except (KeyError, TypeError, ValueError):
+                rating = None
+            if rating is None or not (1 <= rating <= 5):
+                errors.append({"row": index, "error": "rating must be an integer between 1 and 5"})
+                continue
+            resolved[(user_id, row["place_id"])] = {"rating": rating, "text": row.get("text") or ""}
+
+        existing = {}
+        if resolved:
+            for review_id, user_id, place_id in db.session.execute(
+                select(Review.id, Review.user_id, Review.place_id).where(
+                    Review.place_id.in_({p for _, p in resolved}),
+                    Review.user_id.in_({u for u, _ in resolved}))
+            ).all():
+                existing[(user_id, place_id)] = review_id
+
+        inserts, updates = [], []
+        for (user_id, place_id), values in resolved.items():
+            if (user_id, place_id) in existing:
+                updates.append(dict(values, id=existing[(user_id, place_id)]))
+            else:
+                inserts.append(dict(values, id=str(uuid.uuid4()), user_id=user_id, place_id=place_id))
+
+        if inserts:
+            db.session.execute(insert(Review), inserts)
+        if updates:
+            db.session.execute(update(Review), updates)
+        return len(inserts), len(updates), errors
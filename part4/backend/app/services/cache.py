@@ -0,0 +1,131 @@
+"""Backends de cache pour la facade.
+
+Les valeurs sont stockées sérialisées (pickle) : le cache garde un instantané
+figé de l'objet, indépendant de la session SQLAlchemy qui l'a chargé.
+"""
+import pickle
+import threading
+import time
+from collections import OrderedDict
+
+try:  # redis est optionnel : seulement pour le backend partagé
+    import redis
+except ImportError:
+    redis = None
+
+
+class CacheStats:
+    """Compteurs de hits / misses / évictions, par type d'entité"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counters = {}
+
+    def incr(self, kind, counter, amount=1):
+        with self._lock:
+            kind_counters = self._counters.setdefault(kind, {})
+            kind_counters[counter] = kind_counters.get(counter, 0) + amount
+
+    def snapshot(self):
+        with self._lock:
+            result = {kind: dict(counters) for kind, counters in self._counters.items()}
+        for counters in result.values():
+            lookups = counters.get("hits", 0) + counters.get("misses", 0)
+            counters["hit_rate"] = round(counters.get("hits", 0) / lookups, 4) if lookups else None
+        return result
+
+
+class InProcessCache:
+    """Cache LRU en mémoire du process, avec TTL par entrée et taille maximale"""
+
+    name = "memory"
+    blocking = False
+
+    def __init__(self, max_entries=10000):
+        self.max_entries = max_entries
+        self._data = OrderedDict()  # key -> (expires_at, payload)
+        self._lock = threading.Lock()
+        self.evictions = 0
+
+    def get(self, key):
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                return None
+            expires_at, payload = entry
+            if expires_at < time.monotonic():
+                del self._data[key]
+                return None
+            self._data.move_to_end(key)  # récemment utilisé
+            return payload
+
+    def set(self, key, payload, ttl):
+        with self._lock:
+            self._data[key] = (time.monotonic() + ttl, payload)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)  # le moins récemment utilisé
+                self.evictions += 1
+
+    def delete(self, *keys):
+        with self._lock:
+            for key in keys:
+                self._data.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def info(self):
+        return {"backend": self.name, "entries": len(self._data),
+                "max_entries": self.max_entries, "evictions": self.evictions}
+
+
+class RedisCache:
+    """Cache partagé entre workers (Redis); l'éviction LRU est celle de Redis (maxmemory-policy)"""
+
+    name = "redis"
+    blocking = True  # aller-retour réseau à chaque appel
+
+    def __init__(self, url, prefix="hbnb:"):
+        if redis is None:
+            raise RuntimeError("The redis package is required for CACHE_BACKEND='redis'")
+        self.client = redis.Redis.from_url(url)
+        self.prefix = prefix
+
+    def get(self, key):
+        return self.client.get(self.prefix + key)
+
+    def set(self, key, payload, ttl):
+        self.client.setex(self.prefix + key, max(int(ttl), 1), payload)
+
+    def delete(self, *keys):
+        if keys:
+            self.client.delete(*[self.prefix + key for key in keys])
+
+    def clear(self):
+        keys = list(self.client.scan_iter(match=self.prefix + "*"))
+        if keys:
+            self.client.delete(*keys)
+
+    def info(self):
+        stats = self.client.info("stats")
+        return {"backend": self.name, "evictions": stats.get("evicted_keys"),
+                "expired": stats.get("expired_keys")}
+
+
+def create_backend(config):
+    """Backend choisi par la config : 'redis' (CACHE_REDIS_URL obligatoire), sinon en mémoire"""
+    if config.get("CACHE_BACKEND") == "redis":
+        if not config.get("CACHE_REDIS_URL"):
+            raise RuntimeError("CACHE_REDIS_URL must be set for CACHE_BACKEND='redis'")
+        return RedisCache(config["CACHE_REDIS_URL"])
+    return InProcessCache(config.get("CACHE_MAX_ENTRIES", 10000))
+
+
+def dumps(value):
+    return pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+
+
+def loads(payload):
+    return pickle.loads(payload)
@@ -0,0 +1,165 @@
+from itertools import chain
+from sqlalchemy import event, inspect, select
+from sqlalchemy.orm import Session
+from app import db
+from app.models import Place, Amenity, User, PlaceAmenity, Review, PlaceRatingStats
+from app.persistence.SQLAlchemyRepository import LOAD_PROFILES
+from app.persistence.routing import on_event_loop
+from app.services import cache
+
+# Durée de vie (secondes) des entrées par type d'entité
+DEFAULT_TTLS = {"place": 60, "amenity": 3600, "user": 300}
+# Attributs jamais mis en cache (ni en mémoire ni dans Redis) : rechargés à la demande
+UNCACHED_ATTRIBUTES = {User: ["_password"]}
+
+
+class CachedFacade:
+    """Read-through cache around HBnBFacade.
+
+    get_place / get_amenity / list_amenities / get_user are answered from
+    the cache when possible. Every other attribute is delegated to the
+    wrapped facade. Invalidation is automatic: the objects written by a
+    flush are collected and their keys dropped once the transaction
+    commits, whatever code path made the write.
+    """
+
+    def __init__(self, facade, backend=None, ttls=None):
+        self._facade = facade
+        self.backend = backend or cache.InProcessCache()
+        self.ttls = dict(DEFAULT_TTLS, **(ttls or {}))
+        self.stats = cache.CacheStats()
+        self.enabled = True
+
+        event.listen(Session, "before_flush", self._collect_amenity_places)
+        event.listen(Session, "after_flush", self._collect_invalidations)
+        event.listen(Session, "after_commit", self._apply_invalidations)
+        event.listen(Session, "after_rollback", self._discard_invalidations)
+
+    def init_app(self, app):
+        """Configure backend, TTLs and on/off switch from the Flask config"""
+        self.backend = cache.create_backend(app.config)
+        self.ttls = dict(DEFAULT_TTLS, **app.config.get("CACHE_TTLS", {}))
+        self.enabled = app.config.get("CACHE_ENABLED", True)
+
+    def __getattr__(self, name):
+        return getattr(self._facade, name)
+
+    # --- Lectures ---
+    def get_place(self, place_id, profile=None):
+        return self._cached("place", f"place:{place_id}:{profile or 'base'}",
+                            lambda: self._facade.get_place(place_id, profile, primary=True))
+
+    def get_amenity(self, amenity_id):
+        return self._cached("amenity", f"amenity:{amenity_id}",
+                            lambda: self._facade.get_amenity(amenity_id, primary=True))
+
+    def list_amenities(self):
+        return self._cached("amenity", "amenity:list", lambda: self._facade.list_amenities(primary=True))
+
+    def get_user(self, user_id):
+        return self._cached("user", f"user:{user_id}", lambda: self._facade.get_user(user_id, primary=True))
+
+    # --- Écritures hors session (requêtes SQL en masse) ---
+    def rebuild_rating_stats(self):
+        count = self._facade.rebuild_rating_stats()
+        self.clear_cache()
+        return count
+
+    def clear_cache(self):
+        self.backend.clear()
+
+    def cache_stats(self):
+        return {"backend": self.backend.info(), "entities": self.stats.snapshot()}
+
+    # Les loaders lisent la primaire : un réplica en retard, relu juste après une
+    # invalidation, figerait l'ancienne version pour tout le TTL
+    def _cached(self, kind, key, loader):
+        if not self.enabled:
+            return loader()
+        if self.backend.blocking and on_event_loop():
+            # Mode ASGI asynchrone : pas d'appel Redis bloquant sur la boucle, le SQL lui rend la main
+            return loader()
+
+        payload = self.backend.get(key)
+        if payload is not None:
+            self.stats.incr(kind, "hits")
+            return self._attach(cache.loads(payload))
+
+        self.stats.incr(kind, "misses")
+        value = loader()
+        if value is not None:
+            self._strip_uncached(value)
+            self.backend.set(key, cache.dumps(value), self.ttls[kind])
+        return value
+
+    @staticmethod
+    def _strip_uncached(value):
+        """Expire UNCACHED_ATTRIBUTES dans tout le graphe chargé (ex. auteurs des reviews d'une place)"""
+        stack, seen = list(value) if isinstance(value, list) else [value], set()
+        while stack:
+            obj = stack.pop()
+            if id(obj) in seen:
+                continue
+            seen.add(id(obj))
+            attrs = UNCACHED_ATTRIBUTES.get(type(obj))
+            if attrs:
+                db.session.expire(obj, attrs)  # absent de l'instantané picklé, rechargé à la demande
+            state = inspect(obj)
+            for relationship in state.mapper.relationships:
+                loaded = state.dict.get(relationship.key)
+                if loaded is not None:
+                    stack.extend(loaded if isinstance(loaded, list) else [loaded])
+
+    @staticmethod
+    def _attach(value):
+        """Rattache l'instantané à la session courante, sans requête SQL"""
+        if isinstance(value, list):
+            return [db.session.merge(item, load=False) for item in value]
+        return db.session.merge(value, load=False)
+
+    # --- Invalidation ---
+    @staticmethod
+    def _place_keys(place_id):
+        profiles = ["base"] + list(LOAD_PROFILES[Place])
+        return {("place", f"place:{place_id}:{profile}") for profile in profiles}
+
+    @classmethod
+    def _keys_for(cls, obj):
+        if isinstance(obj, Place):
+            return cls._place_keys(obj.id)
+        if isinstance(obj, (PlaceAmenity, Review, PlaceRatingStats)):
+            return cls._place_keys(obj.place_id)
+        if isinstance(obj, Amenity):
+            return {("amenity", f"amenity:{obj.id}"), ("amenity", "amenity:list")}
+        if isinstance(obj, User):
+            return {("user", f"user:{obj.id}")}
+        return set()
+
+    def _collect_amenity_places(self, session, flush_context, instances):
+        # Les places mises en cache embarquent le nom de leurs amenities : une amenity
+        # modifiée / supprimée invalide aussi ses places (liens lus avant le flush)
+        amenity_ids = [obj.id for obj in chain(session.dirty, session.deleted)
+                       if isinstance(obj, Amenity) and obj.id]
+        if not amenity_ids:
+            return
+        place_ids = session.connection().execute(
+            select(PlaceAmenity.place_id).where(PlaceAmenity.amenity_id.in_(amenity_ids))).scalars()
+        keys = session.info.setdefault("cache_invalidations", set())
+        for place_id in set(place_ids):
+            keys.update(self._place_keys(place_id))
+
+    def _collect_invalidations(self, session, flush_context):
+        keys = session.info.setdefault("cache_invalidations", set())
+        for obj in chain(session.new, session.dirty, session.deleted):
+            keys.update(self._keys_for(obj))
+
+    def _apply_invalidations(self, session):
+        keys = session.info.pop("cache_invalidations", None)
+        if not keys:
+            return
+        self.backend.delete(*[key for _, key in keys])
+        for kind, _ in keys:
+            self.stats.incr(kind, "invalidated_keys")
+
+    def _discard_invalidations(self, session):
+        session.info.pop("cache_invalidations", None)
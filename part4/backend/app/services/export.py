@@ -0,0 +1,52 @@
+"""Export NDJSON en flux des places, reviews et users.
+
+Les lignes sont lues avec un curseur côté serveur (yield_per) et écrites
+au fil de l'eau : la mémoire utilisée ne dépend pas de la taille des tables.
+"""
+import json
+from datetime import datetime
+from sqlalchemy import select
+from app import db
+from app.models import Place, Review, User
+
+EXPORT_BATCH_SIZE = 1000
+CHUNK_SIZE = 64 * 1024
+
+# Colonnes exportées par type (jamais le mot de passe des users)
+EXPORTS = {
+    "places": (Place, ["id", "title", "description", "price", "latitude", "longitude",
+                       "owner_id", "user_id", "updated_at"]),
+    "reviews": (Review, ["id", "text", "rating", "user_id", "place_id", "created_at", "updated_at"]),
+    "users": (User, ["id", "first_name", "last_name", "email", "is_admin", "updated_at"]),
+}
+
+
+def _json_default(value):
+    if isinstance(value, datetime):
+        return value.isoformat()
+    raise TypeError(f"{type(value).__name__} is not JSON serializable")
+
+
+def iter_ndjson(kind, since=None):
+    """Yield the NDJSON export of a table in ~CHUNK_SIZE text chunks.
+
+    `since` (datetime) only keeps the rows with updated_at > since, for
+    incremental exports.
+    """
+    model, columns = EXPORTS[kind]
+    stmt = select(*[getattr(model, c) for c in columns]).order_by(model.updated_at, model.id)
+    if since is not None:
+        stmt = stmt.where(model.updated_at > since)
+
+    result = db.session.execute(stmt.execution_options(yield_per=EXPORT_BATCH_SIZE))
+    buffer, size = [], 0
+    for row in result:
+        line = json.dumps(dict(zip(columns, row)), default=_json_default, ensure_ascii=False) + "\n"
+        buffer.append(line)
+        size += len(line)
+        if size >= CHUNK_SIZE:
+            yield "".join(buffer)
+            buffer, size = [], 0
+    if buffer:
+        yield "".join(buffer)
+
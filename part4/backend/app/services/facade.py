@@ -1,35 +1,77 @@
-from app.persistence.SQLAlchemyRepository import SQLAlchemyRepository
+from collections import Counter
+from app.persistence.SQLAlchemyRepository import SQLAlchemyRepository, encode_cursor, decode_cursor
 from app.models.user import User
 from app.models.amenity import Amenity
 from app.models.place import Place
 from app.models.review import Review
 from app.models.place_amenity import PlaceAmenity
-from app import db
+from app.models.place_rating_stats import PlaceRatingStats
+from app.persistence.unit_of_work import commit, transaction
+from app.utils import geo
+from app.utils.password_hasher import password_hasher
 
 class HBnBFacade:
-    def __init__(self):
-        self.user_repo = SQLAlchemyRepository(User)  # Switched to SQLAlchemyRepository
-        self.place_repo = SQLAlchemyRepository(Place)
-        self.review_repo = SQLAlchemyRepository(Review)
-        self.amenity_repo = SQLAlchemyRepository(Amenity)
+    def __init__(self, repository_class=SQLAlchemyRepository):
+        # InMemoryRepository (persistence/memory.py) pour les tests et les comparaisons de débit
+        self.user_repo = repository_class(User)
+        self.place_repo = repository_class(Place)
+        self.review_repo = repository_class(Review)
+        self.amenity_repo = repository_class(Amenity)
+        self.rating_stats_repo = repository_class(PlaceRatingStats)
+        repositories = {repo.model: repo for repo in (self.user_repo, self.place_repo, self.review_repo,
+                                                      self.amenity_repo, self.rating_stats_repo)}
+        for repo in repositories.values():
+            repo.link(repositories)
+
+    def transaction(self):
+        """Unit of work: every facade/repository write inside the block is
+        committed once at the end (or rolled back together)::
+
+            with facade.transaction():
+                facade.create_amenity({...})
+                facade.update_place(place_id, {...})
+        """
+        return transaction()
 
     # Users
     def create_user(self, user_data):
         user = User(**user_data)
         self.user_repo.add(user)
         return user
-    def get_user(self, user_id):
-        return self.user_repo.get(user_id)
+    def create_users(self, users_data):
+        """Create several users with a single commit"""
+        return self.user_repo.add_many([User(**data) for data in users_data])
+    def get_user(self, user_id, primary=False):
+        return self.user_repo.get(user_id, primary=primary)
     def get_user_by_email(self, email):
-        return self.user_repo.get_by_attribute('email', email)
+        # Unicité de l'email, login juste après l'inscription : toujours la primaire
+        return self.user_repo.get_by_attribute('email', email, primary=True)
+    def get_users_by_emails(self, emails):
+        """Users registered with one of `emails` (one IN query, on the primary)"""
+        return self.user_repo.get_by_attribute_in('email', emails, primary=True)
+    def authenticate(self, email, password):
+        """User matching the credentials, or None.
+
+        A hash made with another bcrypt cost than the configured one is
+        transparently replaced by a new hash once the password is verified.
+        """
+        user = self.get_user_by_email(email)
+        if not user or not user.verify_password(password):
+            return None
+        if password_hasher.needs_rehash(user.password):
+            user.password = password
+            commit()
+        return user
+    def get_users_by_ids(self, user_ids):
+        return self.user_repo.get_by_ids(user_ids)
     def list_users(self):
         return self.user_repo.get_all()
     def update_user(self, user_id, data):
-        user = self.get_user(user_id)
+        user = self.get_user(user_id, primary=True)
         if not user:
             return None
         user.update(data)
-        db.session.commit()
+        commit()
         return user
     def delete_user(self, user_id):
         return self.user_repo.delete(user_id)
@@ -39,12 +81,19 @@ class HBnBFacade:
         amenity = Amenity(**amenity_data)
         self.amenity_repo.add(amenity)        
         return amenity
-    def get_amenity(self, amenity_id):
-        return self.amenity_repo.get(amenity_id)
-    def list_amenities(self):
-        return self.amenity_repo.get_all()
+    def create_amenities(self, amenities_data):
+        """Create several amenities with a single commit"""
+        return self.amenity_repo.add_many([Amenity(**data) for data in amenities_data])
+    def get_amenity(self, amenity_id, primary=False):
+        return self.amenity_repo.get(amenity_id, primary=primary)
+    def get_amenities_by_ids(self, amenity_ids):
+        return self.amenity_repo.get_by_ids(amenity_ids)
+    def list_amenities(self, primary=False):
+        return self.amenity_repo.get_all(primary=primary)
+    def get_amenities_version(self):
+        return self.amenity_repo.get_version()
     def update_amenity(self, amenity_id, data):
-        amenity = self.amenity_repo.get(amenity_id)
+        amenity = self.amenity_repo.get(amenity_id, primary=True)
         if not amenity:
             return None
         for key, value in data.items():
@@ -65,10 +114,31 @@ class HBnBFacade:
             user_id=review_data['user_id'] 
         )
 
-        self.review_repo.add(new_review)
+        # Review + agrégats de la place dans la même transaction
+        with self.transaction():
+            self.review_repo.add(new_review)
+            self.rating_stats_repo.apply_rating_delta(new_review.place_id, new_review.rating, 1)
 
         return new_review
 
+    def create_reviews(self, reviews_data):
+        """Create several reviews and update their places' stats in one transaction"""
+        with self.transaction():
+            reviews = self.review_repo.add_many([
+                Review(text=data['text'], rating=data['rating'],
+                       place_id=data['place_id'], user_id=data['user_id'])
+                for data in reviews_data
+            ])
+            # Un UPDATE par (place, note) plutôt qu'un par review
+            deltas = Counter((review.place_id, review.rating) for review in reviews)
+            for (place_id, rating), count in deltas.items():
+                self.rating_stats_repo.apply_rating_delta(place_id, rating, count)
+        return reviews
+
+    def get_reviewed_place_ids(self, user_id, place_ids):
+        """Places of place_ids the user has already reviewed"""
+        return self.review_repo.reviewed_place_ids(user_id, place_ids)
+
     def get_review(self, review_id):
     # Placeholder for logic to retrieve a review by ID
         return self.review_repo.get(review_id)
@@ -78,28 +148,57 @@ class HBnBFacade:
         return self.review_repo.get_all()
 
     def get_reviews_by_place(self, place_id):
-    # Placeholder for logic to retrieve all reviews for a specific place
-        all_reviews = self.review_repo.get_all()
-        return [review for review in all_reviews if review.place_id == place_id]
+        """All the reviews of a place, with their author loaded in the same query"""
+        return self.review_repo.filter_by_place(place_id, profile="list").all()
+
+    def get_reviews_version(self, place_id):
+        """(count, latest review updated_at, latest author updated_at) of the reviews of a place"""
+        return self.review_repo.get_reviews_version(place_id)
+
+    def list_reviews_by_place(self, place_id, sort="-created_at", limit=20, cursor=None):
+        """One page of the reviews of a place (newest first by default)"""
+        if sort not in ("created_at", "-created_at"):
+            raise ValueError(f"Invalid sort key: {sort}")
+        query = self.review_repo.filter_by_place(place_id, profile="list")
+        return self.review_repo.get_page(query, sort_attr="created_at",
+                                         descending=sort.startswith("-"),
+                                         limit=limit, cursor=cursor)
 
     def update_review(self, review_id, review_data):
     # Placeholder for logic to update a review
-        review = self.review_repo.get(review_id)
+        # Primaire : l'ancienne note retirée des agrégats doit être la dernière commitée
+        review = self.review_repo.get(review_id, primary=True)
         if not review:
             return None  
+        old_rating = review.rating
         # Mettre à jour les champs autorisés
         allowed_fields = ["text", "rating"]
         for field in allowed_fields:
             if field in review_data:
                 setattr(review, field, review_data[field])
 
+        # Déplace la note dans l'histogramme si elle a changé
+        if review.rating != old_rating:
+            self.rating_stats_repo.apply_rating_delta(review.place_id, old_rating, -1)
+            self.rating_stats_repo.apply_rating_delta(review.place_id, review.rating, 1)
+
         # Sauvegarder dans la DB
         self.review_repo.add(review)
         return review
 
     def delete_review(self, review_id):
-    # Placeholder for logic to delete a review
-        return self.review_repo.delete(review_id)
+        review = self.review_repo.get(review_id, primary=True)
+        if not review:
+            return None
+        with self.transaction():
+            self.review_repo.delete(review_id)
+            self.rating_stats_repo.apply_rating_delta(review.place_id, review.rating, -1)
+
+    def rebuild_rating_stats(self):
+        """Backfill: recompute place_rating_stats from the reviews table"""
+        count = self.rating_stats_repo.rebuild_rating_stats()
+        commit()
+        return count
 
     def get_review_by_user_and_place(self, user_id, place_id):
         """Return the review written by this user for a given place, if any."""
@@ -113,29 +212,108 @@ class HBnBFacade:
             place_data["user_id"] = place_data["owner_id"]
 
         amenities_ids = place_data.pop("amenities", [])
-        place = Place(**place_data)
-        self.place_repo.add(place)
-
-        # Créer les liens PlaceAmenity
-        for amenity_id in amenities_ids:
-            amenity = self.amenity_repo.get(amenity_id)
-            if amenity:
-                pa = PlaceAmenity(place_id=place.id, amenity_id=amenity.id)
-                db.session.add(pa)
-        db.session.commit()
+        # Place + liens PlaceAmenity : un seul commit
+        with self.transaction():
+            place = Place(**place_data)
+            place.place_amenities = [PlaceAmenity(amenity_id=amenity.id)
+                                     for amenity in self.amenity_repo.get_by_ids(amenities_ids)]
+            self.place_repo.add(place)
+        return place
+
+    @staticmethod
+    def _new_place(place_data):
+        """Place (not added) with its PlaceAmenity links, from already validated data"""
+        data = dict(place_data)
+        if not data.get("user_id"):
+            data["user_id"] = data["owner_id"]
+        data.setdefault("description", "")
+        amenity_ids = data.pop("amenities", [])
+        place = Place(**data)
+        place.place_amenities = [PlaceAmenity(amenity_id=amenity_id) for amenity_id in amenity_ids]
         return place
 
-    def get_place(self, place_id):
-        return self.place_repo.get(place_id)
+    def create_places(self, places_data):
+        """Create several places (amenity IDs already validated) with a single commit"""
+        return self.place_repo.add_many([self._new_place(data) for data in places_data])
+
+    def update_places(self, data_by_id):
+        """Apply {place_id: data} with one IN query and a single commit"""
+        with self.transaction():
+            places = self.place_repo.get_by_ids(list(data_by_id), profile="list")
+            for place in places:
+                data = dict(data_by_id[place.id])
+                amenity_ids = data.pop("amenities", None)
+                for key, value in data.items():
+                    setattr(place, key, value)
+                if amenity_ids is not None:
+                    place.place_amenities = [PlaceAmenity(amenity_id=amenity_id)
+                                             for amenity_id in amenity_ids]
+        return places
+
+    def get_place(self, place_id, profile=None, primary=False):
+        return self.place_repo.get(place_id, profile, primary=primary)
+
+    def get_places_by_ids(self, place_ids, profile="list"):
+        """Places in the order of place_ids (None for unknown IDs), one IN query"""
+        places = {place.id: place for place in self.place_repo.get_by_ids(place_ids, profile)}
+        return [places.get(place_id) for place_id in place_ids]
 
     def get_all_places(self):
         return self.place_repo.get_all()
 
+    PLACE_SORT_KEYS = ("id", "title", "price")
+
+    def list_places(self, min_price=None, max_price=None, owner_id=None,
+                    amenity_ids=None, sort="id", limit=20, cursor=None, profile="list"):
+        """Return one page of places (filters, sort and cursor done in SQL)"""
+        descending = sort.startswith("-")
+        sort_attr = sort.lstrip("-")
+        if sort_attr not in self.PLACE_SORT_KEYS:
+            raise ValueError(f"Invalid sort key: {sort}")
+
+        query = self.place_repo.filter_places(min_price=min_price, max_price=max_price,
+                                              owner_id=owner_id, amenity_ids=amenity_ids,
+                                              profile=profile)
+        return self.place_repo.get_page(query, sort_attr=sort_attr, descending=descending,
+                                        limit=limit, cursor=cursor)
+
+    def places_in_bbox(self, min_lat, min_lng, max_lat, max_lng, limit=100):
+        """Places inside a map viewport"""
+        return self.place_repo.filter_bbox(min_lat, min_lng, max_lat, max_lng, profile="list") \
+            .order_by(Place.id).limit(limit).all()
+
+    def places_nearby(self, latitude, longitude, radius_km, limit=20):
+        """Places within radius_km, nearest first: [(place, distance_km)]"""
+        # 1. Candidats via l'index geohash (bbox du cercle), sans charger les objets
+        candidates = self.place_repo.bbox_points(*geo.bbox_around(latitude, longitude, radius_km))
+        # 2. Distance exacte calculée en une passe sur tous les candidats
+        distances = geo.haversine_km(latitude, longitude,
+                                     [c.latitude for c in candidates],
+                                     [c.longitude for c in candidates])
+        nearest = sorted((d, c.id) for d, c in zip(distances, candidates) if d <= radius_km)[:limit]
+        # 3. Chargement des seules places retenues
+        places = {p.id: p for p in self.place_repo.get_by_ids([pid for _, pid in nearest], profile="list")}
+        return [(places[pid], d) for d, pid in nearest if pid in places]
+
+    def search_places(self, query, limit=20, cursor=None):
+        """One page of full-text search results, best match first: ([(place, score)], next_cursor)"""
+        offset = 0
+        if cursor:
+            kind, cursor_query, offset = decode_cursor(cursor)
+            if kind != "search" or cursor_query != query or not isinstance(offset, int) or offset < 0:
+                raise ValueError("Invalid cursor")
+        # Une ligne de plus que demandé pour savoir s'il y a une page suivante
+        hits = self.place_repo.search_places(query, limit + 1, offset)
+        next_cursor = encode_cursor(["search", query, offset + limit]) if len(hits) > limit else None
+        hits = hits[:limit]
+        places = self.get_places_by_ids([place_id for place_id, _ in hits])
+        return [(place, score) for place, (_, score) in zip(places, hits) if place], next_cursor
+
     def update_place(self, place_id, data):
-        place = self.get_place(place_id)
+        place = self.get_place(place_id, primary=True)
         if not place:
             return None
         for key, value in data.items():
             setattr(place, key, value)
-        db.session.commit()
+        commit()
         return place
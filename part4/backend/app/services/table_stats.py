@@ -0,0 +1,140 @@
+"""Nombre de lignes approximatif par table, servi depuis la mémoire.
+
+Deux sources se complètent :
+  - les commits de ce process ajustent les compteurs au fil de l'eau
+    (+1 par INSERT, -1 par DELETE, collectés au flush comme le cache) ;
+  - un thread de fond relit les statistiques au démarrage puis toutes les
+    TABLE_STATS_INTERVAL secondes : statistiques du moteur quand il en a
+    (PostgreSQL : pg_class.reltuples, MySQL : information_schema), sinon
+    un COUNT(*) par table, hors de toute requête HTTP. Il démarre avec
+    l'app (init_app), et dans chaque worker après un fork ; jusqu'à la fin
+    du premier refresh, snapshot() répond avec la source "pending".
+Les écritures faites en SQL direct (imports en masse, rebuild des
+agrégats) ou par d'autres process ne sont vues qu'au prochain refresh.
+"""
+import os
+import threading
+import time
+from collections import Counter
+from datetime import datetime, timezone
+from sqlalchemy import event, text
+from sqlalchemy.orm import Session
+from app import db
+
+DEFAULT_INTERVAL = 300
+
+
+def _engine_counts(connection):
+    """{table: nombre de lignes} et la source utilisée, selon le moteur"""
+    dialect = connection.dialect.name
+    if dialect == "postgresql":
+        rows = connection.execute(text(
+            "SELECT relname, reltuples::bigint FROM pg_class c "
+            "JOIN pg_namespace n ON n.oid = c.relnamespace "
+            "WHERE c.relkind = 'r' AND n.nspname = current_schema()"))
+        return {name: max(int(count), 0) for name, count in rows}, "pg_class"
+    if dialect in ("mysql", "mariadb"):
+        rows = connection.execute(text(
+            "SELECT table_name, table_rows FROM information_schema.tables "
+            "WHERE table_schema = DATABASE()"))
+        return {name: int(count or 0) for name, count in rows}, "information_schema"
+    tables = db.inspect(connection).get_table_names()
+    return {table: connection.execute(text(f'SELECT COUNT(*) FROM "{table}"')).scalar()
+            for table in tables}, "count"
+
+
+class TableStats:
+    def __init__(self, interval=DEFAULT_INTERVAL):
+        self.interval = interval
+        self._app = None
+        self._counts = {}
+        self._source = None
+        self._refreshed_at = None  # time.time() du dernier refresh complet
+        self._changes = 0          # écritures appliquées depuis ce refresh
+        self._lock = threading.Lock()
+        self._thread = None
+        self._pid = None
+
+        event.listen(Session, "after_flush", self._collect_deltas)
+        event.listen(Session, "after_commit", self._apply_deltas)
+        event.listen(Session, "after_rollback", self._discard_deltas)
+
+    def init_app(self, app):
+        self._app = app
+        self.interval = app.config.get("TABLE_STATS_INTERVAL", DEFAULT_INTERVAL)
+        self._ensure_started()
+
+    # --- Refresh ---
+    def refresh(self):
+        """Relit les compteurs (statistiques du moteur ou COUNT(*)); à appeler avec un app context"""
+        with db.engine.connect() as connection:
+            counts, source = _engine_counts(connection)
+        with self._lock:
+            self._counts, self._source = counts, source
+            self._refreshed_at = time.time()
+            self._changes = 0
+
+    def _refresh_loop(self):
+        # Premier refresh tout de suite, puis toutes les `interval` secondes (0 : une seule fois)
+        while True:
+            try:
+                with self._app.app_context():
+                    self.refresh()
+            except Exception as e:  # on garde les anciens compteurs, on réessaie au prochain tour
+                self._app.logger.warning("table stats refresh failed: %s", e)
+            if self.interval <= 0:
+                return
+            time.sleep(self.interval)
+
+    def _ensure_started(self):
+        # Un thread de fond par process : un thread ne survit pas au fork d'un worker
+        if self._app is None:
+            return
+        with self._lock:
+            if self._pid == os.getpid():
+                return
+            self._pid = os.getpid()
+        self._thread = threading.Thread(target=self._refresh_loop, name="table-stats", daemon=True)
+        self._thread.start()
+
+    def snapshot(self):
+        """Compteurs en mémoire avec leur fraîcheur ("pending" avant le premier refresh)"""
+        self._ensure_started()
+        with self._lock:
+            refreshed_at = self._refreshed_at
+            if refreshed_at is None:
+                return {"tables": {}, "approximate": True, "source": "pending", "refreshed_at": None,
+                        "age_seconds": None, "refresh_interval": self.interval, "writes_since_refresh": 0}
+            return {
+                "tables": dict(sorted(self._counts.items())),
+                "approximate": True,
+                "source": self._source,
+                "refreshed_at": datetime.fromtimestamp(refreshed_at, timezone.utc).isoformat(),
+                "age_seconds": round(time.time() - refreshed_at, 1),
+                "refresh_interval": self.interval,
+                "writes_since_refresh": self._changes,
+            }
+
+    # --- Ajustements incrémentaux ---
+    def _collect_deltas(self, session, flush_context):
+        deltas = session.info.setdefault("table_stats_deltas", Counter())
+        for obj in session.new:
+            deltas[obj.__table__.name] += 1
+        for obj in session.deleted:
+            deltas[obj.__table__.name] -= 1
+
+    def _apply_deltas(self, session):
+        deltas = session.info.pop("table_stats_deltas", None)
+        if not deltas:
+            return
+        with self._lock:
+            for table, delta in deltas.items():
+                if table in self._counts:
+                    self._counts[table] = max(self._counts[table] + delta, 0)
+                    self._changes += abs(delta)
+
+    def _discard_deltas(self, session):
+        session.info.pop("table_stats_deltas", None)
+
+
+table_stats = TableStats()
@@ -0,0 +1,185 @@
+"""Autorisation à partir des claims du JWT, sans requête SQL par appel.
+
+Le rôle (is_admin) est lu dans le token vérifié. Pour qu'un admin rétrogradé
+ou un utilisateur supprimé ne garde pas ses droits jusqu'à l'expiration du
+token, l'état courant des utilisateurs est gardé dans un cache en mémoire
+à durée de vie courte (AUTH_ROLE_CACHE_TTL) : au plus une requête SQL par
+utilisateur et par TTL. Les commits de ce process qui modifient ou
+suppriment un utilisateur invalident son entrée immédiatement.
+
+Les tokens révoqués (logout) sont gardés dans un stockage partagé par tous
+les workers : la table revoked_tokens, ou Redis si le cache de la facade
+l'utilise (CACHE_BACKEND='redis'). Chaque worker garde la réponse pour un
+jti pendant le même TTL : un logout est vu partout en AUTH_ROLE_CACHE_TTL
+secondes au plus, tout de suite dans le worker qui l'a traité.
+"""
+import threading
+import time
+from datetime import datetime, timezone
+from functools import wraps
+from flask_jwt_extended import verify_jwt_in_request, get_jwt
+from sqlalchemy import delete, event, select
+from sqlalchemy.orm import Session
+from app import db
+from app.models import RevokedToken, User
+from app.services import cache
+
+DEFAULT_ROLE_CACHE_TTL = 30
+
+_MISSING = object()
+
+
+class SQLRevokedTokens:
+    """jti révoqués dans la table revoked_tokens (partagée par les workers)"""
+
+    name = "sql"
+
+    def add(self, jti, exp):
+        expires_at = datetime.fromtimestamp(exp, timezone.utc).replace(tzinfo=None)
+        # Purge des tokens expirés au passage : la table reste petite
+        db.session.execute(delete(RevokedToken).where(RevokedToken.expires_at < datetime.utcnow()))
+        db.session.merge(RevokedToken(jti=jti, expires_at=expires_at))
+        db.session.commit()
+
+    def contains(self, jti):
+        return db.session.execute(
+            select(RevokedToken.jti).where(RevokedToken.jti == jti)
+        ).first() is not None
+
+
+class RedisRevokedTokens:
+    """jti révoqués dans Redis, une clé par token qui expire avec lui"""
+
+    name = "redis"
+
+    def __init__(self, url, prefix="hbnb:revoked:"):
+        self.client = cache.RedisCache(url).client
+        self.prefix = prefix
+
+    def add(self, jti, exp):
+        self.client.setex(self.prefix + jti, max(int(exp - time.time()), 1), b"1")
+
+    def contains(self, jti):
+        return bool(self.client.exists(self.prefix + jti))
+
+
+def create_revoked_store(config):
+    """Redis si le cache de la facade l'utilise, sinon la base"""
+    if config.get("CACHE_BACKEND") == "redis" and config.get("CACHE_REDIS_URL"):
+        return RedisRevokedTokens(config["CACHE_REDIS_URL"])
+    return SQLRevokedTokens()
+
+
+class RoleCache:
+    """Cache user_id -> is_admin (None si l'utilisateur n'existe plus) + jti -> révoqué"""
+
+    def __init__(self, ttl=DEFAULT_ROLE_CACHE_TTL):
+        self.ttl = ttl
+        self._roles = {}        # user_id -> (expires_at, is_admin)
+        self._revoked = {}      # jti -> (expires_at, révoqué)
+        self.revoked_store = SQLRevokedTokens()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.loads = 0
+
+        event.listen(Session, "after_flush", self._collect_invalidations)
+        event.listen(Session, "after_commit", self._apply_invalidations)
+        event.listen(Session, "after_rollback", self._discard_invalidations)
+
+    def init_app(self, app):
+        self.ttl = app.config.get("AUTH_ROLE_CACHE_TTL", DEFAULT_ROLE_CACHE_TTL)
+        self.revoked_store = create_revoked_store(app.config)
+        self._revoked = {}
+
+    def current_role(self, user_id):
+        """is_admin courant de l'utilisateur, None s'il a été supprimé"""
+        now = time.monotonic()
+        with self._lock:
+            expires_at, is_admin = self._roles.get(user_id, (0, _MISSING))
+            if is_admin is not _MISSING and expires_at > now:
+                self.hits += 1
+                return is_admin
+
+        is_admin = db.session.execute(
+            select(User.is_admin).where(User.id == user_id)
+        ).scalar_one_or_none()
+        with self._lock:
+            self.loads += 1
+            if self.ttl > 0:
+                self._roles[user_id] = (now + self.ttl, is_admin)
+        return is_admin
+
+    def invalidate(self, *user_ids):
+        with self._lock:
+            for user_id in user_ids:
+                self._roles.pop(user_id, None)
+
+    def revoke_token(self, jwt_payload):
+        """Révoque un token précis (logout) jusqu'à son expiration, pour tous les workers"""
+        jti = jwt_payload["jti"]
+        exp = jwt_payload.get("exp", time.time() + 86400)
+        self.revoked_store.add(jti, exp)
+        with self._lock:
+            # Révoqué pour de bon : gardé jusqu'à l'expiration du token
+            self._revoked[jti] = (time.monotonic() + max(exp - time.time(), 0), True)
+
+    def token_revoked(self, jti):
+        """jti présent dans le stockage partagé (réponse gardée AUTH_ROLE_CACHE_TTL secondes)"""
+        if jti is None:
+            return False
+        now = time.monotonic()
+        with self._lock:
+            expires_at, revoked = self._revoked.get(jti, (0, None))
+            if revoked is not None and expires_at > now:
+                return revoked
+
+        revoked = self.revoked_store.contains(jti)
+        with self._lock:
+            if self.ttl > 0:
+                self._revoked = {key: entry for key, entry in self._revoked.items() if entry[0] > now}
+                self._revoked[jti] = (now + self.ttl, revoked)
+        return revoked
+
+    def is_revoked(self, jwt_payload):
+        """Token refusé : révoqué, utilisateur supprimé, ou claim admin périmé"""
+        if self.token_revoked(jwt_payload.get("jti")):
+            return True
+        is_admin = self.current_role(jwt_payload["sub"])
+        if is_admin is None:
+            return True
+        return bool(jwt_payload.get("is_admin")) and not is_admin
+
+    def info(self):
+        with self._lock:
+            return {"ttl": self.ttl, "entries": len(self._roles), "revoked_store": self.revoked_store.name,
+                    "cached_tokens": len(self._revoked),
+                    "hits": self.hits, "loads": self.loads}
+
+    # --- Invalidation ---
+    def _collect_invalidations(self, session, flush_context):
+        users = session.info.setdefault("role_invalidations", set())
+        for obj in list(session.dirty) + list(session.deleted):
+            if isinstance(obj, User):
+                users.add(obj.id)
+
+    def _apply_invalidations(self, session):
+        users = session.info.pop("role_invalidations", None)
+        if users:
+            self.invalidate(*users)
+
+    def _discard_invalidations(self, session):
+        session.info.pop("role_invalidations", None)
+
+
+role_cache = RoleCache()
+
+
+def admin_required(fn):
+    """Valid JWT (see RoleCache.is_revoked) carrying the is_admin claim, else 403"""
+    @wraps(fn)
+    def wrapper(*args, **kwargs):
+        verify_jwt_in_request()
+        if not get_jwt().get("is_admin", False):
+            return {"error": "Admin privileges required"}, 403
+        return fn(*args, **kwargs)
+    return wrapper
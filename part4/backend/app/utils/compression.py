@@ -0,0 +1,218 @@
+"""Compression des réponses HTTP (gzip, brotli, zstd) négociée avec Accept-Encoding.
+
+- Réponses classiques : compressées si elles dépassent COMPRESS_MIN_SIZE.
+  Quand la réponse a un ETag (GET cacheable), la variante compressée est
+  gardée dans un cache LRU : les requêtes suivantes sur la même version ne
+  recompressent pas.
+- Réponses en flux (export NDJSON) : compressées chunk par chunk, chaque
+  chunk est vidé (flush) pour que le client le reçoive tout de suite.
+- Mode ASGI asynchrone : la vue tourne sur la boucle asyncio, la
+  compression est faite ensuite dans le pool de threads (app/asgi.py).
+
+brotli et zstandard sont optionnels : sans eux, seul gzip est proposé.
+"""
+import zlib
+from flask import request
+from app.persistence.routing import on_event_loop
+from app.services.cache import CacheStats, InProcessCache
+
+try:
+    import brotli
+except ImportError:  # dépendance optionnelle
+    brotli = None
+
+try:
+    import zstandard
+except ImportError:  # dépendance optionnelle
+    zstandard = None
+
+COMPRESSIBLE_MIMETYPES = {
+    "application/json", "application/x-ndjson", "application/javascript",
+    "text/html", "text/css", "text/plain", "text/javascript", "image/svg+xml",
+}
+
+
+class _GzipStream:
+    def __init__(self, level):
+        self._compressor = zlib.compressobj(level, zlib.DEFLATED, 31)  # wbits=31 : en-tête gzip
+
+    def compress(self, data):
+        return self._compressor.compress(data) + self._compressor.flush(zlib.Z_SYNC_FLUSH)
+
+    def finish(self):
+        return self._compressor.flush()
+
+
+class _BrotliStream:
+    def __init__(self, level):
+        self._compressor = brotli.Compressor(quality=level)
+
+    def compress(self, data):
+        return self._compressor.process(data) + self._compressor.flush()
+
+    def finish(self):
+        return self._compressor.finish()
+
+
+class _ZstdStream:
+    def __init__(self, level):
+        self._compressor = zstandard.ZstdCompressor(level=level).compressobj()
+
+    def compress(self, data):
+        return (self._compressor.compress(data)
+                + self._compressor.flush(zstandard.COMPRESSOBJ_FLUSH_BLOCK))
+
+    def finish(self):
+        return self._compressor.flush()
+
+
+def _compress_gzip(data, level):
+    compressor = zlib.compressobj(level, zlib.DEFLATED, 31)
+    return compressor.compress(data) + compressor.flush()
+
+
+# encodage -> (compression en une fois, classe de flux, niveau par défaut)
+CODECS = {"gzip": (_compress_gzip, _GzipStream, 6)}
+if brotli is not None:
+    CODECS["br"] = (lambda data, level: brotli.compress(data, quality=level), _BrotliStream, 4)
+if zstandard is not None:
+    CODECS["zstd"] = (lambda data, level: zstandard.ZstdCompressor(level=level).compress(data),
+                      _ZstdStream, 3)
+
+
+def negotiate(accept_encoding, preferred):
+    """Meilleur encodage accepté par le client parmi `preferred` (ordre du serveur), ou None"""
+    accepted = {}
+    for part in (accept_encoding or "").split(","):
+        name, _, params = part.strip().partition(";")
+        quality = 1.0
+        if params.strip().startswith("q="):
+            try:
+                quality = float(params.strip()[2:])
+            except ValueError:
+                quality = 0.0
+        if name:
+            accepted[name.strip().lower()] = quality
+    wildcard = accepted.get("*", 0.0)
+    candidates = [(accepted.get(name, wildcard), -rank, name)
+                  for rank, name in enumerate(preferred) if accepted.get(name, wildcard) > 0]
+    return max(candidates)[2] if candidates else None
+
+
+def compress_stream(chunks, encoding, level=None):
+    """Compresse un flux de chunks (str ou bytes), en vidant le compresseur à chaque chunk"""
+    stream = CODECS[encoding][1](level if level is not None else CODECS[encoding][2])
+    for chunk in chunks:
+        if isinstance(chunk, str):
+            chunk = chunk.encode("utf-8")
+        data = stream.compress(chunk)
+        if data:
+            yield data
+    yield stream.finish()
+
+
+class ResponseCompressor:
+    def __init__(self):
+        self.enabled = True
+        self.min_size = 1024
+        self.algorithms = [name for name in ("zstd", "br", "gzip") if name in CODECS]
+        self.levels = {}
+        self.variants = InProcessCache(512)
+        self.variant_ttl = 300
+        self.stats = CacheStats()
+
+    def init_app(self, app):
+        config = app.config
+        self.enabled = config.get("COMPRESS_ENABLED", True)
+        self.min_size = config.get("COMPRESS_MIN_SIZE", 1024)
+        self.algorithms = [name for name in config.get("COMPRESS_ALGORITHMS", ["zstd", "br", "gzip"])
+                           if name in CODECS]
+        self.levels = dict(config.get("COMPRESS_LEVELS") or {})
+        self.variants = InProcessCache(config.get("COMPRESS_CACHE_ENTRIES", 512))
+        self.variant_ttl = config.get("COMPRESS_CACHE_TTL", 300)
+        self.stats = CacheStats()
+        app.after_request(self.after_request)
+
+    def level(self, encoding):
+        return self.levels.get(encoding, CODECS[encoding][2])
+
+    def _record(self, encoding, bytes_in, bytes_out):
+        self.stats.incr(encoding, "responses")
+        self.stats.incr(encoding, "bytes_in", bytes_in)
+        self.stats.incr(encoding, "bytes_out", bytes_out)
+
+    def compressible(self, response):
+        return (self.enabled and 200 <= response.status_code and response.status_code not in (204, 304)
+                and response.mimetype in COMPRESSIBLE_MIMETYPES
+                and "Content-Encoding" not in response.headers and not response.direct_passthrough)
+
+    def after_request(self, response):
+        if not self.compressible(response):
+            return response
+        response.vary.add("Accept-Encoding")
+        if on_event_loop():
+            return response  # compressée hors de la boucle par app/asgi.py
+        return self.compress(response, request.full_path, request.headers.get("Accept-Encoding"))
+
+    def compress(self, response, full_path, accept_encoding):
+        """Compresse la réponse (en flux ou non) dans l'encodage négocié avec Accept-Encoding"""
+        encoding = negotiate(accept_encoding, self.algorithms)
+        if encoding is None:
+            if not response.is_streamed:
+                self._record("identity", response.content_length or 0, response.content_length or 0)
+            return response
+
+        if response.is_streamed:
+            response.response = self._compress_stream(response.response, encoding)
+            response.headers.pop("Content-Length", None)
+            response.headers["Content-Encoding"] = encoding
+            return response
+
+        data = response.get_data()
+        if len(data) < self.min_size:
+            self._record("identity", len(data), len(data))
+            return response
+
+        etag, weak = response.get_etag()
+        compressed = None
+        if etag and not weak:
+            key = (full_path, etag, encoding)
+            compressed = self.variants.get(key)
+            self.stats.incr(encoding, "hits" if compressed is not None else "misses")
+        if compressed is None:
+            compressed = CODECS[encoding][0](data, self.level(encoding))
+            if etag and not weak:
+                self.variants.set(key, compressed, self.variant_ttl)
+
+        response.set_data(compressed)
+        response.headers["Content-Encoding"] = encoding
+        if etag:
+            # Même version, autres octets : l'ETag devient faible (If-None-Match compare en faible)
+            response.set_etag(etag, weak=True)
+        self._record(encoding, len(data), len(compressed))
+        return response
+
+    def _compress_stream(self, chunks, encoding):
+        """compress_stream() avec comptage des octets avant / après compression"""
+        def counted(source):
+            for chunk in source:
+                if isinstance(chunk, str):
+                    chunk = chunk.encode("utf-8")
+                self.stats.incr(encoding, "bytes_in", len(chunk))
+                yield chunk
+
+        self.stats.incr(encoding, "responses")
+        for data in compress_stream(counted(chunks), encoding, self.level(encoding)):
+            self.stats.incr(encoding, "bytes_out", len(data))
+            yield data
+
+    def info(self):
+        per_encoding = self.stats.snapshot()
+        for counters in per_encoding.values():
+            bytes_in, bytes_out = counters.get("bytes_in", 0), counters.get("bytes_out", 0)
+            counters["ratio"] = round(bytes_out / bytes_in, 4) if bytes_in else None
+        return {"enabled": self.enabled, "min_size": self.min_size, "algorithms": self.algorithms,
+                "variants": self.variants.info(), "encodings": per_encoding}
+
+
+response_compressor = ResponseCompressor()
@@ -0,0 +1,119 @@
+"""Outils géographiques : geohash, couverture d'une bounding box, haversine."""
+import math
+
+try:  # numpy est optionnel : calcul vectorisé des distances s'il est installé
+    import numpy as np
+except ImportError:
+    np = None
+
+EARTH_RADIUS_KM = 6371.0088
+GEOHASH_PRECISION = 12
+MAX_COVER_CELLS = 32
+
+_BASE32 = "0123456789bcdefghjkmnpqrstuvwxyz"
+
+
+def encode_geohash(latitude, longitude, precision=GEOHASH_PRECISION):
+    """Encode (lat, lng) en geohash (les cellules proches partagent un préfixe)"""
+    lat_range = [-90.0, 90.0]
+    lng_range = [-180.0, 180.0]
+    chars = []
+    bits, bit_count, even = 0, 0, True
+
+    while len(chars) < precision:
+        value, rng = (longitude, lng_range) if even else (latitude, lat_range)
+        mid = (rng[0] + rng[1]) / 2
+        if value >= mid:
+            bits = (bits << 1) | 1
+            rng[0] = mid
+        else:
+            bits = bits << 1
+            rng[1] = mid
+        even = not even
+        bit_count += 1
+        if bit_count == 5:
+            chars.append(_BASE32[bits])
+            bits, bit_count = 0, 0
+    return "".join(chars)
+
+
+def cell_size(precision):
+    """(hauteur en degrés de latitude, largeur en degrés de longitude) d'une cellule"""
+    total_bits = 5 * precision
+    lng_bits = (total_bits + 1) // 2
+    lat_bits = total_bits // 2
+    return 180.0 / (2 ** lat_bits), 360.0 / (2 ** lng_bits)
+
+
+def split_bbox(min_lat, min_lng, max_lat, max_lng):
+    """Coupe une bbox qui traverse l'antiméridien (min_lng > max_lng) en deux"""
+    min_lat, max_lat = max(min_lat, -90.0), min(max_lat, 90.0)
+    if min_lng <= max_lng:
+        return [(min_lat, min_lng, max_lat, max_lng)]
+    return [(min_lat, min_lng, max_lat, 180.0), (min_lat, -180.0, max_lat, max_lng)]
+
+
+def cover_bbox(min_lat, min_lng, max_lat, max_lng, max_cells=MAX_COVER_CELLS):
+    """Préfixes geohash dont l'union couvre la bbox (au plus max_cells préfixes).
+
+    On part de la précision la plus fine et on remonte tant que la bbox
+    demande trop de cellules.
+    """
+    boxes = split_bbox(min_lat, min_lng, max_lat, max_lng)
+    for precision in range(GEOHASH_PRECISION, 0, -1):
+        height, width = cell_size(precision)
+        cells = 0
+        for b_min_lat, b_min_lng, b_max_lat, b_max_lng in boxes:
+            rows = math.floor(b_max_lat / height) - math.floor(b_min_lat / height) + 1
+            cols = math.floor(b_max_lng / width) - math.floor(b_min_lng / width) + 1
+            cells += rows * cols
+        if cells <= max_cells:
+            break
+
+    prefixes = set()
+    for b_min_lat, b_min_lng, b_max_lat, b_max_lng in boxes:
+        row = math.floor(b_min_lat / height)
+        while row * height <= b_max_lat:
+            col = math.floor(b_min_lng / width)
+            while col * width <= b_max_lng:
+                # Centre de la cellule, ramené dans les bornes du globe
+                lat = min(max((row + 0.5) * height, -90.0), 90.0)
+                lng = min(max((col + 0.5) * width, -180.0), 180.0)
+                prefixes.add(encode_geohash(lat, lng, precision))
+                col += 1
+            row += 1
+    return sorted(prefixes)
+
+
+def bbox_around(latitude, longitude, radius_km):
+    """Bbox (min_lat, min_lng, max_lat, max_lng) contenant le cercle de rayon radius_km"""
+    delta_lat = math.degrees(radius_km / EARTH_RADIUS_KM)
+    min_lat, max_lat = latitude - delta_lat, latitude + delta_lat
+    if min_lat <= -90 or max_lat >= 90:
+        # Le cercle contient un pôle : toutes les longitudes
+        return max(min_lat, -90.0), -180.0, min(max_lat, 90.0), 180.0
+
+    delta_lng = math.degrees(radius_km / (EARTH_RADIUS_KM * math.cos(math.radians(latitude))))
+    if delta_lng >= 180:
+        return min_lat, -180.0, max_lat, 180.0
+    min_lng = (longitude - delta_lng + 540) % 360 - 180
+    max_lng = (longitude + delta_lng + 540) % 360 - 180
+    return min_lat, min_lng, max_lat, max_lng
+
+
+def haversine_km(latitude, longitude, latitudes, longitudes):
+    """Distances (km) entre un point et une liste de points, en une passe"""
+    if np is not None:
+        lat1, lng1 = np.radians(latitude), np.radians(longitude)
+        lat2, lng2 = np.radians(np.asarray(latitudes, dtype=float)), np.radians(np.asarray(longitudes, dtype=float))
+        a = np.sin((lat2 - lat1) / 2) ** 2 + np.cos(lat1) * np.cos(lat2) * np.sin((lng2 - lng1) / 2) ** 2
+        return (2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(np.minimum(a, 1.0)))).tolist()
+
+    lat1, lng1 = math.radians(latitude), math.radians(longitude)
+    cos_lat1 = math.cos(lat1)
+    distances = []
+    for lat, lng in zip(latitudes, longitudes):
+        lat2, lng2 = math.radians(lat), math.radians(lng)
+        a = math.sin((lat2 - lat1) / 2) ** 2 + cos_lat1 * math.cos(lat2) * math.sin((lng2 - lng1) / 2) ** 2
+        distances.append(2 * EARTH_RADIUS_KM * math.asin(math.sqrt(min(a, 1.0))))
+    return distances
@@ -0,0 +1,45 @@
+"""Requêtes conditionnelles HTTP (ETag / Last-Modified / 304)."""
+import hashlib
+from datetime import timezone
+from flask import Response, request
+
+
+def make_etag(*parts):
+    """ETag fort calculé à partir des versions des lignes (pas du JSON)"""
+    digest = hashlib.sha1(repr(parts).encode("utf-8")).hexdigest()
+    return digest[:32]
+
+
+def latest(*dates):
+    """Plus récente des dates non nulles"""
+    dates = [d for d in dates if d is not None]
+    return max(dates) if dates else None
+
+
+def _is_not_modified(etag, last_modified):
+    # If-None-Match est prioritaire sur If-Modified-Since, et compare en faible (RFC 9110) :
+    # une variante compressée renvoie W/"etag"
+    if request.if_none_match:
+        return request.if_none_match.contains_weak(etag)
+    if request.if_modified_since and last_modified:
+        return last_modified.replace(microsecond=0) <= request.if_modified_since
+    return False
+
+
+def conditional(etag, last_modified, build):
+    """Answer 304 when the client copy is current, else build() the body.
+
+    build() -> (body, status), only called when the client needs the body.
+    `last_modified` is a naive UTC datetime (as stored in the tables).
+    """
+    if last_modified is not None:
+        last_modified = last_modified.replace(tzinfo=timezone.utc)
+    headers = {"ETag": f'"{etag}"', "Cache-Control": "no-cache"}
+    if last_modified is not None:
+        headers["Last-Modified"] = last_modified.strftime("%a, %d %b %Y %H:%M:%S GMT")
+
+    if request.method in ("GET", "HEAD") and _is_not_modified(etag, last_modified):
+        return Response(status=304, headers=headers)
+
+    body, status = build()
+    return body, status, headers
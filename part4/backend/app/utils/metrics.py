@@ -0,0 +1,205 @@
+"""Métriques de performance par requête, exposées au format Prometheus.
+
+Pour chaque route (la règle d'URL, pas le chemin : cardinalité bornée) :
+  - latence de la requête (histogramme),
+  - nombre de requêtes SQL et temps passé en SQL (événements SQLAlchemy),
+  - temps bcrypt (hachage / vérification des mots de passe).
+Les taux de hit des caches (facade, rôles, variantes compressées) et les
+octets compressés sont lus au moment du scrape, dans leurs propres compteurs.
+
+En dev (METRICS_HEADERS), chaque réponse porte aussi X-Query-Count et
+Server-Timing, visibles dans l'onglet réseau du navigateur.
+"""
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from flask import g, has_request_context, request
+from sqlalchemy import event
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+QUERY_BUCKETS = (0, 1, 2, 3, 5, 8, 13, 21, 50, 100)
+
+# nom -> (type, aide, buckets)
+METRICS = {
+    "hbnb_requests_total": ("counter", "Requests by route and status", None),
+    "hbnb_request_duration_seconds": ("histogram", "Request latency by route", LATENCY_BUCKETS),
+    "hbnb_request_sql_queries": ("histogram", "SQL statements per request by route", QUERY_BUCKETS),
+    "hbnb_request_sql_seconds": ("histogram", "Time spent in SQL per request by route", LATENCY_BUCKETS),
+    "hbnb_bcrypt_seconds": ("histogram", "bcrypt time per password operation", LATENCY_BUCKETS),
+}
+
+
+class Histogram:
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)  # dernier : +Inf
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value):
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+
+def _labels(labels):
+    if not labels:
+        return ""
+    escaped = (str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+               for value in labels.values())
+    return "{" + ",".join(f'{key}="{value}"' for key, value in zip(labels, escaped)) + "}"
+
+
+class RequestMetrics:
+    def __init__(self):
+        self.enabled = True
+        self.headers = False
+        self._lock = threading.Lock()
+        self._counters = {}    # (nom, labels) -> valeur
+        self._histograms = {}  # (nom, labels) -> Histogram
+
+    def init_app(self, app, engines):
+        self.enabled = app.config.get("METRICS_ENABLED", True)
+        self.headers = app.config.get("METRICS_HEADERS", False)
+        if not self.enabled:
+            return
+        for engine in engines:
+            self.watch_engine(engine)
+        app.before_request(self._before_request)
+        app.after_request(self._after_request)
+
+    def watch_engine(self, engine):
+        """Compte les requêtes SQL d'un moteur créé après init_app (mode ASGI)"""
+        if self.enabled:
+            event.listen(engine, "before_cursor_execute", self._before_cursor_execute)
+            event.listen(engine, "after_cursor_execute", self._after_cursor_execute)
+
+    # --- Enregistrement ---
+    def incr(self, name, labels, amount=1):
+        key = (name, tuple(labels.items()))
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + amount
+
+    def observe(self, name, labels, value):
+        key = (name, tuple(labels.items()))
+        with self._lock:
+            histogram = self._histograms.get(key)
+            if histogram is None:
+                histogram = self._histograms[key] = Histogram(METRICS[name][2])
+            histogram.observe(value)
+
+    @contextmanager
+    def timed_bcrypt(self, operation):
+        """Mesure une opération bcrypt (histogramme + temps de la requête en cours)"""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - started
+            if self.enabled:
+                self.observe("hbnb_bcrypt_seconds", {"operation": operation}, elapsed)
+                if has_request_context() and "metrics_started" in g:
+                    g.bcrypt_time += elapsed
+
+    def reset(self):
+        with self._lock:
+            self._counters.clear()
+            self._histograms.clear()
+
+    # --- Hooks SQLAlchemy ---
+    # Début de la requête gardé sur son contexte d'exécution (une pile dans conn.info
+    # fuyait : une requête en erreur n'a pas d'after_cursor_execute)
+    def _before_cursor_execute(self, conn, cursor, statement, parameters, context, executemany):
+        context._metrics_query_start = time.perf_counter()
+
+    def _after_cursor_execute(self, conn, cursor, statement, parameters, context, executemany):
+        elapsed = time.perf_counter() - context._metrics_query_start
+        if has_request_context() and "metrics_started" in g:
+            g.query_count += 1
+            g.query_time += elapsed
+
+    # --- Hooks Flask ---
+    def _before_request(self):
+        g.metrics_started = time.perf_counter()
+        g.query_count, g.query_time, g.bcrypt_time = 0, 0.0, 0.0
+
+    def _after_request(self, response):
+        if "metrics_started" not in g:
+            return response
+        elapsed = time.perf_counter() - g.metrics_started
+        route = request.url_rule.rule if request.url_rule else "<unmatched>"
+        labels = {"method": request.method, "route": route}
+        self.incr("hbnb_requests_total", dict(labels, status=str(response.status_code)))
+        self.observe("hbnb_request_duration_seconds", labels, elapsed)
+        self.observe("hbnb_request_sql_queries", labels, g.query_count)
+        self.observe("hbnb_request_sql_seconds", labels, g.query_time)
+
+        if self.headers:
+            timings = [f"app;dur={elapsed * 1000:.2f}",
+                       f'db;dur={g.query_time * 1000:.2f};desc="{g.query_count} queries"']
+            if g.bcrypt_time:
+                timings.append(f"bcrypt;dur={g.bcrypt_time * 1000:.2f}")
+            response.headers["X-Query-Count"] = str(g.query_count)
+            response.headers["Server-Timing"] = ", ".join(timings)
+        return response
+
+    # --- Export Prometheus ---
+    def _cache_lines(self):
+        """Compteurs des caches, lus dans leurs propres statistiques"""
+        from app.services import facade
+        from app.utils.authz import role_cache
+        from app.utils.compression import response_compressor
+
+        lines = ["# HELP hbnb_cache_requests_total Cache lookups by cache and result",
+                 "# TYPE hbnb_cache_requests_total counter"]
+        lookups = []
+        for kind, counters in facade.cache_stats()["entities"].items():
+            lookups.append(({"cache": f"facade_{kind}"}, counters.get("hits", 0), counters.get("misses", 0)))
+        roles = role_cache.info()
+        lookups.append(({"cache": "roles"}, roles["hits"], roles["loads"]))
+        compression = response_compressor.info()
+        for encoding, counters in compression["encodings"].items():
+            if "hits" in counters or "misses" in counters:
+                lookups.append(({"cache": f"compressed_{encoding}"},
+                                counters.get("hits", 0), counters.get("misses", 0)))
+        for labels, hits, misses in lookups:
+            lines.append(f"hbnb_cache_requests_total{_labels(dict(labels, result='hit'))} {hits}")
+            lines.append(f"hbnb_cache_requests_total{_labels(dict(labels, result='miss'))} {misses}")
+
+        lines += ["# HELP hbnb_response_bytes_total Response bytes before / after compression",
+                  "# TYPE hbnb_response_bytes_total counter"]
+        for encoding, counters in compression["encodings"].items():
+            for stage in ("in", "out"):
+                labels = {"encoding": encoding, "stage": stage}
+                lines.append(f"hbnb_response_bytes_total{_labels(labels)} {counters.get(f'bytes_{stage}', 0)}")
+        return lines
+
+    def render(self):
+        """Toutes les métriques au format texte Prometheus (version 0.0.4)"""
+        with self._lock:
+            counters = dict(self._counters)
+            histograms = {key: (h.buckets, list(h.counts), h.sum, h.count)
+                          for key, h in self._histograms.items()}
+
+        lines = []
+        for name, (kind, help_text, _) in METRICS.items():
+            lines += [f"# HELP {name} {help_text}", f"# TYPE {name} {kind}"]
+            if kind == "counter":
+                for (metric, labels), value in sorted(counters.items()):
+                    if metric == name:
+                        lines.append(f"{name}{_labels(dict(labels))} {value}")
+                continue
+            for (metric, labels), (buckets, counts, total, count) in sorted(histograms.items()):
+                if metric != name:
+                    continue
+                cumulative = 0
+                for bound, bucket_count in zip(list(buckets) + ["+Inf"], counts):
+                    cumulative += bucket_count
+                    lines.append(f"{name}_bucket{_labels(dict(labels, le=bound))} {cumulative}")
+                lines.append(f"{name}_sum{_labels(dict(labels))} {total}")
+                lines.append(f"{name}_count{_labels(dict(labels))} {count}")
+        return "\n".join(lines + self._cache_lines()) + "\n"
+
+
+metrics = RequestMetrics()
@@ -0,0 +1,102 @@
+"""Hachage bcrypt hors du thread de requête, dans un pool borné.
+
+Le coût bcrypt (BCRYPT_LOG_ROUNDS) est réglable par environnement. Au plus
+BCRYPT_MAX_PENDING hachages peuvent être en cours ou en attente : au-delà,
+HasherBusy est levée et l'API répond 429 au lieu de bloquer tous les
+workers pendant une rafale de logins.
+"""
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from itertools import repeat
+import bcrypt
+from app.utils.metrics import metrics
+
+
+class HasherBusy(Exception):
+    """Trop de hachages en attente, le client doit réessayer plus tard"""
+
+
+def _hash(password, rounds):
+    return bcrypt.hashpw(password.encode("utf-8"), bcrypt.gensalt(rounds)).decode("utf-8")
+
+
+def _verify(hashed, password):
+    try:
+        return bcrypt.checkpw(password.encode("utf-8"), hashed.encode("utf-8"))
+    except ValueError:  # hash invalide
+        return False
+
+
+def hash_rounds(hashed):
+    """Coût d'un hash bcrypt '$2b$12$...' (None si illisible)"""
+    try:
+        return int(hashed.split("$")[2])
+    except (AttributeError, IndexError, ValueError):
+        return None
+
+
+class PasswordHasher:
+    def __init__(self, rounds=12, workers=None, max_pending=None, executor="process"):
+        self._executor = None
+        self._lock = threading.Lock()
+        self.configure(rounds, workers, max_pending, executor)
+
+    def init_app(self, app):
+        self.configure(rounds=app.config.get("BCRYPT_LOG_ROUNDS", 12),
+                       workers=app.config.get("BCRYPT_WORKERS"),
+                       max_pending=app.config.get("BCRYPT_MAX_PENDING"),
+                       executor=app.config.get("BCRYPT_EXECUTOR", "process"))
+
+    def configure(self, rounds=12, workers=None, max_pending=None, executor="process"):
+        if executor not in ("process", "thread"):
+            raise ValueError("BCRYPT_EXECUTOR must be 'process' or 'thread'")
+        self.shutdown()
+        self.rounds = rounds
+        self.workers = workers or os.cpu_count() or 1
+        self.max_pending = max_pending or self.workers * 4
+        self.executor_kind = executor
+        self._slots = threading.BoundedSemaphore(self.max_pending)
+
+    def _get_executor(self):
+        # Créé à la première utilisation, et recréé après un fork (workers multi-process)
+        with self._lock:
+            if self._executor is None or self._pid != os.getpid():
+                pool = ProcessPoolExecutor if self.executor_kind == "process" else ThreadPoolExecutor
+                self._executor = pool(max_workers=self.workers)
+                self._pid = os.getpid()
+            return self._executor
+
+    def _run(self, fn, *args):
+        if not self._slots.acquire(blocking=False):
+            raise HasherBusy("Too many password operations in progress, retry later")
+        try:
+            return self._get_executor().submit(fn, *args).result()
+        finally:
+            self._slots.release()
+
+    def hash(self, password):
+        with metrics.timed_bcrypt("hash"):
+            return self._run(_hash, password, self.rounds)
+
+    def verify(self, hashed, password):
+        with metrics.timed_bcrypt("verify"):
+            return self._run(_verify, hashed, password)
+
+    def hash_many(self, passwords):
+        """Hache une liste de mots de passe en parallèle (imports, pas de 429)"""
+        with metrics.timed_bcrypt("hash_many"):
+            return list(self._get_executor().map(_hash, passwords, repeat(self.rounds)))
+
+    def needs_rehash(self, hashed):
+        """True si le hash a été fait avec un autre coût que celui configuré"""
+        return hash_rounds(hashed) != self.rounds
+
+    def shutdown(self):
+        with self._lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=False)
+                self._executor = None
+
+
+password_hasher = PasswordHasher()
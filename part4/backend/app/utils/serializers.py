@@ -0,0 +1,145 @@
+"""Sérialiseurs centralisés des modèles, avec projection de champs (?fields=).
+
+Chaque représentation est déclarée une seule fois : nom du champ -> attribut
+(ou fonction) à lire sur l'objet. Pour un couple (représentation, champs),
+la liste des lecteurs est compilée une fois puis gardée en cache :
+sérialiser un objet ne fait plus aucune recherche de champ, et les champs
+coûteux (amenities, rating, user) ne sont calculés que s'ils sont demandés.
+
+L'encodage JSON passe par orjson s'il est installé (JSON_BACKEND="orjson"),
+sinon par le module json de la bibliothèque standard.
+"""
+import json
+from datetime import date, datetime
+from functools import lru_cache
+from operator import attrgetter
+from flask import current_app, make_response
+
+try:
+    import orjson
+except ImportError:  # dépendance optionnelle
+    orjson = None
+
+_REGISTRY = {}
+
+
+def register(name, fields):
+    """Déclare une représentation : {champ: nom d'attribut ou callable(obj)}"""
+    _REGISTRY[name] = dict(fields)
+    _compile.cache_clear()
+
+
+@lru_cache(maxsize=256)
+def _compile(name, fields):
+    spec = _REGISTRY[name]
+    if fields is None:
+        fields = tuple(spec)
+    unknown = [field for field in fields if field not in spec]
+    if unknown:
+        raise ValueError(f"Unknown field(s): {', '.join(unknown)}")
+
+    # Attributs simples : un seul attrgetter pour tous; les callables à part
+    plain = [field for field in fields if isinstance(spec[field], str)]
+    computed = tuple((field, spec[field]) for field in fields if not isinstance(spec[field], str))
+    read_plain = attrgetter(*[spec[field] for field in plain]) if plain else None
+    if len(plain) == 1:
+        read_one = read_plain
+        read_plain = lambda obj: (read_one(obj),)  # noqa: E731
+
+    def serialize_one(obj):
+        result = dict(zip(plain, read_plain(obj))) if plain else {}
+        for key, getter in computed:
+            result[key] = getter(obj)
+        return result
+    return serialize_one
+
+
+def serializer(name, fields=None):
+    """Fonction obj -> dict de la représentation; lève ValueError si un champ est inconnu"""
+    return _compile(name, tuple(fields) if fields else None)
+
+
+def serialize(name, obj, fields=None):
+    return serializer(name, fields)(obj)
+
+
+def serialize_many(name, objs, fields=None):
+    serialize_one = serializer(name, fields)
+    return [serialize_one(obj) for obj in objs]
+
+
+def parse_fields(args):
+    """?fields=id,title -> ("id", "title"), ou None si absent"""
+    raw = args.get("fields")
+    if not raw:
+        return None
+    return tuple(dict.fromkeys(f.strip() for f in raw.split(",") if f.strip())) or None
+
+
+# Encodage JSON
+
+def _default(obj):
+    if isinstance(obj, (datetime, date)):
+        return obj.isoformat()
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+def dumps(data, backend="orjson"):
+    """Encode en JSON (bytes), avec orjson si disponible"""
+    if backend == "orjson" and orjson is not None:
+        return orjson.dumps(data, default=_default, option=orjson.OPT_NON_STR_KEYS)
+    return json.dumps(data, default=_default, ensure_ascii=False,
+                      separators=(",", ":")).encode("utf-8")
+
+
+def output_json(data, code, headers=None):
+    """Représentation application/json de l'API (remplace celle de flask-restx)"""
+    response = make_response(dumps(data, current_app.config.get("JSON_BACKEND", "orjson")), code)
+    response.headers.extend(headers or {})
+    response.mimetype = "application/json"
+    return response
+
+
+# Représentations
+
+def rating_summary(place):
+    """Agrégats de notes d'une place (lus dans place_rating_stats)"""
+    stats = place.rating_stats
+    if not stats:
+        return {"count": 0, "average": None, "histogram": {str(i): 0 for i in range(1, 6)}}
+    return {"count": stats.review_count, "average": stats.average, "histogram": stats.histogram}
+
+
+register("amenity", {"id": "id", "name": "name"})
+
+register("user", {"id": "id", "first_name": "first_name", "last_name": "last_name", "email": "email"})
+
+register("author", {"id": "id", "first_name": "first_name", "last_name": "last_name"})
+
+_amenities = serializer("amenity")
+_author = serializer("author")
+
+register("place", {
+    "id": "id",
+    "title": "title",
+    "description": "description",
+    "price": "price",
+    "latitude": "latitude",
+    "longitude": "longitude",
+    "owner_id": "owner_id",
+    "amenities": lambda place: [_amenities(a) for a in place.amenities],
+    "rating": rating_summary,
+})
+
+register("review", {
+    "id": "id",
+    "text": "text",
+    "rating": "rating",
+    "user_id": "user_id",
+    "place_id": "place_id",
+    "user": lambda review: _author(review.user),
+})
+
+# Champs par défaut des reviews selon l'endpoint (l'auteur n'est chargé que dans les listes d'une place)
+REVIEW_FIELDS = ("id", "text", "rating", "user_id", "place_id")
+PLACE_REVIEW_FIELDS = ("id", "text", "rating", "user")
@@ -0,0 +1,9 @@
+"""Point d'entrée ASGI (voir app/asgi.py) :
+
+    pip install aiosqlite uvicorn
+    uvicorn asgi:app --host 0.0.0.0 --port 5000
+"""
+from app.asgi import HBnBASGI
+from wsgi import app as flask_app
+
+app = HBnBASGI(flask_app)
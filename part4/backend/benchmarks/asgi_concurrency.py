@@ -0,0 +1,105 @@
+"""Débit sous connexions concurrentes : threads WSGI vs mode ASGI asynchrone.
+
+Base SQLite temporaire remplie comme benchmarks.load_test, puis C clients
+concurrents enchaînent des GET de places et de reviews contre l'app ASGI
+(app/asgi.py), appelée en process (sans couche HTTP) :
+  - "threads" : tout passe par le pool de --threads threads (équivalent
+    d'un serveur WSGI threadé) ;
+  - "async"   : les GET des places / reviews tournent sur la boucle
+    asyncio, avec aiosqlite.
+Affiche req/s, p50 et p95 pour chaque niveau de concurrence.
+
+Usage (depuis part4/backend, pip install aiosqlite) :
+    python -m benchmarks.asgi_concurrency [--concurrency 1,16,64,256] [--requests 2000] [--threads 8]
+"""
+import argparse
+import asyncio
+import random
+import time
+from benchmarks.load_test import seed  # crée la base temporaire avant l'import de l'app
+from app import create_app, db
+from app.asgi import HBnBASGI
+
+
+async def request(app, path, query=""):
+    """GET en process sur l'app ASGI; retourne le status"""
+    scope = {"type": "http", "http_version": "1.1", "method": "GET", "scheme": "http",
+             "path": path, "root_path": "", "query_string": query.encode("latin-1"),
+             "headers": [(b"host", b"localhost")], "server": ("localhost", 80),
+             "client": ("127.0.0.1", 50000)}
+    status = {}
+
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        if message["type"] == "http.response.start":
+            status["code"] = message["status"]
+
+    await app(scope, receive, send)
+    return status["code"]
+
+
+async def run(app, dataset, concurrency, total):
+    """C clients en parallèle, total requêtes; retourne (req/s, latences, erreurs)"""
+    latencies, errors = [], 0
+    per_client = max(total // concurrency, 1)
+
+    async def client(seed_value):
+        nonlocal errors
+        rng = random.Random(seed_value)
+        for _ in range(per_client):
+            place_id = rng.choice(dataset.place_ids)
+            path, query = rng.choice([("/api/v1/places/", "limit=20"),
+                                      (f"/api/v1/places/{place_id}", ""),
+                                      (f"/api/v1/places/{place_id}/reviews", "limit=10")])
+            started = time.perf_counter()
+            if await request(app, path, query) >= 400:
+                errors += 1
+            latencies.append(time.perf_counter() - started)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(client(i) for i in range(concurrency)))
+    elapsed = time.perf_counter() - started
+    return len(latencies) / elapsed, sorted(latencies), errors
+
+
+def percentile(values, p):
+    return values[min(int(len(values) * p), len(values) - 1)] * 1000
+
+
+async def compare(modes, dataset, levels, total):
+    print(f"\n{'mode':8s} {'conns':>6s} {'req/s':>8s} {'p50 ms':>8s} {'p95 ms':>8s} {'errors':>7s}")
+    for concurrency in levels:
+        for name, app in modes.items():
+            rps, latencies, errors = await run(app, dataset, concurrency, total)
+            print(f"{name:8s} {concurrency:>6d} {rps:>8.0f} {percentile(latencies, 0.5):>8.1f} "
+                  f"{percentile(latencies, 0.95):>8.1f} {errors:>7d}")
+    for app in modes.values():
+        await app.aclose()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--concurrency", default="1,16,64,256")
+    parser.add_argument("--requests", type=int, default=2000, help="requests per concurrency level")
+    parser.add_argument("--threads", type=int, default=8, help="thread pool size of the WSGI side")
+    parser.add_argument("--users", type=int, default=200)
+    parser.add_argument("--places", type=int, default=2000)
+    parser.add_argument("--reviews", type=int, default=10000)
+    args = parser.parse_args()
+
+    flask_app = create_app()
+    with flask_app.app_context():
+        db.create_all()
+        dataset = seed(random.Random(42), args.users, args.places, args.reviews)
+    print(f"seeded {args.users} users, {args.places} places, {args.reviews} reviews")
+
+    modes = {"threads": HBnBASGI(flask_app, async_prefixes=(), threads=args.threads),
+             "async": HBnBASGI(flask_app, threads=args.threads)}
+    levels = [int(level) for level in args.concurrency.split(",")]
+    asyncio.run(compare(modes, dataset, levels, args.requests))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,62 @@
+"""Coût d'un appel protégé par JWT selon le cache des rôles.
+
+Compare GET /auth/protected (jwt_required) et POST /admin/import (admin_required,
+rejeté avant tout travail faute d'import_id) avec :
+  - cache des rôles actif (AUTH_ROLE_CACHE_TTL=30, aucune requête SQL)
+  - cache désactivé (TTL=0 : une requête SQL par appel, comme l'ancien
+    facade.user_repo.get(user_id) des endpoints amenities)
+
+Usage (depuis part4/backend, base déjà remplie par script.py) :
+    python -m benchmarks.auth_overhead [--requests 2000]
+"""
+import argparse
+import time
+from flask_jwt_extended import create_access_token
+from app import create_app
+from app.models import User
+from app.persistence.query_counter import count_queries
+from app.utils.authz import role_cache
+
+ENDPOINTS = [
+    ("GET", "/api/v1/auth/protected"),
+    ("POST", "/api/v1/admin/import/users"),
+]
+
+
+def measure(app, client, method, url, requests):
+    with app.app_context(), count_queries() as counter:
+        started = time.perf_counter()
+        for _ in range(requests):
+            client.open(url, method=method)
+        elapsed = time.perf_counter() - started
+    return 1e6 * elapsed / requests, counter.count / requests
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=2000)
+    args = parser.parse_args()
+
+    app = create_app()
+    with app.app_context():
+        admin = User.query.filter_by(is_admin=True).first()
+        if not admin:
+            print("❌ Database is empty, run script.py first")
+            return
+        token = create_access_token(identity=admin.id, additional_claims={"is_admin": True})
+    client = app.test_client()
+    client.set_cookie("access_token_cookie", token)
+
+    print(f"\n{'endpoint':36s} {'role cache':>10s} {'µs/req':>10s} {'SQL/req':>8s}")
+    for method, url in ENDPOINTS:
+        for ttl in (30, 0):
+            role_cache.ttl = ttl
+            role_cache.invalidate(admin.id)
+            client.open(url, method=method)  # chauffe
+            us_per_request, queries = measure(app, client, method, url, args.requests)
+            label = f"ttl={ttl}s" if ttl else "off"
+            print(f"{method + ' ' + url:36s} {label:>10s} {us_per_request:>10.1f} {queries:>8.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,52 @@
+"""Octets sur le réseau et coût CPU de la compression des réponses.
+
+Appelle les listes de l'API avec chaque Accept-Encoding disponible
+(identity, gzip, et br / zstd si installés) et affiche la taille envoyée
+et le temps moyen par requête. Le deuxième passage sur une réponse avec
+ETag réutilise la variante compressée en cache.
+
+Usage (depuis part4/backend, base déjà remplie par script.py) :
+    python -m benchmarks.compression [--requests 200]
+"""
+import argparse
+import time
+from app import create_app
+from app.models import Place
+from app.utils.compression import CODECS, response_compressor
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=200)
+    args = parser.parse_args()
+
+    app = create_app()
+    with app.app_context():
+        place = Place.query.first()
+        if not place:
+            print("❌ Database is empty, run script.py first")
+            return
+        urls = ["/api/v1/places/?limit=100", "/api/v1/users/",
+                f"/api/v1/places/{place.id}?include=reviews"]
+    client = app.test_client()
+    response_compressor.min_size = 0  # même les petites réponses de la base de démo
+
+    print(f"\n{'url':52s} {'encoding':>8s} {'bytes':>8s} {'ratio':>6s} {'µs/req':>8s}")
+    for url in urls:
+        identity = None
+        for encoding in ["identity"] + list(CODECS):
+            headers = {"Accept-Encoding": encoding}
+            size = len(client.get(url, headers=headers).data)
+            identity = identity or size
+            started = time.perf_counter()
+            for _ in range(args.requests):
+                client.get(url, headers=headers)
+            elapsed = time.perf_counter() - started
+            print(f"{url[:52]:52s} {encoding:>8s} {size:>8d} {size / identity:>6.2f} "
+                  f"{1e6 * elapsed / args.requests:>8.0f}")
+
+    print(f"\n{response_compressor.info()}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,127 @@
+"""Démarrage à froid et débit stable : serveur de dev vs gunicorn (gunicorn.conf.py).
+
+Base SQLite temporaire remplie comme benchmarks.load_test, puis pour
+chaque configuration :
+  - démarre le serveur dans un process séparé et mesure le temps jusqu'à
+    la première réponse 200 (démarrage à froid) ;
+  - envoie des GET de places depuis --clients connexions keep-alive
+    pendant --duration secondes (débit stable, p50 / p95).
+
+Usage (depuis part4/backend) :
+    python -m benchmarks.launcher [--workers 1,4] [--threads 4] [--clients 16] [--duration 10]
+"""
+import argparse
+import http.client
+import os
+import random
+import socket
+import subprocess
+import sys
+import threading
+import time
+from benchmarks.load_test import seed  # crée la base temporaire avant l'import de l'app
+from app import create_app, db
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def wait_ready(port, timeout=60):
+    """Secondes jusqu'à la première réponse 200"""
+    started = time.perf_counter()
+    while time.perf_counter() - started < timeout:
+        try:
+            connection = http.client.HTTPConnection("127.0.0.1", port, timeout=2)
+            connection.request("GET", "/api/v1/places/?limit=1")
+            if connection.getresponse().status == 200:
+                return time.perf_counter() - started
+        except OSError:
+            time.sleep(0.02)
+    raise RuntimeError(f"server on port {port} did not answer within {timeout}s")
+
+
+def steady_state(port, place_ids, clients, duration):
+    """(req/s, latences triées, erreurs) sur `duration` secondes"""
+    latencies, errors = [], [0]
+    lock = threading.Lock()
+    deadline = time.perf_counter() + duration
+
+    def client(seed_value):
+        rng = random.Random(seed_value)
+        connection = http.client.HTTPConnection("127.0.0.1", port, timeout=30)
+        mine = []
+        while time.perf_counter() < deadline:
+            place_id = rng.choice(place_ids)
+            path = rng.choice(["/api/v1/places/?limit=20", f"/api/v1/places/{place_id}",
+                               f"/api/v1/places/{place_id}/reviews?limit=10"])
+            started = time.perf_counter()
+            connection.request("GET", path)
+            response = connection.getresponse()
+            response.read()
+            mine.append(time.perf_counter() - started)
+            if response.status >= 400:
+                with lock:
+                    errors[0] += 1
+        with lock:
+            latencies.extend(mine)
+
+    threads = [threading.Thread(target=client, args=(i,)) for i in range(clients)]
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return len(latencies) / (time.perf_counter() - started), sorted(latencies), errors[0]
+
+
+def server_commands(workers, threads, port):
+    """{nom: commande} des serveurs comparés"""
+    commands = {"dev (werkzeug, threaded)": [sys.executable, "-m", "flask", "--app", "wsgi", "run",
+                                             "--port", str(port), "--with-threads"]}
+    for count in workers:
+        commands[f"gunicorn {count}w x {threads}t"] = [
+            sys.executable, "-m", "gunicorn", "-c", "gunicorn.conf.py",
+            "--bind", f"127.0.0.1:{port}", "--workers", str(count), "--threads", str(threads)]
+    return commands
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--workers", default="1,4", help="gunicorn worker counts to compare")
+    parser.add_argument("--threads", type=int, default=4)
+    parser.add_argument("--clients", type=int, default=16)
+    parser.add_argument("--duration", type=float, default=10)
+    parser.add_argument("--places", type=int, default=2000)
+    parser.add_argument("--reviews", type=int, default=10000)
+    args = parser.parse_args()
+
+    with create_app().app_context():
+        db.create_all()
+        dataset = seed(random.Random(42), 200, args.places, args.reviews)
+    # Sans Redis ici : cache de la facade coupé (gunicorn refuse plusieurs workers avec le cache en mémoire)
+    env = dict(os.environ, FLASK_CONFIG="production", METRICS_HEADERS="0", CACHE_ENABLED="0")
+
+    print(f"\n{'server':28s} {'cold start':>10s} {'req/s':>8s} {'p50 ms':>8s} {'p95 ms':>8s} {'errors':>7s}")
+    workers = [int(count) for count in args.workers.split(",")]
+    port = free_port()
+    for name, command in server_commands(workers, args.threads, port).items():
+        process = subprocess.Popen(command, cwd=BACKEND_DIR, env=env,
+                                   stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        try:
+            cold_start = wait_ready(port)
+            rps, latencies, errors = steady_state(port, dataset.place_ids, args.clients, args.duration)
+        finally:
+            process.terminate()
+            process.wait()
+        p50 = latencies[len(latencies) // 2] * 1000
+        p95 = latencies[min(int(len(latencies) * 0.95), len(latencies) - 1)] * 1000
+        print(f"{name:28s} {cold_start:>9.2f}s {rps:>8.0f} {p50:>8.1f} {p95:>8.1f} {errors:>7d}")
+
+
+if __name__ == "__main__":
+    main()
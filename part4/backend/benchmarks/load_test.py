@@ -0,0 +1,294 @@
+"""Test de charge des chemins chauds de l'API REST, avec baselines.
+
+Remplit une base SQLite temporaire (version agrandie des données de
+script.py : N users, places et reviews), puis envoie à l'app Flask un
+mélange réaliste de requêtes depuis plusieurs "visiteurs" en parallèle :
+lister les places, voir une place, voir une place et ses reviews, se
+connecter, poster une review.
+
+Affiche par endpoint : p50 / p95 / p99, débit, erreurs et requêtes SQL
+par appel (en-tête X-Query-Count). --save-baseline enregistre ces chiffres ;
+les lancements suivants les comparent et sortent en erreur (code 1) si un
+endpoint fait plus de requêtes SQL qu'avant ou si son p95 dépasse la
+baseline de plus de --tolerance. Les latences dépendent de la machine :
+une baseline se compare sur la machine qui l'a produite.
+
+Usage (depuis part4/backend) :
+    python -m benchmarks.load_test [--mix browse|mixed|write] [--requests 2000] [--workers 4]
+                                   [--users 200] [--places 2000] [--reviews 10000]
+                                   [--save-baseline] [--baseline PATH] [--tolerance 0.25]
+"""
+import argparse
+import json
+import math
+import os
+import random
+import sys
+import tempfile
+import threading
+import time
+from collections import defaultdict
+
+WORK_DIR = tempfile.mkdtemp(prefix="hbnb-load-")
+# Avant l'import de l'app : config.py lit l'environnement au chargement
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(WORK_DIR, 'load.db')}"
+os.environ["METRICS_HEADERS"] = "1"  # X-Query-Count sur chaque réponse
+
+from app import create_app, db  # noqa: E402
+from app.models import Amenity, Place, PlaceAmenity, Review, User  # noqa: E402
+from app.services import facade  # noqa: E402
+from app.utils.password_hasher import password_hasher  # noqa: E402
+
+DEFAULT_BASELINE = os.path.join(os.path.dirname(__file__), "baselines", "load_test.json")
+PASSWORD = "admin123"
+
+# Données de script.py, combinées pour en générer autant que voulu
+CITIES = [("Paris Centre", 48.8566, 2.3522), ("Montmartre", 48.8867, 2.3431), ("Lyon", 45.7640, 4.8357),
+          ("Bordeaux", 44.8540, -0.5667), ("Marseille", 43.2800, 5.3700), ("Nantes", 47.2184, -1.5536),
+          ("Annecy", 45.8992, 6.1294), ("Rennes", 48.1030, -1.6720), ("Lille", 50.6400, 3.0632),
+          ("Toulouse", 43.6000, 1.4300)]
+KINDS = ["Appartement", "Studio", "Loft", "Maison", "Villa", "Duplex", "Chalet"]
+FIRST_NAMES = ["Rami", "Marie", "Paul", "Laura", "Luc", "Emma"]
+LAST_NAMES = ["SWE", "Durand", "Martin", "Bernard", "Moreau", "Lefevre"]
+AMENITIES = ["WiFi", "Swimming Pool", "Air Conditioning", "Parking", "Kitchen", "Washer"]
+REVIEW_TEXTS = [
+    "Excellent séjour, appartement très bien situé!", "Logement propre et bien équipé.",
+    "Quartier calme, hôte très réactif.", "Très bonne expérience, je recommande.",
+    "Bon rapport qualité/prix.", "Vue incroyable, literie confortable.",
+    "Emplacement idéal pour visiter la ville.", "Logement conforme à l’annonce.",
+    "Hôte sympathique et arrangeant.", "Séjour parfait, merci encore !",
+]
+
+# Poids de chaque opération dans un mélange
+MIXES = {
+    "browse": {"browse_places": 50, "view_place": 30, "view_place_reviews": 20},
+    "mixed": {"browse_places": 35, "view_place": 25, "view_place_reviews": 25, "login": 5, "post_review": 10},
+    "write": {"browse_places": 20, "view_place_reviews": 20, "login": 10, "post_review": 50},
+}
+
+
+class Dataset:
+    """Identifiants des données créées, partagés entre les visiteurs"""
+
+    def __init__(self, users, place_ids, place_users, reviewed):
+        self.users = users              # [(email, user_id)]
+        self.place_ids = place_ids
+        self.place_users = place_users  # place_id -> user_id (interdit de reviewer sa place)
+        self.reviewed = reviewed        # {(user_id, place_id)}
+        self._lock = threading.Lock()
+
+    def reviewable_place(self, rng, user_id):
+        """Une place que ce user peut encore reviewer (réservée pour lui), ou None"""
+        with self._lock:
+            for _ in range(20):
+                place_id = rng.choice(self.place_ids)
+                if self.place_users[place_id] != user_id and (user_id, place_id) not in self.reviewed:
+                    self.reviewed.add((user_id, place_id))
+                    return place_id
+        return None
+
+
+def seed(rng, users, places, reviews):
+    """Crée users, amenities, places et reviews en une transaction"""
+    hashed = password_hasher.hash(PASSWORD)  # un seul bcrypt pour tous les comptes
+    with facade.transaction():
+        amenities = [Amenity(name=name) for name in AMENITIES]
+        user_objs = []
+        for i in range(users):
+            user = User(first_name=FIRST_NAMES[i % len(FIRST_NAMES)], last_name=LAST_NAMES[i % len(LAST_NAMES)],
+                        email=f"user{i}@load.hbnb.io", is_admin=False)
+            user._password = hashed
+            user_objs.append(user)
+        db.session.add_all(amenities + user_objs)
+        db.session.flush()
+
+        place_objs, links = [], []
+        for i in range(places):
+            city, latitude, longitude = CITIES[i % len(CITIES)]
+            place = Place(title=f"{KINDS[i % len(KINDS)]} {city} {i}",
+                          description=f"{KINDS[i % len(KINDS)]} à {city}",
+                          price=round(rng.uniform(40, 400), 2),
+                          latitude=latitude + rng.uniform(-0.1, 0.1), longitude=longitude + rng.uniform(-0.1, 0.1),
+                          owner_id=rng.choice(user_objs).id, user_id=rng.choice(user_objs).id)
+            place_objs.append(place)
+        db.session.add_all(place_objs)
+        db.session.flush()
+        for place in place_objs:
+            links += [PlaceAmenity(place_id=place.id, amenity_id=a.id) for a in rng.sample(amenities, 3)]
+        db.session.add_all(links)
+
+        reviewed, review_objs = set(), []
+        while len(review_objs) < reviews:
+            user, place = rng.choice(user_objs), rng.choice(place_objs)
+            if place.user_id == user.id or (user.id, place.id) in reviewed:
+                continue
+            reviewed.add((user.id, place.id))
+            review_objs.append(Review(text=rng.choice(REVIEW_TEXTS), rating=rng.randint(1, 5),
+                                      user_id=user.id, place_id=place.id))
+        db.session.add_all(review_objs)
+        facade.rebuild_rating_stats()
+
+    return Dataset([(u.email, u.id) for u in user_objs], [p.id for p in place_objs],
+                   {p.id: p.user_id for p in place_objs}, reviewed)
+
+
+class Visitor:
+    """Un client HTTP (cookies propres) qui joue des opérations au hasard"""
+
+    def __init__(self, app, dataset, rng):
+        self.client = app.test_client()
+        self.dataset = dataset
+        self.rng = rng
+        self.email, self.user_id = rng.choice(dataset.users)
+        self.cursor = None
+
+    def login(self):
+        response = self.client.post("/api/v1/auth/login", json={"email": self.email, "password": PASSWORD})
+        return "POST /auth/login", response
+
+    def browse_places(self):
+        # Page suivante une fois sur deux, sinon première page d'un tri au hasard
+        if self.cursor and self.rng.random() < 0.5:
+            url = f"/api/v1/places/?cursor={self.cursor[1]}&sort={self.cursor[0]}"
+        else:
+            sort = self.rng.choice(["id", "price", "-price", "title"])
+            url, self.cursor = f"/api/v1/places/?sort={sort}", (sort, None)
+        response = self.client.get(url)
+        next_cursor = response.status_code == 200 and response.json.get("next_cursor")
+        self.cursor = (self.cursor[0], next_cursor) if next_cursor else None
+        return "GET /places/", response
+
+    def view_place(self):
+        return "GET /places/<id>", self.client.get(f"/api/v1/places/{self.rng.choice(self.dataset.place_ids)}")
+
+    def view_place_reviews(self):
+        place_id = self.rng.choice(self.dataset.place_ids)
+        if self.rng.random() < 0.5:
+            return "GET /places/<id>?include=reviews", self.client.get(f"/api/v1/places/{place_id}?include=reviews")
+        return "GET /places/<id>/reviews", self.client.get(f"/api/v1/places/{place_id}/reviews")
+
+    def post_review(self):
+        place_id = self.dataset.reviewable_place(self.rng, self.user_id)
+        payload = {"place_id": place_id, "rating": self.rng.randint(1, 5), "text": self.rng.choice(REVIEW_TEXTS)}
+        return "POST /reviews/", self.client.post("/api/v1/reviews/", json=payload)
+
+
+def run_worker(app, dataset, mix, count, seed_value, results):
+    rng = random.Random(seed_value)
+    visitor = Visitor(app, dataset, rng)
+    visitor.login()  # connexion initiale, non mesurée
+    operations, weights = zip(*MIXES[mix].items())
+    for _ in range(count):
+        operation = getattr(visitor, rng.choices(operations, weights)[0])
+        started = time.perf_counter()
+        label, response = operation()
+        elapsed = time.perf_counter() - started
+        results.append((label, elapsed, response.status_code, int(response.headers.get("X-Query-Count", 0))))
+
+
+def percentile(sorted_values, p):
+    return sorted_values[max(0, math.ceil(p / 100 * len(sorted_values)) - 1)]
+
+
+def summarize(results, wall_time):
+    by_endpoint = defaultdict(list)
+    for label, elapsed, status, queries in results:
+        by_endpoint[label].append((elapsed, status, queries))
+    summary = {}
+    for label, samples in sorted(by_endpoint.items()):
+        latencies = sorted(elapsed for elapsed, _, _ in samples)
+        summary[label] = {
+            "count": len(samples),
+            "errors": sum(1 for _, status, _ in samples if status >= 400),
+            "p50_ms": round(percentile(latencies, 50) * 1000, 2),
+            "p95_ms": round(percentile(latencies, 95) * 1000, 2),
+            "p99_ms": round(percentile(latencies, 99) * 1000, 2),
+            "rps": round(len(samples) / wall_time, 1),
+            "queries": round(sum(q for _, _, q in samples) / len(samples), 2),
+        }
+    return summary
+
+
+def compare(summary, baseline, tolerance):
+    """Liste des régressions par rapport à la baseline"""
+    regressions = []
+    for label, current in summary.items():
+        previous = baseline.get(label)
+        if not previous:
+            continue
+        if current["queries"] > previous["queries"] + 0.05:
+            regressions.append(f"{label}: {current['queries']} SQL queries/request (baseline {previous['queries']})")
+        if current["p95_ms"] > previous["p95_ms"] * (1 + tolerance):
+            regressions.append(f"{label}: p95 {current['p95_ms']} ms (baseline {previous['p95_ms']} ms)")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--mix", choices=MIXES, default="mixed")
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--users", type=int, default=200)
+    parser.add_argument("--places", type=int, default=2000)
+    parser.add_argument("--reviews", type=int, default=10000)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE)
+    parser.add_argument("--save-baseline", action="store_true")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="allowed p95 increase (0.25 = +25%%)")
+    args = parser.parse_args()
+
+    app = create_app()
+    rng = random.Random(args.seed)
+    with app.app_context():
+        db.create_all()
+        started = time.perf_counter()
+        dataset = seed(rng, args.users, args.places, args.reviews)
+        print(f"\nseeded {args.users} users, {args.places} places, {args.reviews} reviews "
+              f"in {time.perf_counter() - started:.1f}s")
+
+    results = []  # list.append est atomique : partagée entre les threads
+    per_worker = args.requests // args.workers
+    threads = [threading.Thread(target=run_worker, args=(app, dataset, args.mix, per_worker,
+                                                         args.seed + i, results))
+               for i in range(args.workers)]
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    wall_time = time.perf_counter() - started
+    summary = summarize(results, wall_time)
+
+    print(f"mix '{args.mix}', {len(results)} requests, {args.workers} workers, "
+          f"{len(results) / wall_time:.0f} req/s\n")
+    print(f"{'endpoint':36s} {'count':>6s} {'err':>4s} {'p50 ms':>8s} {'p95 ms':>8s} {'p99 ms':>8s} "
+          f"{'req/s':>7s} {'SQL':>5s}")
+    for label, s in summary.items():
+        print(f"{label:36s} {s['count']:>6d} {s['errors']:>4d} {s['p50_ms']:>8.2f} {s['p95_ms']:>8.2f} "
+              f"{s['p99_ms']:>8.2f} {s['rps']:>7.1f} {s['queries']:>5.2f}")
+
+    key = f"{args.mix}:{args.users}u-{args.places}p-{args.reviews}r-{args.workers}w"
+    baselines = {}
+    if os.path.exists(args.baseline):
+        with open(args.baseline) as f:
+            baselines = json.load(f)
+
+    if args.save_baseline:
+        baselines[key] = summary
+        os.makedirs(os.path.dirname(os.path.abspath(args.baseline)), exist_ok=True)
+        with open(args.baseline, "w") as f:
+            json.dump(baselines, f, indent=2, sort_keys=True)
+        print(f"\nbaseline '{key}' saved to {args.baseline}")
+    elif key in baselines:
+        regressions = compare(summary, baselines[key], args.tolerance)
+        for regression in regressions:
+            print(f"❌ {regression}")
+        if regressions:
+            sys.exit(1)
+        print(f"\n✅ no regression against baseline '{key}'")
+    else:
+        print(f"\nno baseline '{key}' in {args.baseline} (run with --save-baseline)")
+
+
+if __name__ == "__main__":
+    main()
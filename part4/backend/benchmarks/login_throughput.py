@@ -0,0 +1,70 @@
+"""Débit de /auth/login selon le coût bcrypt (BCRYPT_LOG_ROUNDS).
+
+Pour chaque coût, un utilisateur temporaire est créé puis N logins sont
+envoyés par T threads en parallèle. Affiche logins/s, latence moyenne et
+le nombre de réponses 429 (pool de hachage saturé).
+
+Usage (depuis part4/backend, base déjà créée par script.py) :
+    python -m benchmarks.login_throughput [--rounds 4,8,10,12] [--logins 64] [--threads 8]
+"""
+import argparse
+import time
+from concurrent.futures import ThreadPoolExecutor
+from app import create_app, db
+from app.models import User
+from app.utils.password_hasher import password_hasher
+
+PASSWORD = "bench-password"
+
+
+def run_logins(app, email, logins, threads):
+    def login(_):
+        client = app.test_client()
+        started = time.perf_counter()
+        response = client.post("/api/v1/auth/login", json={"email": email, "password": PASSWORD})
+        return response.status_code, time.perf_counter() - started
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=threads) as pool:
+        results = list(pool.map(login, range(logins)))
+    elapsed = time.perf_counter() - started
+
+    ok = [duration for status, duration in results if status == 200]
+    busy = sum(1 for status, _ in results if status == 429)
+    return {"rps": len(ok) / elapsed, "mean_ms": 1000 * sum(ok) / len(ok) if ok else 0.0,
+            "ok": len(ok), "busy": busy}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rounds", default="4,8,10,12")
+    parser.add_argument("--logins", type=int, default=64)
+    parser.add_argument("--threads", type=int, default=8)
+    args = parser.parse_args()
+
+    app = create_app()
+    print(f"\nworkers={password_hasher.workers} max_pending={password_hasher.max_pending} "
+          f"executor={password_hasher.executor_kind}")
+    print(f"{'rounds':>6} {'logins/s':>10} {'mean ms':>10} {'ok':>5} {'429':>5}")
+
+    for rounds in [int(r) for r in args.rounds.split(",")]:
+        password_hasher.rounds = rounds
+        email = f"bench-login-{rounds}@hbnb.bench"
+        with app.app_context():
+            User.query.filter_by(email=email).delete()
+            db.session.add(User(first_name="Bench", last_name="Login", email=email, password=PASSWORD))
+            db.session.commit()
+        try:
+            result = run_logins(app, email, args.logins, args.threads)
+        finally:
+            with app.app_context():
+                User.query.filter_by(email=email).delete()
+                db.session.commit()
+        print(f"{rounds:>6} {result['rps']:>10.1f} {result['mean_ms']:>10.1f} "
+              f"{result['ok']:>5} {result['busy']:>5}")
+
+    password_hasher.shutdown()
+
+
+if __name__ == "__main__":
+    main()
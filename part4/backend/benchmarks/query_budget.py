@@ -0,0 +1,56 @@
+"""Vérifie le nombre maximum de requêtes SQL émises par endpoint (garde-fou N+1).
+
+Usage (depuis part4/backend, base déjà remplie par script.py) :
+    python -m benchmarks.query_budget
+"""
+import sys
+from flask_jwt_extended import create_access_token
+from app import create_app
+from app.models import Place, User
+from app.persistence.query_counter import assert_max_queries
+
+# (méthode, url, body, nombre maximum de requêtes)
+BUDGETS = [
+    ("GET", "/api/v1/places/", None, 2),
+    ("GET", "/api/v1/places/{place_id}", None, 2),
+    ("GET", "/api/v1/places/{place_id}?include=reviews", None, 3),
+    # version (ETag) + page
+    ("GET", "/api/v1/places/{place_id}/reviews", None, 2),
+    ("PUT", "/api/v1/places/{place_id}", {"title": "Query budget"}, 5),
+]
+
+
+def main():
+    app = create_app()
+    client = app.test_client()
+
+    with app.app_context():
+        place = Place.query.first()
+        admin = User.query.filter_by(is_admin=True).first()
+        if not place or not admin:
+            print("❌ Database is empty, run script.py first")
+            return 1
+        place_id, original_title = place.id, place.title
+        token = create_access_token(identity=admin.id, additional_claims={"is_admin": True})
+    client.set_cookie("access_token_cookie", token)
+
+    failures = 0
+    for method, url, body, max_queries in BUDGETS:
+        url = url.format(place_id=place_id)
+        with app.app_context():
+            try:
+                with assert_max_queries(max_queries) as counter:
+                    response = client.open(url, method=method, json=body)
+                print(f"✅ {method:6s} {url:60s} {counter.count}/{max_queries} queries "
+                      f"({response.status_code})")
+            except AssertionError as e:
+                failures += 1
+                print(f"❌ {method:6s} {url}\n{e}")
+
+    # Remet le titre d'origine modifié par le PUT
+    client.put(f"/api/v1/places/{place_id}", json={"title": original_title})
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,110 @@
+"""Débit de HBnBFacade selon le repository : SQLAlchemy (SQLite) vs en mémoire.
+
+Le même scénario passe par une facade neuve pour chaque backend :
+création de users / amenities / places / reviews, puis lectures des
+chemins chauds (user par email, review d'un user pour une place, places
+par prix, page de reviews d'une place). Les mots de passe sont hachés une
+seule fois : on mesure les repositories, pas bcrypt.
+
+Usage (depuis part4/backend) :
+    python -m benchmarks.repository_backends [--users 200] [--places 1000] [--reviews 5000] [--reads 5000]
+"""
+import argparse
+import os
+import random
+import tempfile
+import time
+
+WORK_DIR = tempfile.mkdtemp(prefix="hbnb-repos-")
+# Avant l'import de l'app : config.py lit l'environnement au chargement
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(WORK_DIR, 'repos.db')}"
+
+from app import create_app, db  # noqa: E402
+from app.models import User  # noqa: E402
+from app.persistence.SQLAlchemyRepository import SQLAlchemyRepository  # noqa: E402
+from app.persistence.memory import InMemoryRepository  # noqa: E402
+from app.services.facade import HBnBFacade  # noqa: E402
+from app.utils.password_hasher import password_hasher  # noqa: E402
+
+BACKENDS = {"sqlalchemy": SQLAlchemyRepository, "memory": InMemoryRepository}
+
+
+def timed(results, label, count, fn):
+    started = time.perf_counter()
+    fn()
+    results[label] = count / (time.perf_counter() - started)
+
+
+def run(facade, args, hashed):
+    """Scénario complet sur une facade; retourne {opération: ops/s}"""
+    rng = random.Random(42)
+    results = {}
+
+    users = []
+    for i in range(args.users):
+        user = User(first_name="Load", last_name="Test", email=f"user{i}@repos.hbnb.io")
+        user._password = hashed
+        users.append(user)
+    timed(results, "create users", args.users, lambda: facade.user_repo.add_many(users))
+    amenities = [facade.create_amenity({"name": f"Amenity {i}"}) for i in range(6)]
+
+    places = []
+
+    def create_places():
+        for i in range(args.places):
+            owner = rng.choice(users)
+            places.append(facade.create_place({
+                "title": f"Place {i}", "description": "", "price": round(rng.uniform(40, 400), 2),
+                "latitude": rng.uniform(-60, 60), "longitude": rng.uniform(-170, 170),
+                "owner_id": owner.id, "amenities": [a.id for a in rng.sample(amenities, 2)]}))
+    timed(results, "create place", args.places, create_places)
+
+    reviewed = set()
+
+    def create_reviews():
+        while len(reviewed) < args.reviews:
+            user, place = rng.choice(users), rng.choice(places)
+            if (user.id, place.id) in reviewed:
+                continue
+            reviewed.add((user.id, place.id))
+            facade.create_review({"text": "ok", "rating": rng.randint(1, 5),
+                                  "place_id": place.id, "user_id": user.id})
+    timed(results, "create review", args.reviews, create_reviews)
+
+    pairs = list(reviewed)
+    timed(results, "user by email", args.reads,
+          lambda: [facade.get_user_by_email(rng.choice(users).email) for _ in range(args.reads)])
+    timed(results, "review by user+place", args.reads,
+          lambda: [facade.get_review_by_user_and_place(*rng.choice(pairs)) for _ in range(args.reads)])
+    timed(results, "places by price", args.reads // 10,
+          lambda: [facade.place_repo.filter_places(min_price=100, max_price=120).all()
+                   for _ in range(args.reads // 10)])
+    timed(results, "reviews page", args.reads,
+          lambda: [facade.list_reviews_by_place(rng.choice(places).id, limit=10) for _ in range(args.reads)])
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--users", type=int, default=200)
+    parser.add_argument("--places", type=int, default=1000)
+    parser.add_argument("--reviews", type=int, default=5000)
+    parser.add_argument("--reads", type=int, default=5000)
+    args = parser.parse_args()
+
+    app = create_app()
+    with app.app_context():
+        db.create_all()
+        hashed = password_hasher.hash("admin123")  # un seul bcrypt pour tous les comptes
+        results = {name: run(HBnBFacade(repository_class=repository_class), args, hashed)
+                   for name, repository_class in BACKENDS.items()}
+
+    print(f"\n{args.users} users, {args.places} places, {args.reviews} reviews, {args.reads} reads")
+    print(f"{'operation':24s} {'sqlalchemy':>12s} {'memory':>12s} {'speedup':>8s}   (ops/s)")
+    for label, sql_rate in results["sqlalchemy"].items():
+        memory_rate = results["memory"][label]
+        print(f"{label:24s} {sql_rate:>12.0f} {memory_rate:>12.0f} {memory_rate / sql_rate:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,113 @@
+"""Latence de /places/search selon la taille du catalogue : FTS5 vs LIKE.
+
+Base SQLite temporaire agrandie par paliers (--sizes places, --reviews
+reviews par place, textes tirés d'un vocabulaire fixe). À chaque palier,
+les mêmes requêtes (mot courant, mot rare, préfixe, plusieurs mots) passent
+par la facade avec chaque backend : p50 / p95 en ms. Avec FTS5 la latence
+doit rester à peu près plate quand le catalogue grossit, LIKE parcourt
+toutes les places et leurs reviews. Le coût FTS5 suit le nombre de
+lignes (places et reviews) qui correspondent (toutes sont classées par
+BM25), pas la taille du catalogue.
+
+Usage (depuis part4/backend) :
+    python -m benchmarks.search [--sizes 1000,10000,50000] [--reviews 2] [--runs 20]
+"""
+import argparse
+import os
+import random
+import tempfile
+import time
+import uuid
+
+WORK_DIR = tempfile.mkdtemp(prefix="hbnb-search-")
+# Avant l'import de l'app : config.py lit l'environnement au chargement
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(WORK_DIR, 'search.db')}"
+
+from sqlalchemy import insert  # noqa: E402
+from app import create_app, db  # noqa: E402
+from app.models import Place, Review, User  # noqa: E402
+from app.persistence.search import search_index  # noqa: E402
+from app.services import facade  # noqa: E402
+
+KINDS = ["Appartement", "Studio", "Loft", "Maison", "Villa", "Chalet", "Cabane", "Péniche"]
+CITIES = ["Paris", "Lyon", "Marseille", "Bordeaux", "Nantes", "Lille", "Annecy", "Biarritz"]
+WORDS = ["lumineux", "calme", "terrasse", "jardin", "piscine", "centre", "gare", "plage",
+         "montagne", "vue", "cheminée", "balcon", "parking", "familial", "rénové", "spacieux"]
+REVIEW_WORDS = ["propre", "accueil", "parfait", "bruyant", "literie", "quartier", "recommande",
+                "séjour", "hôte", "réactif", "confortable", "petit", "déjeuner", "équipé"]
+# (libellé, requête) : mot courant, mot rare, préfixe, plusieurs mots, texte des reviews
+QUERIES = [("common", "paris"), ("rare", "biarritz cheminée péniche"), ("prefix", "appart"),
+           ("multi", "villa piscine calme"), ("reviews", "literie confortable")]
+
+
+def grow(rng, owner_id, start, count, reviews_per_place):
+    """Ajoute `count` places (et leurs reviews) en SQL direct, par lots"""
+    for batch_start in range(start, start + count, 5000):
+        places, reviews = [], []
+        for i in range(batch_start, min(batch_start + 5000, start + count)):
+            place_id = str(uuid.uuid4())
+            places.append({
+                "id": place_id, "title": f"{rng.choice(KINDS)} {rng.choice(CITIES)} {i}",
+                "description": " ".join(rng.sample(WORDS, 5)), "price": 100.0,
+                "latitude": 45.0, "longitude": 3.0, "owner_id": owner_id, "user_id": owner_id})
+            reviews += [{"id": str(uuid.uuid4()), "text": " ".join(rng.sample(REVIEW_WORDS, 6)),
+                         "rating": rng.randint(1, 5), "user_id": owner_id, "place_id": place_id}
+                        for _ in range(reviews_per_place)]
+        db.session.execute(insert(Place), places)
+        db.session.execute(insert(Review), reviews)
+        db.session.commit()
+
+
+def measure(app, backend, runs):
+    """{libellé: (p50 ms, p95 ms, résultats)} pour un backend"""
+    app.config["SEARCH_BACKEND"] = backend
+    search_index.init_app(app)
+    results = {}
+    for label, query in QUERIES:
+        facade.search_places(query, limit=20)  # cache SQLite à chaud
+        latencies = []
+        for _ in range(runs):
+            started = time.perf_counter()
+            items, _ = facade.search_places(query, limit=20)
+            latencies.append(time.perf_counter() - started)
+            db.session.remove()
+        latencies.sort()
+        results[label] = (latencies[len(latencies) // 2] * 1000,
+                          latencies[min(int(len(latencies) * 0.95), len(latencies) - 1)] * 1000,
+                          len(items))
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", default="1000,10000,50000", help="catalogue sizes (places)")
+    parser.add_argument("--reviews", type=int, default=2, help="reviews per place")
+    parser.add_argument("--runs", type=int, default=20, help="timed runs per query")
+    args = parser.parse_args()
+
+    app = create_app()
+    rng = random.Random(42)
+    with app.app_context():
+        db.create_all()
+        search_index.ensure(db.session)  # index et triggers avant les données, comme après upgrade-db
+        db.session.commit()
+        owner = User(first_name="Search", last_name="Bench", email="search@bench.hbnb.io")
+        owner._password = "x"
+        db.session.add(owner)
+        db.session.commit()
+        owner_id = owner.id
+
+        print(f"\n{'places':>7s} {'backend':8s} {'query':8s} {'p50 ms':>8s} {'p95 ms':>8s} {'hits':>5s}")
+        current = 0
+        for size in (int(size) for size in args.sizes.split(",")):
+            started = time.perf_counter()
+            grow(rng, owner_id, current, size - current, args.reviews)
+            current = size
+            print(f"-- {size} places loaded in {time.perf_counter() - started:.1f}s")
+            for backend in ("fts5", "like"):
+                for label, (p50, p95, hits) in measure(app, backend, args.runs).items():
+                    print(f"{size:>7d} {backend:8s} {label:8s} {p50:>8.2f} {p95:>8.2f} {hits:>5d}")
+
+
+if __name__ == "__main__":
+    main()
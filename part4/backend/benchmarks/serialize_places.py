@@ -0,0 +1,85 @@
+"""Coût de la sérialisation d'une liste de places (sans base de données).
+
+Construit N places en mémoire (amenities + agrégats de notes) puis compare :
+  - "hand-built + json"   : dicts construits à la main (ancien place_summary) + json stdlib
+  - "registry + json"     : sérialiseur compilé de app/utils/serializers.py + json stdlib
+  - "registry + orjson"   : même sérialiseur, encodé avec orjson (si installé)
+  - "?fields=id,title,price" : projection, seuls les champs demandés sont lus
+
+Usage (depuis part4/backend) :
+    python -m benchmarks.serialize_places [--count 10000] [--repeat 5]
+"""
+import argparse
+import json
+import time
+from app.models import Amenity, Place, PlaceAmenity, PlaceRatingStats
+from app.utils.serializers import dumps, orjson, rating_summary, serializer
+
+
+def hand_built(place):
+    return {
+        "id": place.id,
+        "title": place.title,
+        "description": place.description,
+        "price": place.price,
+        "latitude": place.latitude,
+        "longitude": place.longitude,
+        "owner_id": place.owner_id,
+        "amenities": [{"id": a.id, "name": a.name} for a in getattr(place, 'amenities', [])],
+        "rating": rating_summary(place)
+    }
+
+
+def make_places(count):
+    amenities = [Amenity(id=f"amenity-{i}", name=f"Amenity {i}") for i in range(10)]
+    places = []
+    for i in range(count):
+        place = Place(id=f"place-{i}", title=f"Place {i}", description="Appartement lumineux",
+                      price=50 + i % 200, latitude=45 + (i % 90) / 100, longitude=2 + (i % 90) / 100,
+                      owner_id=f"user-{i % 100}")
+        place.place_amenities = [PlaceAmenity(amenity=amenities[(i + k) % 10]) for k in range(3)]
+        place.rating_stats = PlaceRatingStats(place_id=place.id, review_count=4, rating_sum=17,
+                                              rating_1=0, rating_2=0, rating_3=1, rating_4=1, rating_5=2)
+        places.append(place)
+    return places
+
+
+def best_of(repeat, fn):
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        size = len(fn())
+        timings.append(time.perf_counter() - started)
+    return min(timings), size
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--count", type=int, default=10000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    places = make_places(args.count)
+    full = serializer("place")
+    projected = serializer("place", ("id", "title", "price"))
+    cases = [
+        ("hand-built + json", lambda: json.dumps({"items": [hand_built(p) for p in places]}).encode()),
+        ("registry + json", lambda: dumps({"items": [full(p) for p in places]}, backend="json")),
+        ("registry + orjson", lambda: dumps({"items": [full(p) for p in places]})),
+        ("?fields=id,title,price", lambda: dumps({"items": [projected(p) for p in places]})),
+    ]
+    if orjson is None:
+        print("orjson is not installed: the orjson cases fall back to json")
+
+    print(f"\n{args.count} places, best of {args.repeat}")
+    print(f"{'serializer':26s} {'ms':>9s} {'µs/place':>9s} {'KB':>9s}")
+    baseline = None
+    for label, fn in cases:
+        elapsed, size = best_of(args.repeat, fn)
+        baseline = baseline or elapsed
+        print(f"{label:26s} {elapsed * 1000:9.1f} {elapsed * 1e6 / args.count:9.2f} {size / 1024:9.0f}"
+              f"   x{baseline / elapsed:.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+"""Temps de démarrage d'un worker : import, create_app, première requête.
+
+Chaque mesure tourne dans un process Python neuf (rien en cache en
+mémoire, comme un worker serverless qui démarre), avec et sans
+API_LAZY_LOAD, sur une base SQLite temporaire. Sort en erreur (code 1)
+si la médiane jusqu'à la première réponse dépasse --budget secondes.
+
+Usage (depuis part4/backend) :
+    python -m benchmarks.startup [--runs 5] [--budget 1.0]
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Exécuté dans le process neuf : temps de chaque étape, en JSON sur stdout
+PROBE = """
+import json, time
+started = time.perf_counter()
+from app import create_app
+imported = time.perf_counter()
+app = create_app()
+created = time.perf_counter()
+status = app.test_client().get("/api/v1/places/?limit=1").status_code
+answered = time.perf_counter()
+print(json.dumps({"import": imported - started, "create_app": created - imported,
+                  "first_request": answered - created, "total": answered - started,
+                  "status": status}))
+"""
+
+SETUP = "from app import create_app, db\nwith create_app().app_context(): db.create_all()"
+
+
+def probe(env):
+    output = subprocess.run([sys.executable, "-c", PROBE], cwd=BACKEND_DIR, env=env,
+                            capture_output=True, text=True, check=True).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--budget", type=float, default=1.0, help="max median seconds to the first response")
+    args = parser.parse_args()
+
+    work_dir = tempfile.mkdtemp(prefix="hbnb-startup-")
+    env = dict(os.environ, DATABASE_URL=f"sqlite:///{os.path.join(work_dir, 'startup.db')}")
+    subprocess.run([sys.executable, "-c", SETUP], cwd=BACKEND_DIR, env=env, check=True,
+                   capture_output=True)
+
+    print(f"\nmedian of {args.runs} fresh processes (seconds)")
+    print(f"{'mode':10s} {'import':>8s} {'create_app':>11s} {'1st request':>12s} {'total':>8s}")
+    over_budget = False
+    for mode, lazy in (("eager", "0"), ("lazy", "1")):
+        runs = [probe(dict(env, API_LAZY_LOAD=lazy)) for _ in range(args.runs)]
+        if any(run["status"] != 200 for run in runs):
+            print(f"❌ {mode}: first request failed")
+            over_budget = True
+            continue
+        median = {key: statistics.median(run[key] for run in runs)
+                  for key in ("import", "create_app", "first_request", "total")}
+        print(f"{mode:10s} {median['import']:>8.3f} {median['create_app']:>11.3f} "
+              f"{median['first_request']:>12.3f} {median['total']:>8.3f}")
+        over_budget |= median["total"] > args.budget
+
+    print(f"\n{'❌' if over_budget else '✅'} budget: first response within {args.budget:.2f}s")
+    sys.exit(1 if over_budget else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+"""Écritures/s : un commit par objet vs unité de travail (un seul commit).
+
+Sur une base SQLite temporaire, insère / modifie / supprime N amenities :
+  - "per object" : amenity_repo.add / update / delete (un COMMIT chacun)
+  - "batch"      : add_many / update_many / delete_many dans facade.transaction()
+
+Usage (depuis part4/backend) :
+    python -m benchmarks.write_throughput [--count 2000]
+"""
+import argparse
+import os
+import tempfile
+import time
+
+WORK_DIR = tempfile.mkdtemp(prefix="hbnb-writes-")
+# Avant l'import de l'app : config.py lit l'environnement au chargement
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(WORK_DIR, 'writes.db')}"
+
+from app import create_app, db  # noqa: E402
+from app.models import Amenity  # noqa: E402
+from app.services import facade  # noqa: E402
+
+
+def timed(label, count, fn):
+    started = time.perf_counter()
+    fn()
+    elapsed = time.perf_counter() - started
+    print(f"{label:28s} {count / elapsed:>10.0f} writes/s   ({elapsed:.3f}s)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--count", type=int, default=2000)
+    args = parser.parse_args()
+    count = args.count
+    repo = facade.amenity_repo
+
+    app = create_app()
+    with app.app_context():
+        db.create_all()
+        print(f"\n{count} amenities, SQLite {db.engine.url.database}")
+
+        per_object = [Amenity(name=f"single-{i}") for i in range(count)]
+        timed("insert  per object", count, lambda: [repo.add(a) for a in per_object])
+        batch = [Amenity(name=f"batch-{i}") for i in range(count)]
+
+        def insert_batch():
+            with facade.transaction():
+                repo.add_many(batch)
+        timed("insert  batch", count, insert_batch)
+
+        ids = [a.id for a in per_object]
+        timed("update  per object", count,
+              lambda: [repo.update(amenity_id, {"name": f"single-{i}-u"}) for i, amenity_id in enumerate(ids)])
+        batch_ids = [a.id for a in batch]
+
+        def update_batch():
+            with facade.transaction():
+                repo.update_many({amenity_id: {"name": f"batch-{i}-u"} for i, amenity_id in enumerate(batch_ids)})
+        timed("update  batch", count, update_batch)
+
+        timed("delete  per object", count, lambda: [repo.delete(amenity_id) for amenity_id in ids])
+
+        def delete_batch():
+            with facade.transaction():
+                repo.delete_many(batch_ids)
+        timed("delete  batch", count, delete_batch)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,39 +1,105 @@
 import os
-from sqlalchemy import Column, Integer, String, ForeignKey
-from sqlalchemy.orm import relationship
-from app import db
 
 class Config:
     SECRET_KEY = os.getenv('SECRET_KEY', 'default_secret_key')
+    JWT_SECRET_KEY = SECRET_KEY
     DEBUG = False
+    # Chemin relatif : la base SQLite est créée dans instance/
+    SQLALCHEMY_DATABASE_URI = os.getenv('DATABASE_URL', 'sqlite:///hbnb.db')
     SQLALCHEMY_TRACK_MODIFICATIONS = False
+    # Réplicas en lecture (URL séparées par des virgules), vide = tout sur la primaire
+    DATABASE_REPLICA_URLS = [url.strip() for url in os.getenv('DATABASE_REPLICA_URLS', '').split(',')
+                             if url.strip()]
+
+    # Pool de connexions (ignoré pour SQLite en mémoire)
+    DB_POOL_SIZE = int(os.getenv('DB_POOL_SIZE', 5))
+    DB_MAX_OVERFLOW = int(os.getenv('DB_MAX_OVERFLOW', 10))
+    DB_POOL_TIMEOUT = int(os.getenv('DB_POOL_TIMEOUT', 30))
+    DB_POOL_RECYCLE = int(os.getenv('DB_POOL_RECYCLE', 1800))  # secondes
+    DB_POOL_PRE_PING = True
+    # PRAGMA appliqués à chaque connexion SQLite : WAL pour que les lectures
+    # ne bloquent pas pendant une écriture, busy_timeout au lieu de "database is locked"
+    SQLITE_PRAGMAS = {
+        "journal_mode": "WAL",
+        "synchronous": "NORMAL",
+        "mmap_size": 256 * 1024 * 1024,
+        "busy_timeout": 5000,
+    }
+
+    # JWT dans les cookies
+    JWT_TOKEN_LOCATION = ["cookies"]  # stockage du JWT dans les cookies
+    JWT_COOKIE_SECURE = False         # protection contre les attaques XSS...
+    JWT_COOKIE_HTTPONLY = True        # ...en empechant js de lire les cookies
+    JWT_COOKIE_SAMESITE = "Lax"       # protection CSRF basique
+    JWT_COOKIE_CSRF_PROTECT = False
+
+    # Cache de la facade : 'memory' (par process) ou 'redis' (partagé entre workers).
+    # 'memory' n'est invalidé que dans le process qui écrit : un seul worker
+    # (gunicorn.conf.py refuse de démarrer plusieurs workers avec ce backend)
+    CACHE_ENABLED = os.getenv('CACHE_ENABLED', '1') == '1'
+    CACHE_BACKEND = os.getenv('CACHE_BACKEND', 'memory')
+    CACHE_REDIS_URL = os.getenv('CACHE_REDIS_URL')
+    CACHE_MAX_ENTRIES = 10000
+    CACHE_TTLS = {"place": 60, "amenity": 3600, "user": 300}
+
+    # Coût bcrypt : chaque +1 double le temps de hachage (et de login)
+    BCRYPT_LOG_ROUNDS = int(os.getenv('BCRYPT_LOG_ROUNDS', 12))
+    BCRYPT_WORKERS = int(os.getenv('BCRYPT_WORKERS', 0)) or None         # défaut : nb de CPU
+    BCRYPT_MAX_PENDING = int(os.getenv('BCRYPT_MAX_PENDING', 0)) or None  # défaut : 4 x workers
+    BCRYPT_EXECUTOR = os.getenv('BCRYPT_EXECUTOR', 'process')
+
+    # Encodage des réponses JSON : 'orjson' (si installé, sinon repli) ou 'json' (stdlib)
+    JSON_BACKEND = os.getenv('JSON_BACKEND', 'orjson')
+
+    # Compression des réponses, négociée avec Accept-Encoding (br / zstd si installés)
+    COMPRESS_ENABLED = os.getenv('COMPRESS_ENABLED', '1') == '1'
+    COMPRESS_MIN_SIZE = int(os.getenv('COMPRESS_MIN_SIZE', 1024))  # octets, en dessous : pas rentable
+    COMPRESS_ALGORITHMS = ["zstd", "br", "gzip"]                    # ordre de préférence du serveur
+    COMPRESS_LEVELS = {"gzip": 6, "br": 4, "zstd": 3}
+    COMPRESS_CACHE_ENTRIES = 512  # variantes compressées gardées (réponses avec ETag)
+    COMPRESS_CACHE_TTL = 300
+
+    # Métriques par route (/debug/metrics), et en-têtes X-Query-Count / Server-Timing
+    METRICS_ENABLED = os.getenv('METRICS_ENABLED', '1') == '1'
+    METRICS_HEADERS = os.getenv('METRICS_HEADERS', '0') == '1'
+
+    # /debug/tables : intervalle (s) de relecture des compteurs de lignes (0 : jamais)
+    TABLE_STATS_INTERVAL = int(os.getenv('TABLE_STATS_INTERVAL', 300))
+
+    # Recherche plein texte (/places/search) : "auto" (FTS5 si SQLite le propose), "fts5" ou "like"
+    SEARCH_BACKEND = os.getenv('SEARCH_BACKEND', 'auto')
+
+    # Mode ASGI (asgi.py) : préfixes servis en asynchrone (GET), threads pour tout le reste
+    ASGI_ASYNC_PREFIXES = ["/api/v1/places", "/api/v1/reviews"]
+    ASGI_THREADS = int(os.getenv('ASGI_THREADS', 8))
+
+    # Namespaces de l'API enregistrés au premier app context plutôt que dans create_app
+    API_LAZY_LOAD = os.getenv('API_LAZY_LOAD', '1') == '1'
+    # Liste des routes dans les logs au démarrage
+    LOG_ROUTES = os.getenv('LOG_ROUTES', '0') == '1'
+
+    # Cache des rôles (révocation des droits admin sans requête SQL par appel)
+    AUTH_ROLE_CACHE_TTL = int(os.getenv('AUTH_ROLE_CACHE_TTL', 30))
 
 class DevelopmentConfig(Config):
     DEBUG = True
+    BCRYPT_LOG_ROUNDS = int(os.getenv('BCRYPT_LOG_ROUNDS', 10))
+    METRICS_HEADERS = os.getenv('METRICS_HEADERS', '1') == '1'
     # Configuration MySQL pour la base de données hbnb
     SQLALCHEMY_DATABASE_URI = os.getenv(
         'DATABASE_URL',
         #'mysql+pymysql://root@localhost/hbnb'
-        'sqlite:///instance/hbnb.db'
+        'sqlite:///hbnb.db'
     )
 
 class ProductionConfig(Config):
     DEBUG = False
     SQLALCHEMY_DATABASE_URI = os.getenv('DATABASE_URL')
+    DB_POOL_SIZE = int(os.getenv('DB_POOL_SIZE', 10))
+    DB_MAX_OVERFLOW = int(os.getenv('DB_MAX_OVERFLOW', 20))
 
 config = {
     'development': DevelopmentConfig,
     'production': ProductionConfig,
     'default': DevelopmentConfig
 }
-
-# Relationship examples (à adapter selon vos besoins)
-class PL(db.Model):
-    __tablename__ = 'parents'
-    id = Column(Integer, primary_key=True)
-    children = relationship('Child', backref='parent', lazy=True)
-
-class Child(db.Model):
-    __tablename__ = 'children'
-    id = Column(Integer, primary_key=True)
-    parent_id = Column(Integer, ForeignKey('parents.id'), nullable=True)
\ No newline at end of file
@@ -0,0 +1,76 @@
+"""Lancement en production : gunicorn -c gunicorn.conf.py
+
+- L'app (wsgi:app) est construite une seule fois dans le master
+  (preload_app), puis WEB_WORKERS process sont forkés : le code et les
+  objets chargés sont partagés en copy-on-write (gc.freeze() évite que le
+  ramasse-miettes ne les recopie dans chaque worker).
+- Chaque worker sert WEB_THREADS requêtes en parallèle (worker gthread).
+- Rechargement sans coupure : `kill -HUP <master>` relance les workers
+  (nouvelle config, mêmes modules); pour déployer du nouveau code,
+  `kill -USR2 <master>` démarre un nouveau master puis `kill -TERM` sur
+  l'ancien. Les requêtes en cours ont WEB_GRACEFUL_TIMEOUT secondes pour finir.
+- Plus d'un worker exige CACHE_BACKEND=redis (ou CACHE_ENABLED=0) : le
+  cache en mémoire n'est invalidé que dans le worker qui écrit. Sans
+  WEB_WORKERS, 1 worker avec ce cache (la config par défaut), sinon
+  2 x CPU + 1.
+
+Variables : WEB_BIND, WEB_WORKERS, WEB_THREADS, WEB_TIMEOUT,
+WEB_GRACEFUL_TIMEOUT, WEB_MAX_REQUESTS (+ DATABASE_URL, FLASK_CONFIG qui vaut
+"production" par défaut...).
+"""
+import gc
+import multiprocessing
+import os
+
+# Les workers donnent déjà le parallélisme : bcrypt dans un pool de threads
+# par worker plutôt qu'un pool de process par worker
+os.environ.setdefault("BCRYPT_EXECUTOR", "thread")
+# Config de production par défaut (sinon config['default'] : DevelopmentConfig,
+# DEBUG, bcrypt allégé, X-Query-Count exposé). Elle exige DATABASE_URL.
+os.environ.setdefault("FLASK_CONFIG", "production")
+
+wsgi_app = "wsgi:app"
+preload_app = True
+bind = os.getenv("WEB_BIND", "0.0.0.0:5000")
+# Cache partagé ou coupé : plusieurs workers possibles (mêmes défauts que config.py)
+shared_cache = os.getenv("CACHE_BACKEND", "memory") == "redis" or os.getenv("CACHE_ENABLED", "1") != "1"
+workers = int(os.getenv("WEB_WORKERS", multiprocessing.cpu_count() * 2 + 1 if shared_cache else 1))
+threads = int(os.getenv("WEB_THREADS", 4))
+worker_class = "gthread"
+timeout = int(os.getenv("WEB_TIMEOUT", 30))
+graceful_timeout = int(os.getenv("WEB_GRACEFUL_TIMEOUT", 30))
+keepalive = 5
+max_requests = int(os.getenv("WEB_MAX_REQUESTS", 0))  # 0 : jamais recyclé
+max_requests_jitter = max_requests // 10
+accesslog = os.getenv("WEB_ACCESS_LOG")  # "-" pour stdout
+
+
+def on_starting(server):
+    # Le cache "memory" de la facade n'est invalidé que dans le worker qui a écrit :
+    # les autres serviraient l'ancienne version jusqu'au TTL. Avec plusieurs workers,
+    # cache partagé (CACHE_BACKEND=redis) ou pas de cache (CACHE_ENABLED=0).
+    from wsgi import app
+    if server.cfg.workers > 1 and app.config.get("CACHE_ENABLED", True) \
+            and app.config.get("CACHE_BACKEND") != "redis":
+        raise RuntimeError(f"{server.cfg.workers} workers need CACHE_BACKEND=redis (or CACHE_ENABLED=0): "
+                           "the in-process cache is only invalidated in the worker that writes")
+
+
+def when_ready(server):
+    # App chargée, workers pas encore forkés : namespaces et mappers chargés une fois
+    # pour tous, puis objets sortis du suivi du GC
+    from sqlalchemy.orm import configure_mappers
+    from app.API import load_api
+    from wsgi import app
+    load_api(app)
+    configure_mappers()
+    gc.freeze()
+
+
+def post_fork(server, worker):
+    # Connexions héritées du master : chaque worker ouvre les siennes
+    from app import db
+    from wsgi import app
+    with app.app_context():
+        for engine in db.engines.values():
+            engine.dispose(close=False)
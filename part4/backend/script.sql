@@ -78,8 +78,9 @@ CREATE TABLE Place_Amenity (
 -- =====================================================
 
 CREATE INDEX idx_place_owner ON Place(owner_id);
+CREATE INDEX idx_place_price ON Place(price);
 CREATE INDEX idx_review_user ON Review(user_id);
-CREATE INDEX idx_review_place ON Review(place_id);
+CREATE INDEX idx_review_place ON Review(place_id, created_at);
 CREATE INDEX idx_user_email ON User(email);
 
 -- =====================================================
@@ -0,0 +1,30 @@
+"""Tests de l'API et des repositories.
+
+Usage (depuis part4/backend) :
+    python -m unittest discover tests     (ou python -m pytest tests)
+
+Une base SQLite temporaire pour toute la suite, vidée par chaque classe de
+test (reset_database). Cache de la facade coupé : chaque requête va en
+base, les budgets de requêtes et les relectures ne dépendent pas de l'ordre.
+"""
+import atexit
+import os
+import shutil
+import tempfile
+
+WORK_DIR = tempfile.mkdtemp(prefix="hbnb-tests-")
+atexit.register(shutil.rmtree, WORK_DIR, True)
+# Avant l'import de l'app : config.py lit l'environnement au chargement
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(WORK_DIR, 'tests.db')}"
+os.environ["CACHE_ENABLED"] = "0"
+os.environ["BCRYPT_LOG_ROUNDS"] = "4"
+
+from app import db  # noqa: E402
+from app.persistence.schema import upgrade_schema  # noqa: E402
+
+
+def reset_database():
+    """Base vide au schéma courant (tables, index, index de recherche); dans un app context"""
+    db.session.remove()
+    db.drop_all()
+    upgrade_schema()
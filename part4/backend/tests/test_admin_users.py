@@ -0,0 +1,68 @@
+"""Création de users en lot par un admin : tout est validé avant d'écrire, une requête pour les emails."""
+import unittest
+from flask_jwt_extended import create_access_token
+from tests import reset_database
+from app import create_app, db
+from app.models import User
+from app.persistence.query_counter import count_queries
+
+
+def user(i, **overrides):
+    return dict({"email": f"user{i}@tests.hbnb.io", "first_name": "User", "last_name": str(i),
+                 "password": "secret"}, **overrides)
+
+
+class TestAdminUserCreate(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.app = create_app()
+        with cls.app.app_context():
+            reset_database()
+            admin = User(first_name="Admin", last_name="Test", email="admin@tests.hbnb.io", is_admin=True)
+            admin._password = "x"
+            db.session.add(admin)
+            db.session.commit()
+            token = create_access_token(identity=admin.id, additional_claims={"is_admin": True})
+        cls.client = cls.app.test_client()
+        cls.client.set_cookie("access_token_cookie", token)
+
+    def post(self, payload):
+        return self.client.post("/api/v1/admin/users/", json=payload)
+
+    def user_count(self):
+        with self.app.app_context():
+            return User.query.count()
+
+    def test_invalid_item_rejects_the_whole_list(self):
+        before = self.user_count()
+        cases = [
+            ([user(1), user(2, last_name="")], "Item 1: last_name is required"),
+            ([user(1), user(2), user(3, password=None)], "Item 2: password is required"),
+            ([user(1, email="not-an-email")], "Item 0: Invalid email format"),
+            ([user(1), user(2, is_admin="yes")], "Item 1: is_admin must be a boolean"),
+            ([user(1, nickname="u1")], "Item 0: unknown field(s): nickname"),
+            ([user(1), user(2, email="admin@tests.hbnb.io")],
+             "Item 1: Email already registered: admin@tests.hbnb.io"),
+        ]
+        for payload, error in cases:
+            with self.subTest(error=error):
+                response = self.post(payload)
+                self.assertEqual(response.status_code, 400)
+                self.assertEqual(response.json["error"], error)
+        self.assertEqual(self.user_count(), before)
+
+    def test_email_check_is_one_query(self):
+        def queries(payload):
+            with self.app.app_context(), count_queries() as counter:
+                response = self.post(payload)
+            self.assertEqual(response.status_code, 201, response.json)
+            return counter.count
+
+        self.post([])  # cache du jeton (révocation, rôle) rempli
+        # Même nombre de requêtes pour 1 et pour 10 users
+        self.assertEqual(queries([user(100)]), queries([user(i) for i in range(200, 210)]))
+        self.assertEqual(self.post(user(300)).json["email"], "user300@tests.hbnb.io")
+
+
+if __name__ == "__main__":
+    unittest.main()
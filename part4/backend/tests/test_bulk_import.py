@@ -0,0 +1,71 @@
+"""Import en masse : entrée illisible refusée en 400, emails existants retrouvés sans tenir compte de la casse."""
+import json
+import unittest
+from flask_jwt_extended import create_access_token
+from tests import reset_database
+from app import create_app, db
+from app.models import Place, User
+
+
+def ndjson(*records):
+    return "\n".join(json.dumps(record) for record in records) + "\n"
+
+
+class TestBulkImport(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.app = create_app()
+        with cls.app.app_context():
+            reset_database()
+            admin = User(first_name="Admin", last_name="Test", email="admin@tests.hbnb.io", is_admin=True)
+            alice = User(first_name="Alice", last_name="Martin", email="Alice.Martin@Tests.hbnb.io")
+            for user in (admin, alice):
+                user._password = "x"
+            db.session.add_all([admin, alice])
+            db.session.commit()
+            token = create_access_token(identity=admin.id, additional_claims={"is_admin": True})
+        cls.client = cls.app.test_client()
+        cls.client.set_cookie("access_token_cookie", token)
+
+    def post(self, kind, body, import_id, **params):
+        query = "&".join(f"{key}={value}" for key, value in dict(params, import_id=import_id).items())
+        return self.client.post(f"/api/v1/admin/import/{kind}?{query}", data=body,
+                                content_type="application/x-ndjson")
+
+    def test_unreadable_input_is_a_client_error(self):
+        cases = {
+            "json": '{"name": "Wifi"}\n{"name": \n',
+            "not-object": '{"name": "Pool"}\n["Sauna"]\n',
+            "nested": '{"name": "Parking"}\n{"name": {"fr": "Piscine"}}\n',
+        }
+        for import_id, body in cases.items():
+            with self.subTest(import_id):
+                response = self.post("amenities", body, import_id, batch_size=1)
+                self.assertEqual(response.status_code, 400, response.json)
+                self.assertTrue(response.json["invalid_input"])
+                self.assertEqual(response.json["failed_batch"], 2)
+                self.assertEqual(response.json["inserted"], 1)  # le lot précédent reste commité
+
+        response = self.post("amenities", b'{"name": "\xff"}\n', "encoding")
+        self.assertEqual(response.status_code, 400, response.json)
+        self.assertTrue(response.json["invalid_input"])
+
+    def test_existing_email_matches_any_case(self):
+        response = self.post("users", ndjson({"email": "alice.martin@tests.hbnb.io", "first_name": "Alicia"}),
+                             "users-case")
+        self.assertEqual(response.status_code, 200, response.json)
+        self.assertEqual((response.json["inserted"], response.json["updated"]), (0, 1))
+
+        response = self.post("places", ndjson({"title": "Loft", "price": 80, "latitude": 45.0, "longitude": 3.0,
+                                               "owner_email": "ALICE.MARTIN@tests.hbnb.io"}), "places-case")
+        self.assertEqual(response.status_code, 200, response.json)
+        self.assertEqual(response.json["errors"], [])
+        with self.app.app_context():
+            alice = User.query.filter_by(email="Alice.Martin@Tests.hbnb.io").one()
+            self.assertEqual(alice.first_name, "Alicia")
+            self.assertEqual(Place.query.filter_by(title="Loft").one().owner_id, alice.id)
+            self.assertEqual(User.query.count(), 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,70 @@
+"""Requêtes conditionnelles des collections : l'ETag suit les suppressions et les auteurs affichés."""
+import unittest
+from tests import reset_database
+from app import create_app, db
+from app.models import Amenity, Place, Review, User
+
+
+class TestCollectionVersion(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.app = create_app()
+        with cls.app.app_context():
+            reset_database()
+            owner = User(first_name="Owner", last_name="Test", email="owner@tests.hbnb.io")
+            author = User(first_name="Alice", last_name="Martin", email="alice@tests.hbnb.io")
+            for user in (owner, author):
+                user._password = "x"
+            db.session.add_all([owner, author])
+            db.session.flush()
+            place = Place(title="Place", description="", price=10.0, latitude=45.0, longitude=3.0,
+                          owner_id=owner.id, user_id=owner.id)
+            db.session.add(place)
+            db.session.flush()
+            db.session.add_all([Review(text=f"Review {i}", rating=4, user_id=user.id, place_id=place.id)
+                                for i, user in enumerate((owner, author))])
+            db.session.add_all([Amenity(name="Wifi"), Amenity(name="Pool")])
+            db.session.commit()
+            cls.place_id, cls.author_id = place.id, author.id
+        cls.client = cls.app.test_client()
+
+    def get(self, path):
+        response = self.client.get(path)
+        self.assertEqual(response.status_code, 200, response.json)
+        self.assertNotIn("Last-Modified", response.headers)
+        return response.headers["ETag"]
+
+    def test_reviews_etag_follows_author_and_deletes(self):
+        path = f"/api/v1/places/{self.place_id}/reviews"
+        etag = self.get(path)
+        self.assertEqual(self.client.get(path, headers={"If-None-Match": etag}).status_code, 304)
+
+        with self.app.app_context():
+            db.session.get(User, self.author_id).last_name = "Durand"
+            db.session.commit()
+        renamed = self.get(path)
+        self.assertNotEqual(renamed, etag)
+
+        with self.app.app_context():
+            db.session.delete(Review.query.filter_by(user_id=self.author_id).one())
+            db.session.commit()
+        self.assertNotEqual(self.get(path), renamed)
+
+    def test_place_detail_etag_follows_review_author(self):
+        path = f"/api/v1/places/{self.place_id}?include=reviews"
+        etag = self.get(path)
+        with self.app.app_context():
+            db.session.get(User, self.author_id).first_name = "Alicia"
+            db.session.commit()
+        self.assertNotEqual(self.get(path), etag)
+
+    def test_amenities_etag_follows_deletes(self):
+        etag = self.get("/api/v1/amenities/")
+        with self.app.app_context():
+            db.session.delete(Amenity.query.filter_by(name="Pool").one())
+            db.session.commit()
+        self.assertNotEqual(self.get("/api/v1/amenities/"), etag)
+
+
+if __name__ == "__main__":
+    unittest.main()
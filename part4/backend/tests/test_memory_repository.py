@@ -0,0 +1,112 @@
+"""Parité InMemoryRepository / SQLAlchemyRepository : mêmes tests, mêmes résultats attendus.
+
+Chaque test de RepositoryContract tourne une fois par implémentation
+(get / add / update / delete / get_page, curseurs compris).
+"""
+import unittest
+from tests import reset_database
+from app import create_app, db
+from app.models import Amenity, Place, User
+from app.persistence.memory import InMemoryRepository
+from app.persistence.SQLAlchemyRepository import SQLAlchemyRepository, encode_cursor
+
+# (id, prix) : ex aequo sur le prix pour vérifier le départage par id
+PRICES = [("p1", 30.0), ("p2", 10.0), ("p3", 20.0), ("p4", 10.0), ("p5", 30.0)]
+
+
+class RepositoryContract:
+    repository_class = None
+
+    @classmethod
+    def setUpClass(cls):
+        cls.app = create_app()
+
+    def setUp(self):
+        self.context = self.app.app_context()
+        self.context.push()
+        reset_database()
+        self.users = self.repository_class(User)
+        self.places = self.repository_class(Place)
+        self.amenities = self.repository_class(Amenity)
+        owner = User(id="owner", first_name="Owner", last_name="Test", email="owner@tests.hbnb.io")
+        owner._password = "x"
+        self.users.add(owner)
+        self.places.add_many([Place(id=place_id, title=place_id, description="", price=price,
+                                    latitude=45.0, longitude=3.0, owner_id="owner", user_id="owner")
+                              for place_id, price in PRICES])
+
+    def tearDown(self):
+        db.session.remove()
+        self.context.pop()
+
+    def test_add_and_get(self):
+        self.amenities.add(Amenity(id="a1", name="Wifi"))
+        amenity = self.amenities.get("a1")
+        self.assertEqual((amenity.id, amenity.name), ("a1", "Wifi"))
+        self.assertIsNotNone(amenity.updated_at)  # défaut de colonne appliqué
+        self.assertIsNone(self.amenities.get("missing"))
+        self.assertEqual(self.amenities.get_by_attribute("name", "Wifi").id, "a1")
+        self.assertEqual(sorted(p.id for p in self.places.get_all()), [p for p, _ in PRICES])
+        self.assertEqual(sorted(p.id for p in self.places.get_by_ids(["p2", "missing", "p1"])), ["p1", "p2"])
+
+    def test_update(self):
+        self.amenities.add(Amenity(id="a1", name="Wifi"))
+        before = self.amenities.get("a1").updated_at
+        self.assertEqual(self.amenities.update("a1", {"name": "Fibre"}).id, "a1")
+        amenity = self.amenities.get("a1", primary=True)
+        self.assertEqual(amenity.name, "Fibre")
+        self.assertGreaterEqual(amenity.updated_at, before)
+        self.assertIsNone(self.amenities.get_by_attribute("name", "Wifi"))
+        self.assertEqual(self.amenities.get_by_attribute("name", "Fibre").id, "a1")
+        self.assertIsNone(self.amenities.update("missing", {"name": "Pool"}))
+
+    def test_delete(self):
+        self.amenities.add(Amenity(id="a1", name="Wifi"))
+        self.amenities.delete("a1")
+        self.assertIsNone(self.amenities.get("a1"))
+        self.assertIsNone(self.amenities.get_by_attribute("name", "Wifi"))
+        self.amenities.delete("a1")  # id inconnu : sans erreur
+        self.assertEqual(self.places.delete_many(["p1", "p2", "missing"]), 2)
+        self.assertEqual(sorted(p.id for p in self.places.get_all()), ["p3", "p4", "p5"])
+
+    def walk(self, descending):
+        pages, cursor = [], None
+        while True:
+            items, cursor = self.places.get_page(sort_attr="price", descending=descending, limit=2,
+                                                 cursor=cursor)
+            pages.append(([p.id for p in items], cursor))
+            if cursor is None:
+                return pages
+
+    def test_get_page(self):
+        self.assertEqual(self.walk(False), [
+            (["p2", "p4"], encode_cursor(["price", 10.0, "p4"])),
+            (["p3", "p1"], encode_cursor(["price", 30.0, "p1"])),
+            (["p5"], None),
+        ])
+        self.assertEqual(self.walk(True), [
+            (["p5", "p1"], encode_cursor(["-price", 30.0, "p1"])),
+            (["p3", "p4"], encode_cursor(["-price", 10.0, "p4"])),
+            (["p2"], None),
+        ])
+        items, cursor = self.places.get_page(limit=10)
+        self.assertEqual(([p.id for p in items], cursor), ([p for p, _ in PRICES], None))
+
+    def test_get_page_rejects_foreign_cursor(self):
+        for cursor in (encode_cursor(["-price", 30.0, "p1"]),   # autre tri
+                       encode_cursor(["price", "cheap", "p1"]),  # mauvais type
+                       "not-base64!"):
+            with self.subTest(cursor=cursor), self.assertRaises(ValueError):
+                self.places.get_page(sort_attr="price", cursor=cursor)
+
+
+class TestSQLAlchemyRepository(RepositoryContract, unittest.TestCase):
+    repository_class = SQLAlchemyRepository
+
+
+class TestInMemoryRepository(RepositoryContract, unittest.TestCase):
+    repository_class = InMemoryRepository
+
+
+if __name__ == "__main__":
+    unittest.main()
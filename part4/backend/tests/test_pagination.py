@@ -0,0 +1,63 @@
+"""Pagination par curseur : curseurs valides, et curseurs forgés refusés en 400."""
+import unittest
+from tests import reset_database
+from app import create_app, db
+from app.models import Place, User
+from app.persistence.SQLAlchemyRepository import encode_cursor
+
+PLACES = 5
+
+
+class TestPlaceCursor(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.app = create_app()
+        with cls.app.app_context():
+            reset_database()
+            owner = User(first_name="Owner", last_name="Test", email="owner@tests.hbnb.io")
+            owner._password = "x"
+            db.session.add(owner)
+            db.session.flush()
+            db.session.add_all([Place(title=f"Place {i}", description="", price=10.0 * (i + 1),
+                                      latitude=45.0, longitude=3.0, owner_id=owner.id, user_id=owner.id)
+                                for i in range(PLACES)])
+            db.session.commit()
+        cls.client = cls.app.test_client()
+
+    def walk(self, sort):
+        """Toutes les pages d'un tri, 2 places par page; retourne les titres"""
+        titles, cursor = [], None
+        while True:
+            query = f"/api/v1/places/?limit=2&sort={sort}" + (f"&cursor={cursor}" if cursor else "")
+            response = self.client.get(query)
+            self.assertEqual(response.status_code, 200, response.json)
+            titles += [item["title"] for item in response.json["items"]]
+            cursor = response.json["next_cursor"]
+            if cursor is None:
+                return titles
+
+    def test_pages_cover_every_place_once(self):
+        expected = [f"Place {i}" for i in range(PLACES)]
+        self.assertEqual(self.walk("price"), expected)
+        self.assertEqual(self.walk("-price"), expected[::-1])
+        self.assertEqual(sorted(self.walk("id")), expected)
+
+    def test_forged_cursor_is_rejected(self):
+        forged = [
+            (["id", {"a": 1}, "x"], "id"),         # valeur non scalaire
+            (["id", "a", ["x"]], "id"),            # id non chaîne
+            (["price", "cheap", "x"], "price"),    # texte pour une colonne numérique
+            (["price", True, "x"], "price"),       # booléen
+            (["title", 3, "x"], "title"),          # nombre pour une colonne texte
+            ([{"a": 1}, "a", "x"], "id"),          # clé de tri inconnue
+        ]
+        for values, sort in forged:
+            with self.subTest(cursor=values):
+                response = self.client.get(f"/api/v1/places/?sort={sort}&cursor={encode_cursor(values)}")
+                self.assertEqual(response.status_code, 400)
+                self.assertIn("error", response.json)
+        self.assertEqual(self.client.get("/api/v1/places/?cursor=not-base64!").status_code, 400)
+
+
+if __name__ == "__main__":
+    unittest.main()
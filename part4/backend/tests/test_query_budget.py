@@ -0,0 +1,103 @@
+"""Budget de requêtes SQL des endpoints des places (garde-fou N+1).
+
+Budgets de benchmarks/query_budget.py (liste, détail, détail avec reviews,
+reviews d'une place, PUT d'une place), sur une base SQLite temporaire
+remplie par le test : plusieurs places, chacune avec des amenities et des
+reviews d'auteurs différents, pour qu'une relation chargée place par place
+dépasse le budget.
+"""
+import unittest
+from tests import reset_database
+from flask_jwt_extended import create_access_token
+from app import create_app, db
+from app.models import Amenity, Place, PlaceAmenity, Review, User
+from app.persistence.query_counter import assert_max_queries
+from app.services import facade
+from benchmarks.query_budget import BUDGETS
+
+PLACES = 5
+REVIEWERS = 3
+READ_BUDGETS = [budget for budget in BUDGETS if budget[0] == "GET"]
+WRITE_BUDGETS = [budget for budget in BUDGETS if budget[0] != "GET"]
+
+
+def seed():
+    """Propriétaire, reviewers, places avec amenities et reviews; retourne l'id d'une place"""
+    reset_database()
+    admin = User(first_name="Admin", last_name="Test", email="admin@tests.hbnb.io", is_admin=True)
+    admin._password = "x"
+    reviewers = []
+    for i in range(REVIEWERS):
+        reviewer = User(first_name="Reviewer", last_name=str(i), email=f"reviewer{i}@tests.hbnb.io")
+        reviewer._password = "x"
+        reviewers.append(reviewer)
+    amenities = [Amenity(name=f"Amenity {i}") for i in range(3)]
+    db.session.add_all([admin, *reviewers, *amenities])
+    db.session.flush()
+
+    places = []
+    for i in range(PLACES):
+        place = Place(title=f"Place {i}", description="Query budget", price=50.0 + i,
+                      latitude=45.0, longitude=3.0 + i, owner_id=admin.id, user_id=admin.id)
+        db.session.add(place)
+        db.session.flush()
+        db.session.add_all([PlaceAmenity(place_id=place.id, amenity_id=amenity.id) for amenity in amenities])
+        db.session.add_all([Review(text=f"Review {j}", rating=j + 1, user_id=reviewer.id, place_id=place.id)
+                            for j, reviewer in enumerate(reviewers)])
+        places.append(place)
+    db.session.commit()
+    facade.rebuild_rating_stats()
+    return places[0].id
+
+
+class TestQueryBudget(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.app = create_app()
+        with cls.app.app_context():
+            cls.place_id = seed()
+            admin = User.query.filter_by(is_admin=True).one()
+            token = create_access_token(identity=admin.id, additional_claims={"is_admin": True})
+        cls.client = cls.app.test_client()
+        cls.client.set_cookie("access_token_cookie", token)
+
+    def check_budgets(self, budgets):
+        for method, url, body, max_queries in budgets:
+            url = url.format(place_id=self.place_id)
+            with self.subTest(method=method, url=url), self.app.app_context():
+                with assert_max_queries(max_queries):
+                    response = self.client.open(url, method=method, json=body)
+                self.assertEqual(response.status_code, 200, response.get_data(as_text=True))
+
+    def test_read_budgets(self):
+        self.check_budgets(READ_BUDGETS)
+
+    def test_write_budgets(self):
+        # Un premier PUT remplit le cache du jeton (révocation, rôle), comme pour un client déjà connecté
+        self.client.put(f"/api/v1/places/{self.place_id}", json={})
+        self.check_budgets(WRITE_BUDGETS)
+
+    def test_put_replaces_amenities(self):
+        url = f"/api/v1/places/{self.place_id}"
+        amenity_ids = [amenity["id"] for amenity in self.client.get(url).json["amenities"]]
+        try:
+            response = self.client.put(url, json={"amenities": amenity_ids[:1]})
+            self.assertEqual(response.status_code, 200, response.json)
+            self.assertEqual([a["id"] for a in self.client.get(url).json["amenities"]], amenity_ids[:1])
+            self.client.put(url, json={"amenities": []})
+            self.assertEqual(self.client.get(url).json["amenities"], [])
+        finally:
+            self.client.put(url, json={"amenities": amenity_ids})
+        self.assertCountEqual([a["id"] for a in self.client.get(url).json["amenities"]], amenity_ids)
+
+    def test_list_covers_every_place(self):
+        # Le budget de la liste ne vaut que si elle renvoie bien toutes les places, avec leurs relations
+        with self.app.app_context(), assert_max_queries(2):
+            items = self.client.get("/api/v1/places/?limit=50").json["items"]
+        self.assertEqual(len(items), PLACES)
+        self.assertTrue(all(len(item["amenities"]) == 3 for item in items))
+        self.assertTrue(all(item["rating"]["count"] == REVIEWERS for item in items))
+
+
+if __name__ == "__main__":
+    unittest.main()
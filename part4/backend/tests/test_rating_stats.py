@@ -0,0 +1,107 @@
+"""Agrégats des notes (place_rating_stats) : création / modification / suppression de review,
+upsert de la première ligne, et rebuild_rating_stats identique aux mises à jour incrémentales."""
+import unittest
+from unittest import mock
+from sqlalchemy.orm import Query
+from tests import reset_database
+from app import create_app, db
+from app.models import Place, PlaceRatingStats, User
+from app.services import facade
+
+REVIEWERS = 4
+
+
+class TestRatingStats(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.app = create_app()
+
+    def setUp(self):
+        self.context = self.app.app_context()
+        self.context.push()
+        reset_database()
+        owner = User(first_name="Owner", last_name="Test", email="owner@tests.hbnb.io")
+        self.reviewers = [User(first_name="Reviewer", last_name=str(i), email=f"reviewer{i}@tests.hbnb.io")
+                          for i in range(REVIEWERS)]
+        for user in (owner, *self.reviewers):
+            user._password = "x"
+        db.session.add_all([owner, *self.reviewers])
+        db.session.flush()
+        self.places = [Place(title=f"Place {i}", description="", price=50.0, latitude=45.0, longitude=3.0,
+                             owner_id=owner.id, user_id=owner.id) for i in range(2)]
+        db.session.add_all(self.places)
+        db.session.commit()
+
+    def tearDown(self):
+        db.session.remove()
+        self.context.pop()
+
+    def review(self, place, reviewer, rating):
+        return facade.create_review({"text": "Review", "rating": rating, "place_id": place.id,
+                                     "user_id": self.reviewers[reviewer].id})
+
+    def stats(self, place):
+        """(review_count, rating_sum, histogramme 1..5) tel qu'en base, ou None sans ligne"""
+        row = db.session.get(PlaceRatingStats, place.id, populate_existing=True)
+        if row is None:
+            return None
+        return (row.review_count, row.rating_sum,
+                (row.rating_1, row.rating_2, row.rating_3, row.rating_4, row.rating_5))
+
+    def all_stats(self):
+        """Agrégats de toutes les places qui ont des reviews (le rebuild ne garde pas les lignes à zéro)"""
+        rows = {place.id: self.stats(place) for place in self.places}
+        return {place_id: row for place_id, row in rows.items() if row and row[0]}
+
+    def test_first_review_creates_the_row(self):
+        self.assertIsNone(self.stats(self.places[0]))
+        self.review(self.places[0], 0, 4)
+        self.assertEqual(self.stats(self.places[0]), (1, 4, (0, 0, 0, 1, 0)))
+        self.review(self.places[0], 1, 5)
+        self.assertEqual(self.stats(self.places[0]), (2, 9, (0, 0, 0, 1, 1)))
+        self.assertIsNone(self.stats(self.places[1]))
+
+    def test_first_row_upsert_adds_to_a_concurrent_insert(self):
+        # Deux premières reviews concurrentes : l'UPDATE de la seconde ne voit pas encore la ligne
+        # (0 ligne modifiée) mais son INSERT tombe sur celle de la première
+        self.review(self.places[0], 0, 4)
+        with mock.patch.object(Query, "update", return_value=0):
+            facade.rating_stats_repo.apply_rating_delta(self.places[0].id, 2, 1)
+        db.session.commit()
+        self.assertEqual(self.stats(self.places[0]), (2, 6, (0, 1, 0, 1, 0)))
+
+    def test_update_moves_the_rating(self):
+        review = self.review(self.places[0], 0, 4)
+        facade.update_review(review.id, {"rating": 2})
+        self.assertEqual(self.stats(self.places[0]), (1, 2, (0, 1, 0, 0, 0)))
+        facade.update_review(review.id, {"text": "Texte seul"})
+        self.assertEqual(self.stats(self.places[0]), (1, 2, (0, 1, 0, 0, 0)))
+
+    def test_delete_removes_the_rating(self):
+        first = self.review(self.places[0], 0, 4)
+        self.review(self.places[0], 1, 1)
+        facade.delete_review(first.id)
+        self.assertEqual(self.stats(self.places[0]), (1, 1, (1, 0, 0, 0, 0)))
+
+    def test_batch_create_counts_every_review(self):
+        facade.create_reviews([{"text": "", "rating": rating, "place_id": place.id, "user_id": self.reviewers[i].id}
+                               for place in self.places for i, rating in enumerate((5, 5, 3))])
+        for place in self.places:
+            self.assertEqual(self.stats(place), (3, 13, (0, 0, 1, 0, 2)))
+
+    def test_rebuild_matches_incremental_stats(self):
+        reviews = [self.review(place, i, rating) for place in self.places
+                   for i, rating in enumerate((5, 3, 4, 1))]
+        facade.update_review(reviews[1].id, {"rating": 2})
+        facade.delete_review(reviews[2].id)
+        for review in reviews[4:]:  # plus aucune review sur la seconde place
+            facade.delete_review(review.id)
+        incremental = self.all_stats()
+        self.assertEqual(incremental, {self.places[0].id: (3, 8, (1, 1, 0, 0, 1))})
+
+        self.assertEqual(facade.rebuild_rating_stats(), 1)
+        self.assertEqual(self.all_stats(), incremental)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,87 @@
+"""Recherche plein texte : index FTS5 tenu à jour par les triggers, mêmes résultats que LIKE."""
+import unittest
+from tests import reset_database
+from app import create_app, db
+from app.models import Place, Review, User
+from app.persistence.search import DOC_SHIFT, FTS5Search, LikeSearch, parse_terms
+
+
+class TestSearchIndex(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.app = create_app()
+        with cls.app.app_context():
+            if not FTS5Search.available(db.session.connection()):
+                raise unittest.SkipTest("SQLite without FTS5")
+            reset_database()
+            owner = User(first_name="Owner", last_name="Test", email="owner@tests.hbnb.io")
+            owner._password = "x"
+            db.session.add(owner)
+            db.session.flush()
+            places = [Place(title=title, description=description, price=50.0, latitude=45.0,
+                            longitude=3.0, owner_id=owner.id, user_id=owner.id)
+                      for title, description in [("Loft Paris", "Terrasse lumineuse"),
+                                                 ("Chalet Annecy", "Vue montagne"),
+                                                 ("Studio Lyon", "Calme, proche gare")]]
+            db.session.add_all(places)
+            db.session.flush()
+            db.session.add_all([Review(text="Literie confortable", rating=5, user_id=owner.id,
+                                       place_id=places[1].id),
+                                Review(text="Accueil parfait", rating=4, user_id=owner.id,
+                                       place_id=places[2].id)])
+            db.session.commit()
+            cls.owner_id = owner.id
+            cls.ids = {place.title: place.id for place in places}
+
+    def search(self, backend, query):
+        return {place_id for place_id, _ in backend.search(db.session.connection(), parse_terms(query), 50, 0)}
+
+    def assertFound(self, query, titles):
+        """Même résultat avec l'index FTS5 et avec LIKE"""
+        expected = {self.ids[title] for title in titles}
+        self.assertEqual(self.search(FTS5Search(), query), expected, f"fts5: {query}")
+        self.assertEqual(self.search(LikeSearch(), query), expected, f"like: {query}")
+
+    def test_terms_across_place_and_reviews(self):
+        with self.app.app_context():
+            self.assertFound("chalet", ["Chalet Annecy"])
+            self.assertFound("montagne literie", ["Chalet Annecy"])   # description + review
+            self.assertFound("lit", ["Chalet Annecy"])                # préfixe
+            self.assertFound("loft literie", [])                      # termes de deux places
+
+    def test_triggers_follow_review_writes(self):
+        with self.app.app_context():
+            review = Review(text="Piscine chauffée", rating=5, user_id=self.owner_id,
+                            place_id=self.ids["Loft Paris"])
+            db.session.add(review)
+            db.session.commit()
+            self.assertFound("piscine terrasse", ["Loft Paris"])
+
+            review.text = "Jacuzzi"
+            db.session.commit()
+            self.assertFound("piscine", [])
+            self.assertFound("jacuzzi", ["Loft Paris"])
+
+            review.place_id = self.ids["Studio Lyon"]
+            db.session.commit()
+            self.assertFound("jacuzzi", ["Studio Lyon"])
+
+            db.session.delete(review)
+            db.session.commit()
+            self.assertFound("jacuzzi", [])
+
+    def test_rebuild_matches_triggers(self):
+        with self.app.app_context():
+            connection = db.session.connection()
+            # rowid >> DOC_SHIFT : la place de la ligne (les numéros eux-mêmes peuvent changer)
+            query = f"SELECT t.source_id, d.place_id, coalesce(title, ''), coalesce(reviews, '') " \
+                    f"FROM place_search_rows t JOIN place_search ON place_search.rowid = t.fts_row " \
+                    f"JOIN place_search_docs d ON d.doc = t.fts_row >> {DOC_SHIFT} ORDER BY t.source_id"
+            incremental = connection.exec_driver_sql(query).all()
+            FTS5Search().rebuild(connection)
+            self.assertEqual(connection.exec_driver_sql(query).all(), incremental)
+            db.session.rollback()
+
+
+if __name__ == "__main__":
+    unittest.main()
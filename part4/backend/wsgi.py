@@ -0,0 +1,12 @@
+"""Application WSGI construite une seule fois, sans sortie au démarrage.
+
+Utilisée par gunicorn.conf.py (workers de production), asgi.py et run.py.
+"""
+import os
+from app import create_app
+
+BASE_DIR = os.path.abspath(os.path.dirname(__file__))
+TEMPLATES_DIR = os.path.abspath(os.path.join(BASE_DIR, '../frontend/templates'))
+STATIC_DIR = os.path.abspath(os.path.join(BASE_DIR, '../frontend/static'))
+
+app = create_app(template_folder=TEMPLATES_DIR, static_folder=STATIC_DIR)
@@ -54,15 +54,26 @@ async function fetchUser(userId) {
     }
 }
 
-async function getAllPlaces() {
-    try {
-        const response = await fetch(`${API_URL}/places/`);
-        if (!response.ok) throw new Error('Erreur API');
+// Récupère une page de places (filtres appliqués côté serveur)
+async function getPlacesPage(filters = {}, cursor = null) {
+    const params = new URLSearchParams(filters);
+    if (cursor) params.set('cursor', cursor);
 
-        const data = await response.json();
-        return data;
+    const response = await fetch(`${API_URL}/places/?${params.toString()}`);
+    if (!response.ok) throw new Error('Erreur API');
+
+    return response.json(); // { items, next_cursor }
+}
+
+// Page suivante des places avec les filtres courants (le bouton "Load more" la demande)
+async function getNextPlaces() {
+    try {
+        const page = await getPlacesPage({ limit: PLACES_PAGE_SIZE, ...placesFilters }, placesCursor);
+        placesCursor = page.next_cursor;
+        return page.items;
     } catch (e) {
-        console.error("Erreur getAllPlaces:", e);
+        console.error("Erreur getNextPlaces:", e);
+        placesCursor = null;
         return [];
     }
 }
@@ -194,11 +205,24 @@ async function logout() {
 
 async function getReviewsByPlace(placeId) {
     try {
-        const response = await fetch(`${API_URL}/places/${placeId}/reviews`, {
-            method: 'GET',
-            headers: getHeaders()
-        });
-        return await handleResponse(response);
+        let reviews = [];
+        let cursor = null;
+
+        // L'API pagine les reviews : suivre les next_cursor
+        do {
+            const params = new URLSearchParams({ limit: 100 });
+            if (cursor) params.set('cursor', cursor);
+
+            const response = await fetch(`${API_URL}/places/${placeId}/reviews?${params.toString()}`, {
+                method: 'GET',
+                headers: getHeaders()
+            });
+            const page = await handleResponse(response);
+            reviews = reviews.concat(page.items);
+            cursor = page.next_cursor;
+        } while (cursor);
+
+        return reviews;
     } catch (error) {
         console.error('Erreur getReviewsByPlace:', error);
         throw error;
@@ -298,20 +322,10 @@ async function getCurrentUser() {
 
 // Variables globales pour le filtrage
 let allPlaces = []; 
-let allReviews = {};
-
-// Charger toutes les reviews pour toutes les places
-async function loadAllReviews(places) {
-    for (const place of places) {
-        try {
-            const reviews = await getReviewsByPlace(place.id);
-            allReviews[place.id] = reviews || [];
-        } catch (error) {
-            console.error(`Erreur chargement reviews pour place ${place.id}:`, error);
-            allReviews[place.id] = [];
-        }
-    }
-}
+// Pagination de la liste : filtres appliqués et curseur de la page suivante
+const PLACES_PAGE_SIZE = 20;
+let placesFilters = {};
+let placesCursor = null;
 
 // Fonction pour générer les étoiles visuelles
 function getStars(rating) {
@@ -338,18 +352,16 @@ function priceFilter(places) {
         filter.appendChild(opt);
     });
 
-    // Event listener de filtrage
-    filter.addEventListener('change', () => {
+    // Event listener de filtrage : le filtre est appliqué par l'API, on repart de la première page
+    filter.addEventListener('change', async () => {
         const value = filter.value;
 
-        let filtered = places;
-
-        if (value !== "all") {
-            const maxPrice = parseInt(value);
-            filtered = places.filter(p => p.price <= maxPrice);
-        }
+        placesFilters = value !== "all" ? { max_price: parseInt(value) } : {};
+        placesCursor = null;
+        allPlaces = await getNextPlaces();
 
-        displayPlaces(filtered);
+        await displayPlaces(allPlaces);
+        updateLoadMoreButton();
     });
 }
 
@@ -384,24 +396,7 @@ async function displayPlaces(places = null, maxPrice = null) {
 
         // Afficher chaque place
         for (const place of toDisplay) {
-            const reviews = allReviews[place.id] || [];
-            const avgRating = reviews.length > 0
-                ? (reviews.reduce((sum, r) => sum + r.rating, 0) / reviews.length).toFixed(1)
-                : null;
-
-            const cardHTML = `
-                <div class="place-card" data-id="${place.id}">
-                    <h3>${place.title}</h3>
-                    <p>${place.description}</p>
-                    <div class="place-info">
-                        <span class="price">${place.price}€ / night</span>
-                        <span class="rating">${getStars(avgRating)} ${avgRating ? `(${avgRating})` : 'No reviews'}</span>
-                    </div>
-                    <button class="details-button" onclick="viewPlaceDetails('${place.id}')">View details</button>
-                </div>
-            `;
-
-            container.insertAdjacentHTML('beforeend', cardHTML);
+            container.insertAdjacentHTML('beforeend', placeCardHTML(place));
         }
 
     } catch (error) {
@@ -414,7 +409,51 @@ async function displayPlaces(places = null, maxPrice = null) {
     }
 }
 
-// Charger et afficher toutes les places
+// Carte d'une place dans la liste
+function placeCardHTML(place) {
+    // Moyenne précalculée par l'API (place_rating_stats)
+    const avgRating = place.rating && place.rating.average !== null
+        ? place.rating.average.toFixed(1)
+        : null;
+
+    return `
+        <div class="place-card" data-id="${place.id}">
+            <h3>${place.title}</h3>
+            <p>${place.description}</p>
+            <div class="place-info">
+                <span class="price">${place.price}€ / night</span>
+                <span class="rating">${getStars(avgRating)} ${avgRating ? `(${avgRating})` : 'No reviews'}</span>
+            </div>
+            <button class="details-button" onclick="viewPlaceDetails('${place.id}')">View details</button>
+        </div>
+    `;
+}
+
+// Bouton "Load more" : visible tant que l'API annonce une page suivante
+function updateLoadMoreButton() {
+    const button = document.getElementById('load-more');
+    if (button) button.hidden = !placesCursor;
+}
+
+// Ajouter la page suivante à la fin de la liste
+async function loadMorePlaces() {
+    const container = document.getElementById('places-list');
+    const button = document.getElementById('load-more');
+    if (!container || !placesCursor) return;
+
+    button.disabled = true;
+    const places = await getNextPlaces();
+    allPlaces = allPlaces.concat(places);
+
+    for (const place of places) {
+        container.insertAdjacentHTML('beforeend', placeCardHTML(place));
+    }
+
+    button.disabled = false;
+    updateLoadMoreButton();
+}
+
+// Charger et afficher la première page de places
 async function loadAndDisplayPlaces() {
     const container = document.getElementById('places-list');
     if (!container) return;
@@ -422,21 +461,22 @@ async function loadAndDisplayPlaces() {
     container.innerHTML = '<p>Loading...</p>';
 
     try {
-        allPlaces = await getAllPlaces();
+        allPlaces = await getNextPlaces();
 
         if (allPlaces.length === 0) {
             container.innerHTML = '<p>No places yet...</p>';
             return;
         }
 
-        // Charger toutes les reviews
-        await loadAllReviews(allPlaces);
-
         // Initialiser le filtre
         priceFilter(allPlaces);
 
-        // Afficher toutes les places
+        // Afficher la première page, les suivantes à la demande
         await displayPlaces(allPlaces);
+        updateLoadMoreButton();
+
+        const button = document.getElementById('load-more');
+        if (button) button.addEventListener('click', loadMorePlaces);
 
     } catch (error) {
         container.innerHTML = `